@@ -0,0 +1,38 @@
+"""
+Connection management settings for the Postgres database.
+
+DB_POOL selects how connections are reused:
+    ""          persistent connections: each worker thread keeps
+                its connection for DB_CONN_MAX_AGE seconds
+    "pgbouncer" an external transaction-mode pooler; point
+                POSTGRES_HOST/POSTGRES_PORT at pgbouncer
+"""
+
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+DEFAULT_CONN_MAX_AGE = 60
+POOL_MODES = ("", "pgbouncer")
+
+
+def connection_settings(environ=os.environ):
+    """
+    Return the connection keys to merge into a DATABASES entry.
+    """
+    mode = environ.get("DB_POOL", "")
+    if mode not in POOL_MODES:
+        raise ImproperlyConfigured(
+            f"DB_POOL must be one of {POOL_MODES}, got {mode!r}."
+        )
+    max_age = int(environ.get("DB_CONN_MAX_AGE", DEFAULT_CONN_MAX_AGE))
+    config = {
+        "CONN_MAX_AGE": max_age,
+        # Ping reused connections once per request instead of
+        # failing the request when Postgres dropped them
+        "CONN_HEALTH_CHECKS": max_age != 0,
+    }
+    if mode == "pgbouncer":
+        # Server-side cursors do not survive transaction pooling
+        config["DISABLE_SERVER_SIDE_CURSORS"] = True
+    return config
@@ -13,6 +13,8 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 import os
 from pathlib import Path
 
+from app.database import connection_settings
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -51,6 +53,8 @@ INSTALLED_APPS = [
     "rating",
     "tag",
     "link",
+    "recommendation",
+    "jobs",
 ]
 
 NPM_BIN_PATH = "/usr/local/bin/npm"
@@ -62,6 +66,7 @@ INTERNAL_IPS = [
 ]
 
 MIDDLEWARE = [
+    "core.query_budget.QueryBudgetMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -91,6 +96,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "app.wsgi.application"
+ASGI_APPLICATION = "app.asgi.application"
 
 
 # Database
@@ -103,6 +109,8 @@ DATABASES = {
         "NAME": os.environ.get("POSTGRES_NAME"),
         "USER": os.environ.get("POSTGRES_USER"),
         "PASSWORD": os.environ.get("POSTGRES_PASSWORD"),
+        "PORT": os.environ.get("POSTGRES_PORT", "5432"),
+        **connection_settings(),
     }
 }
 
@@ -115,9 +123,39 @@ if os.environ.get("GITHUB_WORKFLOW"):
             "PASSWORD": "postgres",
             "HOST": "db",
             "PORT": "5432",
+            **connection_settings(),
         }
     }
 
+# Read replicas, e.g. POSTGRES_REPLICA_HOSTS=replica1,replica2:5433.
+# list/retrieve on the catalogue viewsets and recommendation reads
+# go to a replica (core.replicas); tests mirror them to default
+
+DATABASE_REPLICAS = []
+for number, address in enumerate(
+    filter(None, os.environ.get("POSTGRES_REPLICA_HOSTS", "").split(",")), 1
+):
+    host, _, port = address.partition(":")
+    DATABASES[f"replica_{number}"] = {
+        **DATABASES["default"],
+        "HOST": host,
+        "PORT": port or DATABASES["default"].get("PORT", "5432"),
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(f"replica_{number}")
+
+DATABASE_ROUTERS = ["core.replicas.ReplicaRouter"]
+
+# Seconds a user reads from the primary after writing through the
+# API. Pins are kept in the cache, so several worker processes
+# need a shared cache backend for them to apply across workers
+REPLICA_PIN_SECONDS = int(os.environ.get("REPLICA_PIN_SECONDS", 5))
+
+# Activity log consumers wait this long for a gap in event ids
+# (a write still committing) before skipping it; keep it above
+# the longest rating/tag write transaction
+ACTIVITY_SETTLE_SECONDS = 5
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -180,3 +218,95 @@ AUTH_USER_MODEL = "core.User"
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
 }
+
+# Per-request SQL counting and N+1 detection (core.query_budget)
+QUERY_BUDGET_ENABLED = DEBUG
+QUERY_BUDGET_RAISE = False
+QUERY_BUDGET_REPEAT_THRESHOLD = 5
+
+# Maximum queries per request, keyed by URL name. Token
+# authentication costs one query; paginated lists add a count
+QUERY_BUDGETS = {
+    "movies:movie-list": 3,
+    "movies:movie-detail": 2,
+    "rating:rating-list": 3,
+    "rating:rating-detail": 2,
+    # Rating writes also adjust MovieStats and UserStats; rating
+    # and tag writes append to the activity log
+    "POST rating:rating-list": 6,
+    "PUT rating:rating-detail": 7,
+    "PATCH rating:rating-detail": 7,
+    "DELETE rating:rating-detail": 6,
+    "tag:tag-list": 3,
+    "POST tag:tag-list": 5,
+    "tag:tag-detail": 2,
+    "link:link-list": 3,
+    "link:link-detail": 2,
+    "recommendation:recommendations": 4,
+    "jobs:job-list": 3,
+    "jobs:job-detail": 2,
+    # Cancelling reads the job, updates it and reads it back
+    "jobs:job-cancel": 5,
+}
+
+# Serving artifact written by the train_recommender command
+RECOMMENDER_MODEL_PATH = os.environ.get(
+    "RECOMMENDER_MODEL_PATH", str(BASE_DIR / "models" / "factor_model.npz")
+)
+# "private" loads the model into each worker; "shared_memory"
+# publishes it once in a shared memory segment that every worker
+# process maps
+RECOMMENDER_MODEL_SHARING = os.environ.get(
+    "RECOMMENDER_MODEL_SHARING", "private"
+)
+# Load the model when the WSGI/ASGI application is imported; with
+# gunicorn --preload, forked workers share it copy-on-write
+RECOMMENDER_PRELOAD = os.environ.get("RECOMMENDER_PRELOAD", "") == "1"
+# Per-user top-n table written by precompute_recommendations
+RECOMMENDER_TOPN_PATH = os.environ.get(
+    "RECOMMENDER_TOPN_PATH", str(BASE_DIR / "models" / "topn")
+)
+# Threads scoring requests off the event loop
+RECOMMENDER_SCORING_THREADS = int(
+    os.environ.get("RECOMMENDER_SCORING_THREADS", 4)
+)
+# Concurrent requests arriving within the wait window are scored
+# as one batch; a max size of 1 scores every request on its own
+RECOMMENDER_BATCH_MAX_SIZE = int(
+    os.environ.get("RECOMMENDER_BATCH_MAX_SIZE", 64)
+)
+RECOMMENDER_BATCH_MAX_WAIT_MS = float(
+    os.environ.get("RECOMMENDER_BATCH_MAX_WAIT_MS", 2)
+)
+
+# Background jobs run by `manage.py run_jobs` (see core.jobs).
+# At most JOB_MAX_RUNNING jobs run at once across all workers,
+# and at most JOB_CONCURRENCY[kind] of each kind
+JOB_MAX_RUNNING = int(os.environ.get("JOB_MAX_RUNNING", 2))
+JOB_CONCURRENCY = {
+    "import": 1,
+    "train": 1,
+    "evaluate": 1,
+    "precompute": 1,
+    "retrain": 1,
+    "partitions": 1,
+}
+# Jobs the run_jobs workers queue periodically: kind -> every
+# (seconds since the last one was queued) and params
+JOB_SCHEDULE = {
+    # Rating partitions ahead of new user ids (see core.partitions)
+    "partitions": {
+        "every": int(os.environ.get("PARTITIONS_INTERVAL_SECONDS", 3600)),
+    },
+}
+if os.environ.get("RETRAIN_INTERVAL_SECONDS"):
+    JOB_SCHEDULE["retrain"] = {
+        "every": int(os.environ["RETRAIN_INTERVAL_SECONDS"]),
+        "params": {"from_db": True},
+    }
+# Running jobs refresh their heartbeat this often; a job silent
+# for JOB_STALE_SECONDS is failed as belonging to a dead worker
+JOB_HEARTBEAT_SECONDS = 10
+JOB_STALE_SECONDS = 120
+# Minimum interval between progress writes of a job
+JOB_PROGRESS_SECONDS = 1
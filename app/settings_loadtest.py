@@ -0,0 +1,37 @@
+"""
+Settings for running the API under the load-test harness.
+
+Uses the Postgres settings from app.settings when POSTGRES_HOST
+is set, otherwise a local SQLite file stands in for Postgres.
+"""
+
+import os
+
+from .settings import *  # noqa
+
+DEBUG = False
+
+ALLOWED_HOSTS = ["localhost", "127.0.0.1"]
+
+if not os.environ.get("POSTGRES_HOST"):
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.environ.get(
+                "LOADTEST_SQLITE_PATH", BASE_DIR / "loadtest.sqlite3"  # noqa
+            ),
+            "OPTIONS": {"timeout": 30},
+            "CONN_MAX_AGE": DATABASES["default"]["CONN_MAX_AGE"],  # noqa
+        }
+    }
+    DATABASE_REPLICAS = []
+    if os.environ.get("LOADTEST_SQLITE_REPLICA"):
+        # A second connection to the same file exercises routing
+        DATABASES["replica"] = dict(DATABASES["default"])
+        DATABASE_REPLICAS = ["replica"]
+
+# Hashing the same password for every token login dominates latency
+# with the default PBKDF2 iterations; keep login cheap for the test
+PASSWORD_HASHERS = [
+    "django.contrib.auth.hashers.MD5PasswordHasher",
+]
@@ -2,8 +2,10 @@
 Test cases for the app module.
 """
 
+from django.core.exceptions import ImproperlyConfigured
 from django.test import SimpleTestCase
 from app import calc
+from app.database import DEFAULT_CONN_MAX_AGE, connection_settings
 
 
 class CalcTests(SimpleTestCase):
@@ -18,3 +20,29 @@ class CalcTests(SimpleTestCase):
         """Test the subtract function."""
         res = calc.subtract(6, 11)
         self.assertEqual(res, 5)
+
+
+class ConnectionSettingsTests(SimpleTestCase):
+    """Test cases for the database connection settings."""
+
+    def test_persistent_connections_by_default(self):
+        """Test connections are kept and health checked."""
+        config = connection_settings({})
+        self.assertEqual(config["CONN_MAX_AGE"], DEFAULT_CONN_MAX_AGE)
+        self.assertTrue(config["CONN_HEALTH_CHECKS"])
+
+    def test_no_health_checks_without_reuse(self):
+        """Test a zero max age closes connections after requests."""
+        config = connection_settings({"DB_CONN_MAX_AGE": "0"})
+        self.assertEqual(config["CONN_MAX_AGE"], 0)
+        self.assertFalse(config["CONN_HEALTH_CHECKS"])
+
+    def test_pgbouncer(self):
+        """Test transaction pooling disables server-side cursors."""
+        config = connection_settings({"DB_POOL": "pgbouncer"})
+        self.assertTrue(config["DISABLE_SERVER_SIDE_CURSORS"])
+
+    def test_unknown_mode(self):
+        """Test an unknown pool mode is rejected."""
+        with self.assertRaises(ImproperlyConfigured):
+            connection_settings({"DB_POOL": "psycopg"})
@@ -37,6 +37,8 @@ urlpatterns = [
     path("api/rating/", include("rating.urls")),
     path("api/tag/", include("tag.urls")),
     path("api/link/", include("link.urls")),
+    path("api/recommendations/", include("recommendation.urls")),
+    path("api/jobs/", include("jobs.urls")),
     path("__reload__/", include("django_browser_reload.urls")),
     path("", views.home, name="home.html"),  # Add this line for the root URL
 ]
@@ -14,3 +14,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "app.settings")
 
 application = get_wsgi_application()
+
+# Load the recommender now when RECOMMENDER_PRELOAD is set, so a
+# preloading server master shares it with its workers
+from recommendation.services import preload  # noqa: E402
+
+preload()
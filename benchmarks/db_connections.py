@@ -0,0 +1,143 @@
+"""
+Request latency under the connection management modes of
+app.database: a new connection per request and persistent
+connections. Each mode runs in its own
+process against the WSGI handler, so Django's request signals
+open, reuse and close connections as they would in a worker.
+
+Seed the database first (manage.py seed_loadtest), then:
+    python -m benchmarks.db_connections --requests 500
+    python -m benchmarks.db_connections --modes none persistent
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from io import BytesIO
+from wsgiref.util import setup_testing_defaults
+
+# Environment overrides read by app.database.connection_settings
+MODES = {
+    "none": {"DB_CONN_MAX_AGE": "0", "DB_POOL": ""},
+    "persistent": {"DB_CONN_MAX_AGE": "60", "DB_POOL": ""},
+}
+
+
+def percentile(latencies, fraction):
+    """
+    Return a percentile of sorted latencies in ms.
+    """
+    index = min(int(fraction * len(latencies)), len(latencies) - 1)
+    return round(latencies[index] * 1000, 2)
+
+
+def measure(path, requests):
+    """
+    Issue requests GETs through the WSGI handler in this process
+    and return latency percentiles and connections opened.
+    """
+    import django
+
+    django.setup()
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.db import connection
+    from django.db.backends.signals import connection_created
+    from rest_framework.authtoken.models import Token
+
+    token = Token.objects.values_list("key", flat=True).first()
+    if token is None:
+        raise SystemExit("No API tokens; run manage.py seed_loadtest.")
+    handler = WSGIHandler()
+    opened = []
+    connection_created.connect(lambda **kwargs: opened.append(1), weak=False)
+    path, _, query = path.partition("?")
+
+    latencies = []
+    for _ in range(requests):
+        environ = {
+            "PATH_INFO": path,
+            "QUERY_STRING": query,
+            "HTTP_AUTHORIZATION": f"Token {token}",
+            "HTTP_HOST": "127.0.0.1",
+            "wsgi.input": BytesIO(),
+        }
+        setup_testing_defaults(environ)
+        start = time.perf_counter()
+        response = handler(environ, lambda status, headers: None)
+        b"".join(response)
+        # Closing the response sends request_finished, which
+        # closes or keeps the connection depending on the mode
+        response.close()
+        latencies.append(time.perf_counter() - start)
+        status = response.status_code
+
+    latencies.sort()
+    return {
+        "vendor": connection.vendor,
+        "requests": requests,
+        "status": status,
+        "connections_opened": len(opened),
+        "mean_ms": round(sum(latencies) / requests * 1000, 2),
+        "p50_ms": percentile(latencies, 0.50),
+        "p99_ms": percentile(latencies, 0.99),
+    }
+
+
+def run(modes, path, requests):
+    """
+    Measure every mode in a fresh interpreter.
+    """
+    results = {}
+    for mode in modes:
+        env = dict(os.environ, **MODES[mode])
+        env.setdefault("DJANGO_SETTINGS_MODULE", "app.settings_loadtest")
+        child = subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "benchmarks.db_connections",
+                "--child",
+                "--path",
+                path,
+                "--requests",
+                str(requests),
+            ],
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        if child.returncode:
+            results[mode] = {"error": child.stderr.strip().splitlines()[-1]}
+        else:
+            results[mode] = json.loads(child.stdout.splitlines()[-1])
+    return results
+
+
+def main(argv=None):
+    """
+    Parse arguments, run the modes and print a JSON report.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--path", default="/api/movies/movies/?page=1")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument(
+        "--modes", nargs="*", choices=list(MODES), default=list(MODES)
+    )
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    options = parser.parse_args(argv)
+
+    if options.child:
+        print(json.dumps(measure(options.path, options.requests)))
+        return
+    print(
+        json.dumps(
+            run(options.modes, options.path, options.requests), indent=2
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
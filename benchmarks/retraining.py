@@ -0,0 +1,66 @@
+"""
+Wall time of retraining SVD from scratch versus warm-starting
+from the previous model on the ratings added since, on a
+synthetic MovieLens-shaped dataset whose newest ratings (by
+timestamp) form the delta.
+
+Usage:
+    python -m benchmarks.retraining --scale 1m --delta 0.05
+"""
+
+import argparse
+import json
+import time
+
+from src.retraining import retrain
+from src.synthetic import generate_movielens
+
+
+def main(argv=None):
+    """
+    Parse arguments, time both retraining modes and print them.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scale", default="1m")
+    parser.add_argument("--delta", type=float, default=0.05)
+    parser.add_argument("--factors", type=int, default=100)
+    parser.add_argument("--epochs", type=int, default=20)
+    parser.add_argument("--warm-epochs", type=int, default=5)
+    parser.add_argument("--replay", type=float, default=0.1)
+    options = parser.parse_args(argv)
+
+    _, ratings, _, _ = generate_movielens(options.scale)
+    ratings = ratings.sort_values("timestamp", kind="stable")
+    split = int(len(ratings) * (1 - options.delta))
+    columns = ["userId", "movieId", "rating"]
+    old, snapshot = ratings[columns][:split], ratings[columns]
+    delta = snapshot[split:]
+    previous = retrain(old, factors=options.factors, epochs=1)["model"]
+
+    results = {"ratings": len(snapshot), "delta": len(delta)}
+    for mode, kwargs in (
+        ("cold", {}),
+        ("warm", {"previous": previous, "delta": delta}),
+    ):
+        start = time.perf_counter()
+        result = retrain(
+            snapshot,
+            factors=options.factors,
+            epochs=options.epochs,
+            warm_epochs=options.warm_epochs,
+            replay=options.replay,
+            **kwargs,
+        )
+        results[mode] = {
+            "seconds": round(time.perf_counter() - start, 2),
+            "trained": result["trained"],
+            "rmse": round(result["rmse"], 4),
+        }
+    results["speedup"] = round(
+        results["cold"]["seconds"] / results["warm"]["seconds"], 1
+    )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
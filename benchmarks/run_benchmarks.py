@@ -0,0 +1,123 @@
+"""
+Benchmark suite for data loading, training, scoring and evaluation
+on synthetic MovieLens-shaped data.
+
+Usage:
+    python -m benchmarks.run_benchmarks --scale 100k
+    python -m benchmarks.run_benchmarks --scale 1m --skip svd
+    python -m src.profiling benchmarks/results/old.json \\
+        benchmarks/results/new.json
+"""
+
+import argparse
+import os
+import tempfile
+
+import numpy as np
+from src.data_loader import MovieLensDataLoader
+from src.evaluator import Evaluator
+from src.profiling import RunReport
+from src.recommender import RecommenderSystem
+from src.synthetic import SCALES, write_movielens
+
+BENCHMARKS = ("load", "content", "svd", "item_knn", "bpr", "evaluate")
+
+
+def run(scale="100k", seed=0, skip=(), users=20, titles=20, data_dir=None):
+    """
+    Run the benchmarks at a scale and return the RunReport.
+    """
+    report = RunReport(f"benchmark-{scale}")
+    rng = np.random.default_rng(seed)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = data_dir or os.path.join(tmp, scale)
+        if not os.path.exists(os.path.join(path, "ratings.csv")):
+            with report.stage("generate"):
+                write_movielens(path, scale, seed)
+        loader = MovieLensDataLoader(path=f"{path}/", report=report)
+        if "load" not in skip:
+            with report.stage("load_data"):
+                movies, ratings, _, _ = loader.load_data()
+        else:
+            # Later stages still need the frames: read only those
+            dataset = loader.dataset(
+                usecols={"ratings": ["userId", "movieId", "rating"]}
+            )
+            movies, ratings = dataset.movies, dataset.ratings
+
+    recommender = RecommenderSystem(movies, ratings, report=report)
+    sample_users = rng.choice(ratings["userId"].unique(), users)
+
+    if "content" not in skip:
+        sample_titles = rng.choice(movies["title"].to_numpy(), titles)
+        with report.stage("content_based_filtering", items=titles):
+            for title in sample_titles:
+                recommender.content_based_filtering(title)
+
+    if "svd" not in skip:
+        svd, predictions = recommender.collaborative_filtering()
+        with report.stage("recommend_movies", items=users):
+            for user_id in sample_users:
+                recommender.recommend_movies(user_id, svd)
+        if "evaluate" not in skip:
+            evaluator = Evaluator(report=report)
+            evaluator.evaluate_rmse(predictions)
+            evaluator.evaluate_precision_at_k(predictions)
+
+    if "item_knn" not in skip:
+        knn = recommender.item_based_filtering()
+        with report.stage("recommend_movies_item_based", items=users):
+            for user_id in sample_users:
+                recommender.recommend_movies_item_based(user_id, knn)
+
+    if "bpr" not in skip:
+        bpr, predictions = recommender.bpr_filtering()
+        with report.stage("recommend_movies_bpr", items=users):
+            for user_id in sample_users:
+                recommender.recommend_movies_bpr(user_id, bpr)
+        if "evaluate" not in skip:
+            Evaluator(report=report).evaluate_precision_at_k(predictions)
+    return report
+
+
+def main(argv=None):
+    """
+    Parse arguments, run the benchmarks and write the JSON report.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scale", choices=SCALES, default="100k")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--skip", nargs="*", choices=BENCHMARKS, default=[])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--titles", type=int, default=20)
+    parser.add_argument(
+        "--data-dir",
+        default=None,
+        help="Reuse CSVs from this directory instead of generating them.",
+    )
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args(argv)
+
+    report = run(
+        scale=args.scale,
+        seed=args.seed,
+        skip=args.skip,
+        users=args.users,
+        titles=args.titles,
+        data_dir=args.data_dir,
+    )
+    output = args.output or os.path.join(
+        "benchmarks", "results", f"{args.scale}.json"
+    )
+    report.save(output)
+    for stage in report.stages:
+        print(
+            f"{stage['stage']:<34}{stage['wall_seconds']:>10.3f}s"
+            f"{(stage['items_per_second'] or 0):>14.1f}/s"
+        )
+    print(f"Report written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Throughput and latency of recommendation scoring under
+concurrent load: one matrix-vector product per request versus
+requests coalesced into batched matrix-matrix products.
+
+Usage:
+    python -m benchmarks.serving --users 200000 --items 87585 \\
+        --concurrency 64 --requests 5000
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from recommendation.batching import RequestCoalescer
+from src.factor_model import FactorModel
+
+
+def random_model(n_users, n_items, factors, seed=0):
+    """
+    Return a FactorModel with random factors and biases.
+    """
+    rng = np.random.default_rng(seed)
+    return FactorModel(
+        user_ids=np.arange(1, n_users + 1),
+        item_ids=np.arange(1, n_items + 1),
+        user_factors=rng.normal(0, 0.1, (n_users, factors)),
+        item_factors=rng.normal(0, 0.1, (n_items, factors)),
+        user_bias=rng.normal(0, 0.1, n_users),
+        item_bias=rng.normal(0, 0.1, n_items),
+        global_mean=3.5,
+    )
+
+
+async def drive(score, user_ids, concurrency):
+    """
+    Issue one request per user id from concurrency clients and
+    return (elapsed seconds, sorted latencies).
+    """
+    queue = iter(user_ids)
+    latencies = []
+
+    async def client():
+        for user_id in queue:
+            start = time.perf_counter()
+            await score(int(user_id))
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return time.perf_counter() - start, sorted(latencies)
+
+
+def describe(elapsed, latencies):
+    """
+    Summarize one run as RPS and latency percentiles in ms.
+    """
+
+    def ms(fraction):
+        index = min(int(fraction * len(latencies)), len(latencies) - 1)
+        return round(latencies[index] * 1000, 2)
+
+    return {
+        "requests": len(latencies),
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": ms(0.50),
+        "p99_ms": ms(0.99),
+    }
+
+
+async def run_async(options):
+    """
+    Run the per-request and coalesced paths on the same load.
+    """
+    model = random_model(options.users, options.items, options.factors)
+    rng = np.random.default_rng(options.seed)
+    user_ids = rng.integers(1, options.users + 1, options.requests)
+    executor = ThreadPoolExecutor(options.threads)
+    loop = asyncio.get_running_loop()
+
+    async def per_request(user_id):
+        return await loop.run_in_executor(
+            executor, model.recommend, user_id, (), options.top_n
+        )
+
+    coalescer = RequestCoalescer(
+        lambda batch: model.recommend_batch(batch, top_n=options.top_n),
+        max_batch_size=options.max_batch_size,
+        max_wait=options.max_wait_ms / 1000,
+        executor=executor,
+    )
+
+    results = {
+        "per_request": describe(
+            *await drive(per_request, user_ids, options.concurrency)
+        )
+    }
+    results["coalesced"] = describe(
+        *await drive(coalescer.submit, user_ids, options.concurrency)
+    )
+    results["coalesced"]["mean_batch_size"] = round(
+        coalescer.mean_batch_size, 1
+    )
+    executor.shutdown()
+    return results
+
+
+def main(argv=None):
+    """
+    Parse arguments, run both paths and print the comparison.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=200_000)
+    parser.add_argument("--items", type=int, default=87_585)
+    parser.add_argument("--factors", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--top-n", type=int, default=10)
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    options = parser.parse_args(argv)
+    print(json.dumps(asyncio.run(run_async(options)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
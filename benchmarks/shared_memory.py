@@ -0,0 +1,95 @@
+"""
+Memory of N worker processes serving one factor model, loaded
+privately by each worker versus mapped from one shared memory
+segment. Workers are spawned (not forked), like uvicorn's, so
+nothing is shared copy-on-write by accident.
+
+Usage:
+    python -m benchmarks.shared_memory --workers 4 --users 200000
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import tempfile
+from multiprocessing import shared_memory
+
+from benchmarks.serving import random_model
+from src.shared_arrays import segment_name
+
+
+def worker(mode, path, barrier, results):
+    """
+    Load the model, score once so its pages are touched, then
+    report memory while every worker holds its copy.
+    """
+    from src.factor_model import FactorModel
+    from src.shared_arrays import process_memory
+
+    if mode == "shared_memory":
+        model, segment = FactorModel.load_shared(path)
+    else:
+        model = FactorModel.load(path)
+    model.recommend(int(model.user_ids[0]))
+    barrier.wait()
+    results.put(process_memory())
+    barrier.wait()
+
+
+def measure(mode, path, workers):
+    """
+    Run workers in one mode and return summed RSS and PSS.
+    """
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(workers)
+    results = context.Queue()
+    processes = [
+        context.Process(target=worker, args=(mode, path, barrier, results))
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    stats = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    if mode == "shared_memory":
+        shared_memory.SharedMemory(name=segment_name(path)).unlink()
+
+    def mb(key):
+        return round(sum(s[key] for s in stats) / 1e6, 1)
+
+    return {
+        "workers": workers,
+        "rss_mb": mb("rss"),
+        "pss_mb": mb("pss"),
+        "shared_mb": mb("shared"),
+        "private_mb": mb("private"),
+    }
+
+
+def main(argv=None):
+    """
+    Parse arguments, measure both modes and print the result.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--users", type=int, default=200_000)
+    parser.add_argument("--items", type=int, default=87_585)
+    parser.add_argument("--factors", type=int, default=100)
+    options = parser.parse_args(argv)
+
+    model = random_model(options.users, options.items, options.factors)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "factor_model.npz")
+        model.save(path)
+        results = {
+            "model_mb": round(model.nbytes / 1e6, 1),
+            "private": measure("private", path, options.workers),
+            "shared_memory": measure("shared_memory", path, options.workers),
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
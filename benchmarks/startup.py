@@ -0,0 +1,157 @@
+"""
+Startup benchmark for `manage.py check` and worker boot, based
+on `python -X importtime`. Reports wall time, import time and
+the heaviest imports, and fails when a scenario exceeds its
+time budget or imports one of the deferred ML packages.
+
+Usage:
+    python -m benchmarks.startup
+    python -m benchmarks.startup --max-seconds 2 --repeat 5
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+# Packages that must stay behind src.lazy facades at startup
+FORBIDDEN = ("sklearn", "surprise", "scipy", "pandas", "numpy")
+
+WORKER_BOOT = (
+    "import app.asgi; "
+    "from django.urls import get_resolver; "
+    "get_resolver().url_patterns"
+)
+
+SCENARIOS = {
+    "check": ["manage.py", "check"],
+    "worker": ["-c", WORKER_BOOT],
+}
+
+
+def parse_importtime(stderr):
+    """
+    Parse `-X importtime` output into (module, self seconds,
+    cumulative seconds, depth) tuples.
+    """
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        fields = line.split(":", 1)[1]
+        self_us, cumulative_us, name = fields.split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        imports.append(
+            (
+                name.strip(),
+                int(self_us) / 1e6,
+                int(cumulative_us) / 1e6,
+                depth,
+            )
+        )
+    return imports
+
+
+def measure(args, cwd=None, env=None):
+    """
+    Run python -X importtime with args and return its wall
+    time and parsed imports.
+    """
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    wall = time.perf_counter() - start
+    if result.returncode:
+        raise RuntimeError(
+            f"{' '.join(args)} failed:\n{result.stderr[-2000:]}"
+        )
+    return wall, parse_importtime(result.stderr)
+
+
+def summarize(wall, imports, top=15):
+    """
+    Return wall/import seconds, the heaviest top-level imports
+    and the forbidden packages that were imported.
+    """
+    top_level = [i for i in imports if i[3] == 0]
+    heaviest = sorted(top_level, key=lambda i: i[2], reverse=True)[:top]
+    loaded = {name for name, *_ in imports}
+    return {
+        "wall_seconds": round(wall, 3),
+        "import_seconds": round(sum(i[2] for i in top_level), 3),
+        "modules": len(imports),
+        "heaviest": [
+            {"module": name, "cumulative_ms": round(cumulative * 1000, 1)}
+            for name, _, cumulative, _ in heaviest
+        ],
+        "forbidden": sorted(p for p in FORBIDDEN if p in loaded),
+    }
+
+
+def run(scenarios=tuple(SCENARIOS), repeat=3, cwd=None, env=None):
+    """
+    Measure each scenario repeat times and keep the fastest run.
+    """
+    results = {}
+    for name in scenarios:
+        runs = [measure(SCENARIOS[name], cwd, env) for _ in range(repeat)]
+        results[name] = summarize(*min(runs, key=lambda r: r[0]))
+    return results
+
+
+def main(argv=None):
+    """
+    Parse arguments, run the scenarios and exit non-zero when a
+    budget is exceeded or a forbidden package is imported.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--scenarios", nargs="*", choices=SCENARIOS, default=list(SCENARIOS)
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--max-seconds",
+        type=float,
+        default=float(os.environ.get("STARTUP_MAX_SECONDS", 3)),
+        help="Wall-time budget per scenario.",
+    )
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args(argv)
+
+    results = run(args.scenarios, args.repeat)
+    failures = []
+    for name, result in results.items():
+        print(
+            f"{name:<8}{result['wall_seconds']:>8.3f}s wall"
+            f"{result['import_seconds']:>8.3f}s imports"
+            f"{result['modules']:>6} modules"
+        )
+        for entry in result["heaviest"][:5]:
+            print(f"    {entry['cumulative_ms']:>8.1f}ms  {entry['module']}")
+        if result["wall_seconds"] > args.max_seconds:
+            failures.append(
+                f"{name} took {result['wall_seconds']}s, "
+                f"budget is {args.max_seconds}s"
+            )
+        if result["forbidden"]:
+            failures.append(
+                f"{name} imported {', '.join(result['forbidden'])}"
+            )
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,213 @@
+"""
+Append-only activity log written as a transactional outbox.
+
+Rating and tag signals record ActivityEvents. Inside batch()
+(which the write actions of the API viewsets enter) events are
+buffered and written with one INSERT at the end, in the same
+transaction as the change itself; elsewhere each event is
+inserted as it is recorded. Consumers tail the log by event id
+with Consumer, so downstream work (model updates, caches) can
+process deltas instead of rescanning core_rating.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from rest_framework.permissions import SAFE_METHODS
+from core.models import ActivityEvent, ConsumerOffset, Rating, Tag
+
+# Events buffered by the innermost batch(), or None
+_pending = ContextVar("activity_pending", default=None)
+
+
+def record(kind, user_id=None, movie_id=None, **payload):
+    """
+    Append an event to the log, or to the current batch.
+    """
+    event = ActivityEvent(
+        kind=kind, user_id=user_id, movie_id=movie_id, payload=payload
+    )
+    pending = _pending.get()
+    if pending is None:
+        event.save()
+    else:
+        pending.append(event)
+    return event
+
+
+@contextmanager
+def batch():
+    """
+    Buffer the events recorded inside the block and write them
+    with one INSERT, in one transaction with the block's writes.
+    Nested batches join the outermost one.
+    """
+    if _pending.get() is not None:
+        yield
+        return
+    pending = []
+    token = _pending.set(pending)
+    try:
+        with transaction.atomic(savepoint=False):
+            yield
+            ActivityEvent.objects.bulk_create(pending)
+    finally:
+        _pending.reset(token)
+
+
+class BatchActivityMixin:
+    """
+    Viewset mixin running write requests inside batch().
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method in SAFE_METHODS:
+            return super().dispatch(request, *args, **kwargs)
+        with batch():
+            return super().dispatch(request, *args, **kwargs)
+
+
+def _settled(events, offset, settle_seconds):
+    """
+    Return the leading events safe to consume. Ids are taken at
+    INSERT but become visible at COMMIT, so a gap may be a write
+    still in flight; stop at a gap until the event after it is
+    older than settle_seconds, after which the gap is treated as
+    a rolled back write.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settle_seconds)
+    expected = offset + 1
+    for position, event in enumerate(events):
+        if event.id != expected and event.created_at > cutoff:
+            return events[:position]
+        expected = event.id + 1
+    return events
+
+
+class Consumer:
+    """
+    Tails the activity log from a named, persisted offset.
+
+        consumer = Consumer("stats")
+        while consumer.consume(handle_events):
+            pass
+    """
+
+    def __init__(self, name, batch_size=1000, settle_seconds=None):
+        self.name = name
+        self.batch_size = batch_size
+        if settle_seconds is None:
+            settle_seconds = settings.ACTIVITY_SETTLE_SECONDS
+        self.settle_seconds = settle_seconds
+
+    @property
+    def offset(self):
+        """
+        Id of the last event this consumer committed.
+        """
+        return (
+            ConsumerOffset.objects.filter(name=self.name)
+            .values_list("offset", flat=True)
+            .first()
+            or 0
+        )
+
+    def poll(self, offset=None):
+        """
+        Return up to batch_size settled events after offset
+        (default: the committed offset).
+        """
+        if offset is None:
+            offset = self.offset
+        after = ActivityEvent.objects.filter(id__gt=offset).order_by("id")
+        events = list(after[: self.batch_size])
+        return _settled(events, offset, self.settle_seconds)
+
+    def commit(self, offset):
+        """
+        Persist offset as processed.
+        """
+        ConsumerOffset.objects.update_or_create(
+            name=self.name, defaults={"offset": offset}
+        )
+
+    def consume(self, handler):
+        """
+        Pass the next batch of events to handler and commit it.
+        The handler and the commit share a transaction, so a
+        failing batch is retried. Returns the number of events.
+        """
+        with transaction.atomic():
+            events = self.poll()
+            if events:
+                handler(events)
+                self.commit(events[-1].id)
+        return len(events)
+
+
+@receiver(post_save, sender=Rating)
+def rating_saved(sender, instance, created, raw=False, **kwargs):
+    """
+    Log a new or changed rating.
+    """
+    if raw:
+        return
+    # core.stats keeps the stored value of updated ratings
+    previous = getattr(instance, "_previous_rating", None)
+    record(
+        (
+            ActivityEvent.RATING_CREATED
+            if created or previous is None
+            else ActivityEvent.RATING_UPDATED
+        ),
+        user_id=instance.user_id,
+        movie_id=instance.movies_id,
+        rating=str(instance.rating),
+        **({"previous": str(previous)} if previous is not None else {}),
+    )
+
+
+@receiver(post_delete, sender=Rating)
+def rating_deleted(sender, instance, **kwargs):
+    """
+    Log a deleted rating.
+    """
+    record(
+        ActivityEvent.RATING_DELETED,
+        user_id=instance.user_id,
+        movie_id=instance.movies_id,
+        rating=str(instance.rating),
+    )
+
+
+@receiver(post_save, sender=Tag)
+def tag_saved(sender, instance, created, raw=False, **kwargs):
+    """
+    Log a new tag.
+    """
+    if created and not raw:
+        record(
+            ActivityEvent.TAG_CREATED,
+            user_id=instance.user_id,
+            movie_id=instance.movie_id,
+            tag=instance.tag,
+        )
+
+
+@receiver(post_delete, sender=Tag)
+def tag_deleted(sender, instance, **kwargs):
+    """
+    Log a deleted tag.
+    """
+    record(
+        ActivityEvent.TAG_DELETED,
+        user_id=instance.user_id,
+        movie_id=instance.movie_id,
+        tag=instance.tag,
+    )
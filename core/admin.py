@@ -48,8 +48,40 @@ class UserAdmin(BaseUserAdmin):
     )
 
 
+class RatingAdmin(admin.ModelAdmin):
+    """Rating admin; __str__ reads the user and movie."""
+
+    list_select_related = ["user", "movies"]
+    raw_id_fields = ["user", "movies"]
+
+
+class TagAdmin(admin.ModelAdmin):
+    """Tag admin; __str__ reads the user and movie."""
+
+    list_select_related = ["user", "movie"]
+    raw_id_fields = ["user", "movie"]
+
+
+class LinkAdmin(admin.ModelAdmin):
+    """Link admin; __str__ reads the user and both movies."""
+
+    list_select_related = ["user", "movie", "linked_movie"]
+    raw_id_fields = ["user", "movie", "linked_movie"]
+
+
+class JobAdmin(admin.ModelAdmin):
+    """Job admin; queue jobs through the API or core.jobs."""
+
+    list_display = ["id", "kind", "status", "progress", "created_at"]
+    list_filter = ["status", "kind"]
+    raw_id_fields = ["created_by"]
+
+
 admin.site.register(models.User, UserAdmin)
 admin.site.register(models.Movie)
-admin.site.register(models.Rating)
-admin.site.register(models.Tag)
-admin.site.register(models.Link)
+admin.site.register(models.Rating, RatingAdmin)
+admin.site.register(models.Tag, TagAdmin)
+admin.site.register(models.Link, LinkAdmin)
+admin.site.register(models.MovieStats)
+admin.site.register(models.UserStats)
+admin.site.register(models.Job, JobAdmin)
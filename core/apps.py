@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "core"
+
+    def ready(self):
+        # Keep MovieStats and UserStats in step with Rating writes
+        # and log rating and tag activity; create rating
+        # partitions ahead of new users
+        from core import activity, partitions, stats  # noqa: F401
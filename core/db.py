@@ -0,0 +1,80 @@
+"""
+Helpers for running database work on several connections.
+"""
+
+import queue
+import threading
+
+from django.db import connection, connections, transaction
+
+
+def chunked(items, size):
+    """
+    Split a sequence into consecutive slices of at most size.
+    """
+    slices = []
+    for begin in range(0, len(items), size):
+        end = begin + size
+        slices.append(items[begin:end])
+    return slices
+
+
+def run_in_workers(func, chunks, workers):
+    """
+    Call func on every chunk from up to workers threads and
+    return the results in chunk order. Django connections are
+    per thread, so each worker holds one dedicated connection
+    for all the chunks it takes, runs every chunk in its own
+    transaction and closes the connection when it finishes.
+    The first error stops the remaining chunks and is re-raised.
+    """
+    chunks = list(chunks)
+    results = [None] * len(chunks)
+    errors = []
+    pending = queue.SimpleQueue()
+    for item in enumerate(chunks):
+        pending.put(item)
+
+    def work():
+        try:
+            while not errors:
+                try:
+                    index, chunk = pending.get_nowait()
+                except queue.Empty:
+                    return
+                with transaction.atomic():
+                    results[index] = func(chunk)
+        except Exception as exc:
+            errors.append(exc)
+        finally:
+            connections.close_all()
+
+    threads = [
+        threading.Thread(target=work, name=f"db-worker-{number}")
+        for number in range(max(min(workers, len(chunks)), 1))
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+    return results
+
+
+def copy_csv(cursor, table, columns, buffer):
+    """
+    COPY CSV rows from a file-like buffer into table through a
+    Django cursor, on psycopg2 or psycopg 3.
+    """
+    quote = connection.ops.quote_name
+    sql = (
+        f"COPY {quote(table)} ({', '.join(map(quote, columns))}) "
+        "FROM STDIN WITH (FORMAT csv)"
+    )
+    raw = cursor.cursor
+    if hasattr(raw, "copy_expert"):
+        raw.copy_expert(sql, buffer)
+    else:
+        with raw.copy(sql) as copy:
+            copy.write(buffer.read())
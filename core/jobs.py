@@ -0,0 +1,365 @@
+"""
+Database-backed background jobs.
+
+Jobs are Job rows queued through enqueue() (or the jobs API) and
+run by `manage.py run_jobs` workers, so imports and training stay
+off the request path. A worker claims the oldest queued job whose
+kind is under its JOB_CONCURRENCY limit (and while fewer than
+JOB_MAX_RUNNING jobs run in total), then calls the kind's handler
+with a JobContext.
+
+Handlers report progress through context.progress(), which also
+refreshes the heartbeat and raises JobCancelled once cancel() was
+requested, so cancellation takes effect at the next progress
+point. Work committed before that point stays. Running jobs whose
+heartbeat is older than JOB_STALE_SECONDS belonged to a worker
+that died; reap_stale() fails them so they stop counting against
+the limits.
+"""
+
+import io
+import logging
+import threading
+import time
+import traceback
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection, connections, transaction
+from django.db.models import Count
+from django.utils import timezone
+from core.models import Job
+
+logger = logging.getLogger(__name__)
+
+# Postgres advisory lock serializing claims across workers
+QUEUE_LOCK = 4_604_601
+
+# kind -> (handler, accepted params)
+HANDLERS = {}
+
+
+class JobCancelled(Exception):
+    """
+    Raised inside a handler when its job was cancelled.
+    """
+
+
+def no_progress(fraction, message=""):
+    """
+    Progress callback used outside of jobs.
+    """
+
+
+def handler(kind, params=()):
+    """
+    Register the decorated function as the handler of kind.
+    It is called as func(context, **job.params).
+    """
+
+    def decorator(func):
+        HANDLERS[kind] = (func, frozenset(params))
+        return func
+
+    return decorator
+
+
+def validate_params(kind, params):
+    """
+    Raise ValueError unless kind has a handler accepting params.
+    """
+    if kind not in HANDLERS:
+        raise ValueError(f"Unknown job kind {kind!r}.")
+    if not isinstance(params, dict):
+        raise ValueError("Job params must be an object.")
+    unknown = set(params) - HANDLERS[kind][1]
+    if unknown:
+        raise ValueError(
+            f"Unknown params for {kind} jobs: {', '.join(sorted(unknown))}."
+        )
+
+
+def enqueue(kind, params=None, user=None):
+    """
+    Queue a job of kind and return it.
+    """
+    params = params or {}
+    validate_params(kind, params)
+    return Job.objects.create(kind=kind, params=params, created_by=user)
+
+
+def cancel(job):
+    """
+    Cancel a queued job at once, or ask a running job to stop at
+    its next progress point. Returns the refreshed job.
+    """
+    queued = Job.objects.filter(pk=job.pk, status=Job.QUEUED).update(
+        status=Job.CANCELLED,
+        cancel_requested=True,
+        finished_at=timezone.now(),
+    )
+    if not queued:
+        Job.objects.filter(pk=job.pk, status=Job.RUNNING).update(
+            cancel_requested=True
+        )
+    job.refresh_from_db()
+    return job
+
+
+def schedule(kind, every, params=None):
+    """
+    Queue a job of kind unless one is queued or running, or the
+    last one was queued less than every seconds ago. Returns the
+    new job or None.
+    """
+    with transaction.atomic():
+        _lock_queue()
+        latest = Job.objects.filter(kind=kind).order_by("-id").first()
+        if latest is not None and (
+            latest.status not in Job.FINISHED
+            or latest.created_at > timezone.now() - timedelta(seconds=every)
+        ):
+            return None
+        return enqueue(kind, params)
+
+
+def reap_stale():
+    """
+    Fail running jobs whose worker stopped sending heartbeats.
+    Returns the number of jobs failed.
+    """
+    cutoff = timezone.now() - timedelta(seconds=settings.JOB_STALE_SECONDS)
+    return Job.objects.filter(
+        status=Job.RUNNING, heartbeat_at__lt=cutoff
+    ).update(
+        status=Job.FAILED,
+        error="Worker stopped sending heartbeats.",
+        finished_at=timezone.now(),
+    )
+
+
+def _lock_queue():
+    """
+    Serialize claims on Postgres, so two workers cannot both see
+    a kind under its limit. SQLite serializes writers already.
+    """
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_xact_lock(%s)", [QUEUE_LOCK])
+
+
+def claim(worker, kinds=None):
+    """
+    Mark the oldest runnable queued job as running on worker and
+    return it, or None when nothing may start.
+    """
+    with transaction.atomic():
+        _lock_queue()
+        running = dict(
+            Job.objects.filter(status=Job.RUNNING)
+            .order_by()
+            .values("kind")
+            .annotate(count=Count("id"))
+            .values_list("kind", "count")
+        )
+        if sum(running.values()) >= settings.JOB_MAX_RUNNING:
+            return None
+        full = [
+            kind
+            for kind, limit in settings.JOB_CONCURRENCY.items()
+            if running.get(kind, 0) >= limit
+        ]
+        queued = Job.objects.filter(status=Job.QUEUED).exclude(kind__in=full)
+        if kinds:
+            queued = queued.filter(kind__in=kinds)
+        job = queued.order_by("id").first()
+        if job is None:
+            return None
+        now = timezone.now()
+        # Conditional, in case the job was cancelled meanwhile
+        claimed = Job.objects.filter(pk=job.pk, status=Job.QUEUED).update(
+            status=Job.RUNNING, worker=worker, started_at=now, heartbeat_at=now
+        )
+        if not claimed:
+            return None
+    job.refresh_from_db()
+    return job
+
+
+class JobContext:
+    """
+    Handed to job handlers to report progress.
+    """
+
+    def __init__(self, job):
+        self.job = job
+        self._reported_at = None
+
+    def progress(self, fraction, message=""):
+        """
+        Record fraction (0 to 1) done and a status message, at
+        most every JOB_PROGRESS_SECONDS. Raises JobCancelled when
+        the job was cancelled.
+        """
+        now = time.monotonic()
+        if (
+            self._reported_at is not None
+            and now - self._reported_at < settings.JOB_PROGRESS_SECONDS
+        ):
+            return
+        self._reported_at = now
+        Job.objects.filter(pk=self.job.pk).update(
+            progress=max(0.0, min(fraction, 1.0)),
+            message=message[:255],
+            heartbeat_at=timezone.now(),
+        )
+        cancelled = (
+            Job.objects.filter(pk=self.job.pk)
+            .values_list("cancel_requested", flat=True)
+            .first()
+        )
+        if cancelled:
+            raise JobCancelled()
+
+
+def _finish(job, status, **fields):
+    """
+    Store the final status of job.
+    """
+    fields.update(status=status, finished_at=timezone.now())
+    Job.objects.filter(pk=job.pk).update(**fields)
+    job.refresh_from_db()
+
+
+def run_job(job):
+    """
+    Run a claimed job's handler and record how it ended.
+    """
+    func = HANDLERS[job.kind][0]
+    try:
+        result = func(JobContext(job), **job.params)
+    except JobCancelled:
+        _finish(job, Job.CANCELLED, message="Cancelled.")
+    except Exception:
+        logger.exception("Job %s failed", job.pk)
+        _finish(job, Job.FAILED, error=traceback.format_exc())
+    else:
+        _finish(
+            job, Job.SUCCEEDED, progress=1.0, message="Done.", result=result
+        )
+    return job
+
+
+@contextmanager
+def heartbeat(job, interval=None):
+    """
+    Refresh the job's heartbeat from a thread while the block
+    runs, so long steps without progress calls are not reaped.
+    """
+    interval = interval or settings.JOB_HEARTBEAT_SECONDS
+    stop = threading.Event()
+
+    def beat():
+        try:
+            while not stop.wait(interval):
+                Job.objects.filter(pk=job.pk).update(
+                    heartbeat_at=timezone.now()
+                )
+        except Exception:
+            logger.exception("Heartbeat of job %s stopped", job.pk)
+        finally:
+            connections.close_all()
+
+    thread = threading.Thread(
+        target=beat, name=f"job-{job.pk}-heartbeat", daemon=True
+    )
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def _run_command(name, context, **options):
+    """
+    Run a management command with the job's progress callback
+    and return its output.
+    """
+    stdout = io.StringIO()
+    call_command(name, progress=context.progress, stdout=stdout, **options)
+    return {"output": stdout.getvalue()}
+
+
+@handler(Job.IMPORT, params=("path", "workers"))
+def import_movielens(context, **params):
+    """
+    Load the MovieLens CSVs into the database.
+    """
+    return _run_command("load_movielens_data", context, **params)
+
+
+@handler(Job.TRAIN, params=("path", "from_db", "factors", "epochs", "seed"))
+def train(context, **params):
+    """
+    Train and save the factor model.
+    """
+    return _run_command("train_recommender", context, **params)
+
+
+@handler(
+    Job.EVALUATE,
+    params=("path", "from_db", "factors", "epochs", "seed", "test_size", "k"),
+)
+def evaluate(context, **params):
+    """
+    Fit SVD on a training split and return its held-out metrics.
+    """
+    from core.management.commands.evaluate_recommender import evaluate_svd
+
+    return evaluate_svd(progress=context.progress, **params)
+
+
+@handler(Job.PRECOMPUTE, params=("path", "from_db", "top_n", "chunk_size"))
+def precompute(context, **params):
+    """
+    Rebuild the precomputed top-n table.
+    """
+    return _run_command("precompute_recommendations", context, **params)
+
+
+@handler(
+    Job.RETRAIN,
+    params=(
+        "path",
+        "from_db",
+        "full",
+        "epochs",
+        "warm_epochs",
+        "lr",
+        "replay",
+        "holdout",
+        "tolerance",
+        "min_delta",
+        "force",
+        "refit",
+        "seed",
+    ),
+)
+def retrain(context, **params):
+    """
+    Warm-start retrain and publish the factor model.
+    """
+    return _run_command("retrain_recommender", context, **params)
+
+
+@handler(Job.PARTITIONS)
+def partitions(context):
+    """
+    Create core_rating partitions ahead of the newest user.
+    """
+    from core.partitions import ensure_partitions_ahead
+
+    return {"created": ensure_partitions_ahead()}
@@ -1,7 +1,24 @@
+import io
+
+import numpy as np
 import pandas as pd
-from core.models import Movie, Rating, Tag, Link
+from core import activity
+from core.models import ActivityEvent, Movie, Rating, Tag, Link
 from django.contrib.auth import get_user_model
-from django.db import transaction
+from django.db import connection, transaction
+from django.utils import timezone
+from core.db import chunked, copy_csv, run_in_workers
+from core.jobs import no_progress
+from core.partitions import (
+    ensure_partitions,
+    is_partitioned,
+    partition_name,
+    split_by_partition,
+)
+from core.stats import rebuild_rating_stats
+from src.id_map import MISSING, IdMap
+
+BATCH_SIZE = 5000
 
 
 def create_user(user_id):
@@ -24,6 +41,19 @@ def create_user(user_id):
     return user
 
 
+def copy_partition(item):
+    """
+    COPY one (partition index, rows) pair on this thread's
+    connection.
+    """
+    index, rows = item
+    buffer = io.StringIO()
+    rows.to_csv(buffer, index=False, header=False)
+    buffer.seek(0)
+    with connection.cursor() as cursor:
+        copy_csv(cursor, partition_name(index), rows.columns, buffer)
+
+
 class MovieLensDataLoader:
     """
     The MovieLensDataLoader class loads the
@@ -31,17 +61,23 @@ class MovieLensDataLoader:
     them into Django models.
     """
 
-    def __init__(self, path=""):
+    def __init__(self, path="", workers=1, progress=no_progress):
         """
         Initialize path to the
         MovieLens dataset files.
+        With workers > 1 ratings and tags are inserted from
+        that many threads, each on its own connection.
+        progress(fraction, message) is called after each file.
         """
         self.path = path
+        self.workers = workers
+        self.progress = progress
 
     def load_data(self):
         """
         Loads MovieLens dataset files
         and inserts them into Django models.
+        Returns True once loaded, None when a file is missing.
         """
         try:
             movies_df = pd.read_csv(f"{self.path}movies.csv")
@@ -50,12 +86,17 @@ class MovieLensDataLoader:
             links_df = pd.read_csv(f"{self.path}links.csv")
 
             print("Files loaded successfully!")
+            self.progress(0.1, "Read CSV files")
 
             # Insert movies into the database
             self.load_movies(movies_df)
+            self.progress(0.2, "Loaded movies")
             self.load_ratings(ratings_df)
+            self.progress(0.8, "Loaded ratings")
             self.load_tags(tags_df)
+            self.progress(0.95, "Loaded tags")
             self.load_links(links_df)
+            return True
 
         except FileNotFoundError as e:
             print(f"Error: {e}")
@@ -91,52 +132,132 @@ class MovieLensDataLoader:
         Movie.objects.bulk_create(movie_objects, batch_size=5000)
         print(f"{len(movie_objects)} movies loaded into the database.")
 
-    @transaction.atomic
+    def known_rows(self, frame):
+        """
+        Return the Movie pks and the mask of rows of a ratings or
+        tags frame whose movieId and userId exist in the database.
+        """
+
+        # movieId -> pk through a sorted IdMap instead of a dict
+        movie_rows = np.array(
+            Movie.objects.order_by("movieId").values_list("movieId", "id"),
+            dtype=np.int64,
+        ).reshape(-1, 2)
+        movies = IdMap(movie_rows[:, 0])
+        movie_pks = movie_rows[:, 1]
+        users = IdMap(get_user_model().objects.values_list("id", flat=True))
+
+        positions = movies.indices(frame["movieId"].to_numpy())
+        known = (positions != MISSING) & (
+            users.indices(frame["userId"].to_numpy()) != MISSING
+        )
+        return movie_pks[positions[known]], known
+
+    def bulk_insert(self, model, objects):
+        """
+        bulk_create objects in batches. With several workers the
+        batches are spread over worker connections and each is
+        committed on its own, so a failed load can leave earlier
+        batches behind; with one worker the insert is atomic.
+        """
+        if self.workers <= 1:
+            with transaction.atomic():
+                model.objects.bulk_create(objects, batch_size=BATCH_SIZE)
+            return
+        run_in_workers(
+            model.objects.bulk_create,
+            chunked(objects, BATCH_SIZE),
+            self.workers,
+        )
+
     def load_ratings(self, ratings_df):
         """
         Insert ratings data into the database.
         """
 
-        # Preload Movies and Users
-        movie_map = {movie.movieId: movie for movie in Movie.objects.all()}
-        user_map = {user.id: user for user in get_user_model().objects.all()}
+        movie_pks, known = self.known_rows(ratings_df)
+        ratings_df = ratings_df[known]
+        if is_partitioned():
+            self.copy_ratings(ratings_df, movie_pks)
+            self.ratings_loaded(len(ratings_df))
+            return
 
-        rating_objects = []
-        for index, row in ratings_df.iterrows():
-            if row["movieId"] in movie_map and row["userId"] in user_map:
-                rating = Rating(
-                    user=user_map[row["userId"]],
-                    movies=Movie.objects.get(movieId=row["movieId"]),
-                    rating=row["rating"],
-                    timestamp=pd.to_datetime(row["timestamp"], unit="s"),
-                )
-                rating_objects.append(rating)
-                index += 1
+        rating_objects = [
+            Rating(
+                user_id=user_id,
+                movies_id=movie_pk,
+                rating=rating,
+                timestamp=timestamp,
+            )
+            for user_id, movie_pk, rating, timestamp in zip(
+                ratings_df["userId"].tolist(),
+                movie_pks.tolist(),
+                ratings_df["rating"].tolist(),
+                pd.to_datetime(ratings_df["timestamp"], unit="s", utc=True),
+            )
+        ]
 
-        Rating.objects.bulk_create(rating_objects, batch_size=5000)
-        print(f"{len(rating_objects)} ratings loaded into the database.")
+        self.bulk_insert(Rating, rating_objects)
+        self.ratings_loaded(len(rating_objects))
+
+    def ratings_loaded(self, count):
+        """
+        Bulk inserts skip the Rating signals: rebuild the stats
+        and log one event telling consumers to rescan.
+        """
+        rebuild_rating_stats()
+        activity.record(ActivityEvent.RATINGS_LOADED, count=count)
+        print(f"{count} ratings loaded into the database.")
+
+    def copy_ratings(self, ratings_df, movie_pks):
+        """
+        COPY ratings straight into their core_rating partitions.
+        With several workers the partitions are written in
+        parallel, each committed on its own as in bulk_insert.
+        """
+        rows = pd.DataFrame(
+            {
+                "user_id": ratings_df["userId"].to_numpy(),
+                "movies_id": movie_pks,
+                "rating": ratings_df["rating"].to_numpy(),
+                "timestamp": pd.to_datetime(
+                    ratings_df["timestamp"].to_numpy(), unit="s", utc=True
+                ),
+                "created_at": timezone.now(),
+            }
+        )
+        partitions = split_by_partition(rows)
+        ensure_partitions(partitions)
+        if self.workers <= 1:
+            with transaction.atomic():
+                for item in partitions.items():
+                    copy_partition(item)
+            return
+        run_in_workers(copy_partition, partitions.items(), self.workers)
 
-    @transaction.atomic
     def load_tags(self, tags_df):
         """
         Insert tags data into the database.
         """
 
-        movie_map = {movie.movieId: movie for movie in Movie.objects.all()}
-        user_map = {user.id: user for user in get_user_model().objects.all()}
-
+        movie_pks, known = self.known_rows(tags_df)
+        tags_df = tags_df[known]
         tag_objects = [
             Tag(
-                user=user_map.get(row["userId"]),
-                movie=movie_map.get(row["movieId"]),
-                tag=row["tag"],
-                timestamp=pd.to_datetime(row["timestamp"], unit="s"),
+                user_id=user_id,
+                movie_id=movie_pk,
+                tag=tag,
+                timestamp=timestamp,
+            )
+            for user_id, movie_pk, tag, timestamp in zip(
+                tags_df["userId"].tolist(),
+                movie_pks.tolist(),
+                tags_df["tag"].tolist(),
+                pd.to_datetime(tags_df["timestamp"], unit="s", utc=True),
             )
-            for index, row in tags_df.iterrows()
-            if row["movieId"] in movie_map and row["userId"] in user_map
         ]
 
-        Tag.objects.bulk_create(tag_objects, batch_size=5000)
+        self.bulk_insert(Tag, tag_objects)
         print(f"{len(tag_objects)} tags loaded into the database.")
 
     @transaction.atomic
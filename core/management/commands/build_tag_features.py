@@ -0,0 +1,48 @@
+"""
+Django command to build and persist tag-based movie features
+"""
+
+import pandas as pd
+from django.core.management.base import BaseCommand
+from src.tag_features import TagFeatures
+
+
+class Command(BaseCommand):
+    """
+    Django command to aggregate MovieLens tags into a
+    TF-IDF/BM25 movie feature matrix saved as .npz
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default="ml-32m/")
+        parser.add_argument("--output", default="ml-32m/tag_features.npz")
+        parser.add_argument(
+            "--weighting", choices=TagFeatures.WEIGHTINGS, default="tfidf"
+        )
+        parser.add_argument(
+            "--components",
+            type=int,
+            default=None,
+            help="Reduce with truncated SVD to this many dimensions.",
+        )
+        parser.add_argument("--min-df", type=int, default=2)
+
+    def handle(self, *args, **options):
+        self.stdout.write("Building tag features...")
+        path = options["path"]
+        movies = pd.read_csv(f"{path}movies.csv", usecols=["movieId"])
+        tags = pd.read_csv(f"{path}tags.csv", usecols=["movieId", "tag"])
+
+        features = TagFeatures(
+            weighting=options["weighting"],
+            n_components=options["components"],
+            min_df=options["min_df"],
+        ).fit(tags, movies)
+        features.save(options["output"])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Saved {features.matrix.shape} tag features "
+                f"to {options['output']}"
+            )
+        )
@@ -0,0 +1,97 @@
+"""
+Django command to measure the accuracy of the SVD recommender
+on held-out ratings
+"""
+
+from django.core.management.base import BaseCommand
+from core.jobs import no_progress
+from core.management.commands.train_recommender import load_ratings
+from src.evaluator import Evaluator
+from src.lazy import surprise, surprise_model_selection
+from src.profiling import RunReport
+
+
+def evaluate_svd(
+    path="ml-32m/",
+    from_db=False,
+    factors=100,
+    epochs=20,
+    seed=0,
+    test_size=0.2,
+    k=10,
+    progress=no_progress,
+):
+    """
+    Fit SVD on a random training split of the ratings and return
+    RMSE and Precision@k on the rest.
+    """
+    report = RunReport("evaluate_recommender")
+    with report.stage("load") as info:
+        ratings = load_ratings(path, from_db)
+        info["items"] = len(ratings)
+    progress(0.1, f"Loaded {len(ratings)} ratings")
+
+    data = surprise.Dataset.load_from_df(
+        ratings, surprise.Reader(rating_scale=(0.5, 5))
+    )
+    trainset, testset = surprise_model_selection.train_test_split(
+        data, test_size=test_size, random_state=seed
+    )
+    svd = surprise.SVD(n_factors=factors, n_epochs=epochs, random_state=seed)
+    with report.stage("fit", items=trainset.n_ratings):
+        svd.fit(trainset)
+    progress(0.8, "Fitted model")
+
+    predictions = svd.test(testset)
+    evaluator = Evaluator(report=report)
+    return {
+        "ratings": len(ratings),
+        "test_ratings": len(testset),
+        "rmse": float(evaluator.evaluate_rmse(predictions)),
+        "k": k,
+        "precision_at_k": float(
+            evaluator.evaluate_precision_at_k(predictions, k)
+        ),
+    }
+
+
+class Command(BaseCommand):
+    """
+    Django command to evaluate SVD on a train/test split of the
+    MovieLens CSVs or the database
+    """
+
+    stealth_options = ("progress",)
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default="ml-32m/")
+        parser.add_argument(
+            "--from-db",
+            action="store_true",
+            help="Evaluate on the ratings stored in the database.",
+        )
+        parser.add_argument("--factors", type=int, default=100)
+        parser.add_argument("--epochs", type=int, default=20)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--test-size", type=float, default=0.2)
+        parser.add_argument("--k", type=int, default=10)
+
+    def handle(self, *args, **options):
+        self.stdout.write("Evaluating recommender...")
+        metrics = evaluate_svd(
+            path=options["path"],
+            from_db=options["from_db"],
+            factors=options["factors"],
+            epochs=options["epochs"],
+            seed=options["seed"],
+            test_size=options["test_size"],
+            k=options["k"],
+            progress=options.get("progress") or no_progress,
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"RMSE {metrics['rmse']:.4f}, Precision@{metrics['k']} "
+                f"{metrics['precision_at_k']:.4f} on "
+                f"{metrics['test_ratings']} held-out ratings"
+            )
+        )
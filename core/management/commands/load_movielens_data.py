@@ -1,4 +1,5 @@
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from core.jobs import no_progress
 from core.load_data_ml import MovieLensDataLoader
 
 
@@ -7,14 +8,30 @@ class Command(BaseCommand):
     Django command to load the MovieLens dataset into the database
     """
 
+    stealth_options = ("progress",)
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default="ml-32m/")
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Threads inserting ratings and tags, one connection each.",
+        )
+
     def handle(self, *args, **options):
         self.stdout.write("Loading MovieLens data into the database...")
 
         # Initialize the data loader with the path to your dataset
-        loader = MovieLensDataLoader(path="ml-32m/")
+        loader = MovieLensDataLoader(
+            path=options["path"],
+            workers=options["workers"],
+            progress=options.get("progress") or no_progress,
+        )
 
         # Load the data into the database
-        loader.load_data()
+        if not loader.load_data():
+            raise CommandError(f"Could not read the dataset in {loader.path}")
 
         self.stdout.write(
             self.style.SUCCESS("MovieLens data loaded successfully!")
@@ -0,0 +1,62 @@
+"""
+Django command to precompute top-n recommendations for
+every user into the table served by the recommendations API
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from core.jobs import no_progress
+from core.management.commands.train_recommender import load_ratings
+from src.factor_model import FactorModel
+from src.profiling import RunReport
+from src.topn_table import TopNTable
+
+
+class Command(BaseCommand):
+    """
+    Django command to score all users of the current factor
+    model in chunks and write a memory-mappable TopNTable
+    """
+
+    stealth_options = ("progress",)
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default="ml-32m/")
+        parser.add_argument(
+            "--from-db",
+            action="store_true",
+            help="Exclude the rated movies stored in the database.",
+        )
+        parser.add_argument("--model", default=None)
+        parser.add_argument("--output", default=None)
+        parser.add_argument("--top-n", type=int, default=100)
+        parser.add_argument("--chunk-size", type=int, default=1024)
+
+    def handle(self, *args, **options):
+        self.stdout.write("Precomputing recommendations...")
+        output = options["output"] or settings.RECOMMENDER_TOPN_PATH
+        report = RunReport("precompute_recommendations")
+        progress = options.get("progress") or no_progress
+
+        model = FactorModel.load(
+            options["model"] or settings.RECOMMENDER_MODEL_PATH
+        )
+        with report.stage("load") as info:
+            ratings = load_ratings(options["path"], options["from_db"])
+            info["items"] = len(ratings)
+        progress(0.2, f"Loaded {len(ratings)} ratings")
+        with report.stage("build", items=len(model.user_ids)):
+            table = TopNTable.build(
+                model,
+                ratings,
+                top_n=options["top_n"],
+                chunk_size=options["chunk_size"],
+            )
+        progress(0.9, "Scored all users")
+        table.save(output)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Saved top-{table.top_n} recommendations for "
+                f"{len(table.user_ids)} users to {output}"
+            )
+        )
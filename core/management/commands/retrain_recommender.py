@@ -0,0 +1,212 @@
+"""
+Django command to retrain the published factor model on the
+ratings added since it was trained, warm-starting from it
+"""
+
+import os
+
+import pandas as pd
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from core.jobs import no_progress
+from core.management.commands.train_recommender import (
+    COLUMNS,
+    activity_offset,
+    load_ratings,
+    snapshot_metadata,
+)
+from core.models import ActivityEvent, Movie
+from src.factor_model import FactorModel
+from src.profiling import RunReport
+from src.retraining import publish, read_metadata, retrain
+
+
+def database_delta(ratings, offset):
+    """
+    Return the rows of a database snapshot created or changed
+    after activity event offset, or None when a bulk load since
+    then makes the changes unknown.
+    """
+    events = ActivityEvent.objects.filter(id__gt=offset)
+    if events.filter(kind=ActivityEvent.RATINGS_LOADED).exists():
+        return None
+    pairs = pd.DataFrame.from_records(
+        list(
+            events.filter(
+                kind__in=[
+                    ActivityEvent.RATING_CREATED,
+                    ActivityEvent.RATING_UPDATED,
+                ]
+            )
+            .values_list("user_id", "movie_id")
+            .distinct()
+        ),
+        columns=["userId", "movie_pk"],
+    )
+    movie_ids = dict(
+        Movie.objects.filter(id__in=pairs["movie_pk"].tolist()).values_list(
+            "id", "movieId"
+        )
+    )
+    pairs["movieId"] = pairs["movie_pk"].map(movie_ids)
+    return ratings.merge(
+        pairs[["userId", "movieId"]].dropna().astype(ratings["movieId"].dtype),
+        on=["userId", "movieId"],
+    )
+
+
+def snapshot_delta(ratings, metadata, from_db):
+    """
+    Return the ratings added since the model described by
+    metadata was trained, or None when that is unknown.
+    """
+    if from_db and "activity_offset" in metadata:
+        return database_delta(ratings, metadata["activity_offset"])
+    if not from_db and "trained_until" in metadata:
+        return ratings[ratings["timestamp"] > metadata["trained_until"]]
+    return None
+
+
+class Command(BaseCommand):
+    """
+    Django command to warm-start SVD from the published model,
+    train a few epochs on the new ratings and publish the result
+    as a new version if it beats the old one on held-out new
+    ratings. Without a usable previous model (or with --full)
+    it trains from scratch, still compared against the
+    published model unless --force is given.
+    """
+
+    stealth_options = ("progress",)
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default="ml-32m/")
+        parser.add_argument(
+            "--from-db",
+            action="store_true",
+            help="Train on the ratings stored in the database.",
+        )
+        parser.add_argument("--model", default=None)
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Train from scratch instead of warm-starting.",
+        )
+        parser.add_argument("--factors", type=int, default=100)
+        parser.add_argument("--epochs", type=int, default=20)
+        parser.add_argument("--warm-epochs", type=int, default=5)
+        parser.add_argument("--lr", type=float, default=0.005)
+        parser.add_argument(
+            "--replay",
+            type=float,
+            default=0.1,
+            help="Fraction of older ratings replayed in warm training.",
+        )
+        parser.add_argument("--holdout", type=float, default=0.1)
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.0,
+            help="RMSE increase on the holdout still promoted.",
+        )
+        parser.add_argument(
+            "--min-delta",
+            type=int,
+            default=1000,
+            help="Skip warm retraining below this many new ratings.",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Publish even if the published model does better.",
+        )
+        parser.add_argument(
+            "--refit",
+            action="store_true",
+            help="Refit a promoted model with the holdout ratings.",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        self.stdout.write("Retraining recommender...")
+        path = options["model"] or settings.RECOMMENDER_MODEL_PATH
+        report = RunReport("retrain_recommender")
+        progress = options.get("progress") or no_progress
+
+        previous, metadata = None, {}
+        if os.path.exists(path):
+            previous, metadata = FactorModel.load(path), read_metadata(path)
+
+        offset = activity_offset() if options["from_db"] else None
+        with report.stage("load") as info:
+            ratings = load_ratings(
+                options["path"],
+                options["from_db"],
+                timestamps=not options["from_db"],
+            )
+            info["items"] = len(ratings)
+        delta = None
+        if previous is not None:
+            delta = snapshot_delta(ratings, metadata, options["from_db"])
+        warm = delta is not None and not options["full"]
+        if warm and len(delta) < options["min_delta"]:
+            self.stdout.write(
+                f"Only {len(delta)} new ratings since version "
+                f"{metadata.get('version')}; nothing to do."
+            )
+            return
+        progress(0.1, f"Loaded {len(ratings)} ratings")
+
+        # Warm starts keep the published model's factor count
+        factors = (
+            previous.user_factors.shape[1] if warm else options["factors"]
+        )
+        epochs = options["warm_epochs"] if warm else options["epochs"]
+        result = retrain(
+            ratings[COLUMNS],
+            previous=previous,
+            delta=None if delta is None else delta[COLUMNS],
+            factors=factors,
+            epochs=options["epochs"],
+            warm_epochs=options["warm_epochs"],
+            lr=options["lr"],
+            replay=options["replay"],
+            holdout=options["holdout"],
+            # --force promotes whatever the published model scores
+            tolerance=(
+                float("inf") if options["force"] else options["tolerance"]
+            ),
+            cold=not warm,
+            refit=options["refit"],
+            seed=options["seed"],
+            report=report,
+            callback=lambda epoch: progress(
+                0.1 + 0.8 * (epoch + 1) / epochs, f"Epoch {epoch + 1}"
+            ),
+        )
+        summary = (
+            f"{result['mode'].capitalize()} retraining on "
+            f"{result['trained']} ratings: holdout RMSE {result['rmse']}"
+            f" (previous {result['previous_rmse']})"
+        )
+        if not result["promote"]:
+            self.stdout.write(self.style.WARNING(f"{summary}; not promoted."))
+            return
+
+        published = publish(
+            result["model"],
+            path,
+            {
+                **snapshot_metadata(ratings, offset),
+                "mode": result["mode"],
+                "rmse": result["rmse"],
+                "previous_rmse": result["previous_rmse"],
+                "refit": result["refit"],
+                "previous_version": metadata.get("version"),
+            },
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{summary}; published version {published['version']}."
+            )
+        )
@@ -0,0 +1,72 @@
+"""
+Django command running queued background jobs
+"""
+
+import os
+import socket
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from core import jobs
+from core.models import Job
+
+
+class Command(BaseCommand):
+    """
+    Django command claiming and running jobs one at a time. Run
+    several workers for parallelism; JOB_CONCURRENCY and
+    JOB_MAX_RUNNING cap what they run between them. Workers
+    also queue the periodic jobs of JOB_SCHEDULE.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--kinds",
+            nargs="+",
+            choices=[kind for kind, _ in Job.KINDS],
+            help="Only run jobs of these kinds.",
+        )
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="Exit once no queued job can start.",
+        )
+        parser.add_argument("--interval", type=float, default=2.0)
+        parser.add_argument("--max-jobs", type=int, default=None)
+
+    def handle(self, *args, **options):
+        worker = f"{socket.gethostname()}:{os.getpid()}"
+        self.stdout.write(f"Worker {worker} waiting for jobs...")
+        done = 0
+        while options["max_jobs"] is None or done < options["max_jobs"]:
+            close_old_connections()
+            for kind, entry in settings.JOB_SCHEDULE.items():
+                scheduled = jobs.schedule(
+                    kind, entry["every"], entry.get("params")
+                )
+                if scheduled:
+                    self.stdout.write(f"Scheduled job {scheduled}")
+            reaped = jobs.reap_stale()
+            if reaped:
+                self.stdout.write(
+                    self.style.WARNING(f"Failed {reaped} stale jobs")
+                )
+            job = jobs.claim(worker, options["kinds"])
+            if job is None:
+                if options["burst"]:
+                    break
+                time.sleep(options["interval"])
+                continue
+
+            self.stdout.write(f"Running job {job}")
+            with jobs.heartbeat(job):
+                jobs.run_job(job)
+            style = (
+                self.style.SUCCESS
+                if job.status == Job.SUCCEEDED
+                else self.style.ERROR
+            )
+            self.stdout.write(style(f"Finished job {job}"))
+            done += 1
@@ -0,0 +1,122 @@
+"""
+Django command to seed the database with a synthetic
+MovieLens sample and load-test users
+"""
+
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.authtoken.models import Token
+from core.models import Movie, Rating, Tag
+from core.stats import rebuild_rating_stats
+from src.synthetic import generate_movielens
+
+
+class Command(BaseCommand):
+    """
+    Django command to create load-test users, movies, ratings
+    and tags from a synthetic MovieLens sample
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=100)
+        parser.add_argument("--movies", type=int, default=2000)
+        parser.add_argument("--ratings", type=int, default=20000)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--password", default="loadtest123")
+        parser.add_argument(
+            "--email-pattern", default="loadtest{}@example.com"
+        )
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        self.stdout.write("Seeding load-test data...")
+        movies_df, ratings_df, tags_df, _ = generate_movielens(
+            n_users=options["users"],
+            n_movies=options["movies"],
+            n_ratings=options["ratings"],
+            seed=options["seed"],
+        )
+
+        # Hash once: every load-test user shares the same password
+        password = make_password(options["password"])
+        User = get_user_model()
+        emails = [
+            options["email_pattern"].format(i)
+            for i in range(1, options["users"] + 1)
+        ]
+        existing = set(
+            User.objects.filter(email__in=emails).values_list(
+                "email", flat=True
+            )
+        )
+        User.objects.bulk_create(
+            [
+                User(email=email, name=email, password=password)
+                for email in emails
+                if email not in existing
+            ],
+            batch_size=5000,
+        )
+        by_email = {u.email: u for u in User.objects.filter(email__in=emails)}
+        users = [by_email[email] for email in emails]
+        Token.objects.bulk_create(
+            [Token(key=Token.generate_key(), user=user) for user in users],
+            ignore_conflicts=True,
+        )
+
+        # Movies are owned round-robin so every user can browse some
+        existing_ids = set(Movie.objects.values_list("movieId", flat=True))
+        Movie.objects.bulk_create(
+            [
+                Movie(
+                    movieId=row.movieId,
+                    title=row.title[:255],
+                    genre=row.genres[:255],
+                    user=users[i % len(users)],
+                )
+                for i, row in enumerate(movies_df.itertuples())
+                if row.movieId not in existing_ids
+            ],
+            batch_size=5000,
+        )
+        movie_map = dict(
+            Movie.objects.filter(
+                movieId__in=movies_df["movieId"].tolist()
+            ).values_list("movieId", "id")
+        )
+
+        # Rating's validators only allow 1.0 - 5.0
+        rating_objects = [
+            Rating(
+                user=users[row.userId - 1],
+                movies_id=movie_map[row.movieId],
+                rating=max(Decimal(str(row.rating)), Decimal("1.0")),
+            )
+            for row in ratings_df.itertuples()
+        ]
+        Rating.objects.bulk_create(
+            rating_objects, batch_size=5000, ignore_conflicts=True
+        )
+        rebuild_rating_stats()
+        Tag.objects.bulk_create(
+            [
+                Tag(
+                    user=users[row.userId - 1],
+                    movie_id=movie_map[row.movieId],
+                    tag=row.tag,
+                )
+                for row in tags_df.itertuples()
+            ],
+            batch_size=5000,
+            ignore_conflicts=True,
+        )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Seeded {len(users)} users, {len(movie_map)} movies, "
+                f"{len(rating_objects)} ratings."
+            )
+        )
@@ -0,0 +1,58 @@
+"""
+Django command to print the activity log as JSON lines
+"""
+
+import json
+import time
+
+from django.core.management.base import BaseCommand
+from core.activity import Consumer
+
+
+class Command(BaseCommand):
+    """
+    Django command tailing the activity log. With --consumer
+    the offset is read from and committed to that consumer;
+    otherwise reading starts at --offset and nothing is stored.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument("--consumer", default=None)
+        parser.add_argument("--offset", type=int, default=0)
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--follow",
+            action="store_true",
+            help="Keep polling for new events.",
+        )
+        parser.add_argument("--interval", type=float, default=1.0)
+
+    def handle(self, *args, **options):
+        consumer = Consumer(
+            options["consumer"] or "tail_activity",
+            batch_size=options["batch_size"],
+        )
+        offset = consumer.offset if options["consumer"] else options["offset"]
+        while True:
+            events = consumer.poll(offset)
+            for event in events:
+                self.stdout.write(
+                    json.dumps(
+                        {
+                            "offset": event.id,
+                            "kind": event.kind,
+                            "user_id": event.user_id,
+                            "movie_id": event.movie_id,
+                            "payload": event.payload,
+                            "created_at": event.created_at.isoformat(),
+                        }
+                    )
+                )
+            if events:
+                offset = events[-1].id
+                if options["consumer"]:
+                    consumer.commit(offset)
+            elif not options["follow"]:
+                return
+            else:
+                time.sleep(options["interval"])
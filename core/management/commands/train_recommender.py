@@ -0,0 +1,124 @@
+"""
+Django command to train the SVD recommender and export
+the factor model served by the recommendations API
+"""
+
+import os
+
+import pandas as pd
+from django.conf import settings
+from django.db.models import Max
+from django.core.management.base import BaseCommand
+from core.jobs import no_progress
+from core.models import ActivityEvent, Rating
+from src.factor_model import FactorModel
+from src.lazy import surprise
+from src.profiling import RunReport
+from src.retraining import publish
+
+COLUMNS = ["userId", "movieId", "rating"]
+
+
+def load_ratings(path, from_db=False, timestamps=False):
+    """
+    Return a userId, movieId, rating DataFrame read from
+    ratings.csv in path, or from the database. With timestamps
+    the CSV's timestamp column is kept too.
+    """
+    columns = COLUMNS
+    if not from_db:
+        if timestamps:
+            columns = columns + ["timestamp"]
+        ratings = pd.read_csv(
+            os.path.join(path, "ratings.csv"), usecols=columns
+        )
+        return ratings[columns]
+    rows = Rating.objects.values_list("user_id", "movies__movieId", "rating")
+    ratings = pd.DataFrame.from_records(list(rows), columns=columns)
+    ratings["rating"] = ratings["rating"].astype(float)
+    return ratings
+
+
+def activity_offset():
+    """
+    Return the id of the newest activity event. Taken before
+    ratings are read from the database, it marks the rating
+    changes a snapshot is guaranteed to include.
+    """
+    return ActivityEvent.objects.aggregate(Max("id"))["id__max"] or 0
+
+
+def snapshot_metadata(ratings, offset=None):
+    """
+    Return the model metadata describing a ratings snapshot,
+    used to find the ratings added after it.
+    """
+    metadata = {"ratings": len(ratings)}
+    if "timestamp" in ratings and len(ratings):
+        metadata["trained_until"] = int(ratings["timestamp"].max())
+    if offset is not None:
+        metadata["activity_offset"] = offset
+    return metadata
+
+
+class Command(BaseCommand):
+    """
+    Django command to fit SVD on all ratings, from the MovieLens
+    CSVs or the database, and save a FactorModel as .npz
+    """
+
+    stealth_options = ("progress",)
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default="ml-32m/")
+        parser.add_argument(
+            "--from-db",
+            action="store_true",
+            help="Train on the ratings stored in the database.",
+        )
+        parser.add_argument("--output", default=None)
+        parser.add_argument("--factors", type=int, default=100)
+        parser.add_argument("--epochs", type=int, default=20)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        self.stdout.write("Training recommender...")
+        output = options["output"] or settings.RECOMMENDER_MODEL_PATH
+        report = RunReport("train_recommender")
+        progress = options.get("progress") or no_progress
+
+        offset = activity_offset() if options["from_db"] else None
+        with report.stage("load") as info:
+            ratings = load_ratings(
+                options["path"],
+                options["from_db"],
+                timestamps=not options["from_db"],
+            )
+            info["items"] = len(ratings)
+        progress(0.1, f"Loaded {len(ratings)} ratings")
+        data = surprise.Dataset.load_from_df(
+            ratings[COLUMNS], surprise.Reader(rating_scale=(0.5, 5))
+        )
+        trainset = data.build_full_trainset()
+        svd = surprise.SVD(
+            n_factors=options["factors"],
+            n_epochs=options["epochs"],
+            random_state=options["seed"],
+        )
+        with report.stage("fit", items=trainset.n_ratings):
+            svd.fit(trainset)
+        progress(0.9, "Fitted model")
+
+        model = FactorModel.from_surprise(svd)
+        os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+        publish(
+            model,
+            output,
+            {**snapshot_metadata(ratings, offset), "mode": "full"},
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Saved factors for {len(model.user_ids)} users and "
+                f"{len(model.item_ids)} movies to {output}"
+            )
+        )
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.16 on 2026-10-19 18:20
+
+from django.conf import settings
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('core', '0008_alter_user_groups'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='rating',
+            unique_together={('user', 'movies')},
+        ),
+    ]
@@ -0,0 +1,105 @@
+"""
+Turn core_rating into a table range-partitioned by user_id on
+Postgres (see core.partitions). Postgres requires the partition
+key in every unique constraint, so the primary key becomes
+(id, user_id); id stays unique through its sequence and Django
+keeps treating it as the primary key. Other databases keep the
+plain table.
+"""
+
+from django.db import migrations
+
+# Frozen copies of the core.partitions layout at the time of this
+# migration: ten partitions of 25,000 users plus a default one
+USERS_PER_PARTITION = 25_000
+INITIAL_PARTITIONS = 10
+DEFAULT_PARTITION = "core_rating_default"
+
+
+def create_partition_sql(index):
+    low = index * USERS_PER_PARTITION
+    high = low + USERS_PER_PARTITION
+    return (
+        f"CREATE TABLE IF NOT EXISTS core_rating_p{index:03d} "
+        f"PARTITION OF core_rating FOR VALUES FROM ({low}) TO ({high})"
+    )
+
+
+COLUMNS = 'id, rating, "timestamp", created_at, movies_id, user_id'
+
+PARTITION = [
+    "ALTER TABLE core_rating RENAME TO core_rating_unpartitioned",
+    "CREATE SEQUENCE core_rating_part_id_seq AS bigint",
+    """
+    CREATE TABLE core_rating (
+        id bigint NOT NULL DEFAULT nextval('core_rating_part_id_seq'),
+        rating numeric(2, 1) NOT NULL,
+        "timestamp" timestamp with time zone NOT NULL,
+        created_at timestamp with time zone NOT NULL,
+        movies_id bigint NOT NULL REFERENCES core_movie (id)
+            DEFERRABLE INITIALLY DEFERRED,
+        user_id bigint NOT NULL REFERENCES core_user (id)
+            DEFERRABLE INITIALLY DEFERRED,
+        CONSTRAINT core_rating_part_pkey PRIMARY KEY (id, user_id),
+        CONSTRAINT core_rating_part_user_movies_uniq
+            UNIQUE (user_id, movies_id)
+    ) PARTITION BY RANGE (user_id)
+    """,
+    "ALTER SEQUENCE core_rating_part_id_seq OWNED BY core_rating.id",
+    "CREATE INDEX core_rating_part_movies_id_idx ON core_rating (movies_id)",
+    f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF core_rating DEFAULT",
+    *(create_partition_sql(index) for index in range(INITIAL_PARTITIONS)),
+    f"INSERT INTO core_rating ({COLUMNS}) "
+    f"SELECT {COLUMNS} FROM core_rating_unpartitioned",
+    "SELECT setval('core_rating_part_id_seq', COALESCE(MAX(id), 0) + 1, "
+    "false) FROM core_rating",
+    "DROP TABLE core_rating_unpartitioned",
+]
+
+UNPARTITION = [
+    "ALTER TABLE core_rating RENAME TO core_rating_partitioned",
+    """
+    CREATE TABLE core_rating (
+        id bigint GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+        rating numeric(2, 1) NOT NULL,
+        "timestamp" timestamp with time zone NOT NULL,
+        created_at timestamp with time zone NOT NULL,
+        movies_id bigint NOT NULL REFERENCES core_movie (id)
+            DEFERRABLE INITIALLY DEFERRED,
+        user_id bigint NOT NULL REFERENCES core_user (id)
+            DEFERRABLE INITIALLY DEFERRED,
+        CONSTRAINT core_rating_user_id_movies_id_uniq
+            UNIQUE (user_id, movies_id)
+    )
+    """,
+    "CREATE INDEX core_rating_movies_id_idx ON core_rating (movies_id)",
+    "CREATE INDEX core_rating_user_id_idx ON core_rating (user_id)",
+    f"INSERT INTO core_rating ({COLUMNS}) "
+    f"SELECT {COLUMNS} FROM core_rating_partitioned",
+    "SELECT setval(pg_get_serial_sequence('core_rating', 'id'), "
+    "COALESCE(MAX(id), 0) + 1, false) FROM core_rating",
+    "DROP TABLE core_rating_partitioned",
+]
+
+
+def run_on_postgres(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != "postgresql":
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0009_alter_rating_unique_together"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_on_postgres(PARTITION), run_on_postgres(UNPARTITION)
+        ),
+    ]
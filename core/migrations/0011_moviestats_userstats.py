@@ -0,0 +1,74 @@
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def stats_fields():
+    return [
+        (
+            "rating_count",
+            models.PositiveIntegerField(db_index=True, default=0),
+        ),
+        (
+            "rating_sum",
+            models.DecimalField(
+                decimal_places=1, default=Decimal("0.0"), max_digits=12
+            ),
+        ),
+        (
+            "rating_mean",
+            models.FloatField(blank=True, db_index=True, null=True),
+        ),
+        ("last_rated_at", models.DateTimeField(blank=True, null=True)),
+    ]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("core", "0010_partition_rating"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MovieStats",
+            fields=[
+                *stats_fields(),
+                (
+                    "movie",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="stats",
+                        serialize=False,
+                        to="core.movie",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "Movie stats",
+            },
+        ),
+        migrations.CreateModel(
+            name="UserStats",
+            fields=[
+                *stats_fields(),
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="rating_stats",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "User stats",
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0013_job"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="job",
+            name="kind",
+            field=models.CharField(
+                choices=[
+                    ("import", "Import MovieLens data"),
+                    ("train", "Train recommender"),
+                    ("evaluate", "Evaluate recommender"),
+                    ("precompute", "Precompute recommendations"),
+                    ("retrain", "Retrain recommender"),
+                ],
+                max_length=32,
+            ),
+        ),
+    ]
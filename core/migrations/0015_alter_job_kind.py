@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0014_alter_job_kind"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="job",
+            name="kind",
+            field=models.CharField(
+                choices=[
+                    ("import", "Import MovieLens data"),
+                    ("train", "Train recommender"),
+                    ("evaluate", "Evaluate recommender"),
+                    ("precompute", "Precompute recommendations"),
+                    ("retrain", "Retrain recommender"),
+                    ("partitions", "Create rating partitions"),
+                ],
+                max_length=32,
+            ),
+        ),
+    ]
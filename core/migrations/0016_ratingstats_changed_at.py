@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0015_alter_job_kind"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="moviestats",
+            name="changed_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="userstats",
+            name="changed_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -5,6 +5,7 @@ Database modal
 from decimal import Decimal
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.contrib.auth.models import (
     AbstractBaseUser,
@@ -101,7 +102,7 @@ class Rating(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
-        unique_together = ("user", "rating")
+        unique_together = ("user", "movies")
         verbose_name_plural = "Ratings"
         ordering = ["-created_at"]
 
@@ -192,3 +193,174 @@ class Link(models.Model):
         """
 
         return cls.objects.filter(link_type=link_type)
+
+
+class RatingStats(models.Model):
+    """
+    Rating count, sum, mean and last rating time, kept up to
+    date by core.stats so reads need no aggregation. changed_at
+    is when a rating was last created, changed or deleted.
+    """
+
+    rating_count = models.PositiveIntegerField(default=0, db_index=True)
+    rating_sum = models.DecimalField(
+        max_digits=12, decimal_places=1, default=Decimal("0.0")
+    )
+    rating_mean = models.FloatField(null=True, blank=True, db_index=True)
+    last_rated_at = models.DateTimeField(null=True, blank=True)
+    changed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        abstract = True
+
+
+class MovieStats(RatingStats):
+    """
+    Rating statistics of a movie.
+    """
+
+    movie = models.OneToOneField(
+        Movie, on_delete=models.CASCADE, primary_key=True, related_name="stats"
+    )
+
+    class Meta:
+        verbose_name_plural = "Movie stats"
+
+    def __str__(self):
+        return f"{self.movie}: {self.rating_count} ratings"
+
+
+class UserStats(RatingStats):
+    """
+    Rating statistics of a user.
+    """
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="rating_stats",
+    )
+
+    class Meta:
+        verbose_name_plural = "User stats"
+
+    def __str__(self):
+        return f"{self.user}: {self.rating_count} ratings"
+
+
+class ActivityEvent(models.Model):
+    """
+    Append-only log of rating and tag activity. The id is the
+    offset consumers tail by (see core.activity).
+    """
+
+    RATING_CREATED = "rating.created"
+    RATING_UPDATED = "rating.updated"
+    RATING_DELETED = "rating.deleted"
+    TAG_CREATED = "tag.created"
+    TAG_DELETED = "tag.deleted"
+    RATINGS_LOADED = "ratings.loaded"
+
+    KINDS = [
+        (RATING_CREATED, "Rating created"),
+        (RATING_UPDATED, "Rating updated"),
+        (RATING_DELETED, "Rating deleted"),
+        (TAG_CREATED, "Tag created"),
+        (TAG_DELETED, "Tag deleted"),
+        (RATINGS_LOADED, "Ratings bulk loaded"),
+    ]
+
+    kind = models.CharField(max_length=32, choices=KINDS)
+    # Plain ids rather than foreign keys: events outlive their rows
+    user_id = models.BigIntegerField(null=True, blank=True)
+    movie_id = models.BigIntegerField(null=True, blank=True)
+    payload = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ["id"]
+
+    def __str__(self):
+        return f"#{self.id} {self.kind}"
+
+
+class ConsumerOffset(models.Model):
+    """
+    Last ActivityEvent id processed by a named consumer.
+    """
+
+    name = models.CharField(max_length=100, primary_key=True)
+    offset = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} at {self.offset}"
+
+
+class Job(models.Model):
+    """
+    A background job in the queue run by `manage.py run_jobs`
+    (see core.jobs).
+    """
+
+    IMPORT = "import"
+    TRAIN = "train"
+    EVALUATE = "evaluate"
+    PRECOMPUTE = "precompute"
+    RETRAIN = "retrain"
+    PARTITIONS = "partitions"
+
+    KINDS = [
+        (IMPORT, "Import MovieLens data"),
+        (TRAIN, "Train recommender"),
+        (EVALUATE, "Evaluate recommender"),
+        (PRECOMPUTE, "Precompute recommendations"),
+        (RETRAIN, "Retrain recommender"),
+        (PARTITIONS, "Create rating partitions"),
+    ]
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    STATUSES = [
+        (QUEUED, "Queued"),
+        (RUNNING, "Running"),
+        (SUCCEEDED, "Succeeded"),
+        (FAILED, "Failed"),
+        (CANCELLED, "Cancelled"),
+    ]
+
+    FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+    kind = models.CharField(max_length=32, choices=KINDS)
+    params = models.JSONField(default=dict, blank=True)
+    status = models.CharField(
+        max_length=16, choices=STATUSES, default=QUEUED
+    )
+    progress = models.FloatField(default=0.0)
+    message = models.CharField(max_length=255, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    cancel_requested = models.BooleanField(default=False)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+    )
+    worker = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-id"]
+        indexes = [models.Index(fields=["status", "kind"])]
+
+    def __str__(self):
+        return f"#{self.id} {self.kind} ({self.status})"
@@ -0,0 +1,172 @@
+"""
+Range partitioning of core_rating by user_id on Postgres.
+
+Partition i holds users [i * USERS_PER_PARTITION,
+(i + 1) * USERS_PER_PARTITION), so every per-user query
+(WHERE user_id = ...) is pruned to a single partition.
+
+Partitions are created ahead of the user ids in use: when a user
+is created (user_created), by the periodic partitions job
+(ensure_partitions_ahead) and by the COPY loader. Ratings of
+users beyond the created ranges land in the default partition;
+ensure_partitions moves them out when it adds their range.
+"""
+
+from django.db import connection as default_connection
+from django.db import connections, transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+RATING_TABLE = "core_rating"
+DEFAULT_PARTITION = "core_rating_default"
+USERS_PER_PARTITION = 25_000
+# Partitions created by the migration: users below 250,000
+INITIAL_PARTITIONS = 10
+# Partitions kept ready past the one of the newest user
+PARTITIONS_AHEAD = 1
+MOVED_TABLE = "core_rating_moved"
+
+# Partition indices known to exist, checked once per process
+_known = set()
+
+
+def partition_name(index):
+    """
+    Return the table name of partition index.
+    """
+    return f"{RATING_TABLE}_p{index:03d}"
+
+
+def partition_index(user_ids):
+    """
+    Return the partition index of a user id, or of each id in
+    an integer array or Series.
+    """
+    return user_ids // USERS_PER_PARTITION
+
+
+def partition_bounds(index):
+    """
+    Return the (inclusive, exclusive) user_id range of a partition.
+    """
+    return index * USERS_PER_PARTITION, (index + 1) * USERS_PER_PARTITION
+
+
+def create_partition_sql(index):
+    """
+    Return the DDL attaching partition index to core_rating.
+    """
+    low, high = partition_bounds(index)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(index)} "
+        f"PARTITION OF {RATING_TABLE} FOR VALUES FROM ({low}) TO ({high})"
+    )
+
+
+def is_partitioned(connection=default_connection):
+    """
+    Return whether core_rating is a partitioned Postgres table.
+    """
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table "
+            "WHERE partrelid = %s::regclass",
+            [RATING_TABLE],
+        )
+        return cursor.fetchone() is not None
+
+
+def partition_exists(index, connection=default_connection):
+    """
+    Return whether the table of partition index exists.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT to_regclass(%s)", [partition_name(index)])
+        return cursor.fetchone()[0] is not None
+
+
+def ensure_partitions(indices, connection=default_connection):
+    """
+    Create the missing partitions among indices and return the
+    indices created. Postgres refuses a new partition while rows
+    of its range sit in the default partition, so those rows are
+    moved into it in the same transaction. Does nothing unless
+    core_rating is partitioned.
+    """
+    if not is_partitioned(connection):
+        return []
+    created = []
+    for index in sorted(set(int(index) for index in indices)):
+        if partition_exists(index, connection):
+            continue
+        low, high = partition_bounds(index)
+        with transaction.atomic(using=connection.alias):
+            with connection.cursor() as cursor:
+                # Serializes creators and holds off rating writes
+                # until the rows are moved
+                cursor.execute(
+                    f"LOCK TABLE {RATING_TABLE} IN SHARE ROW EXCLUSIVE MODE"
+                )
+                if partition_exists(index, connection):
+                    continue
+                cursor.execute(
+                    f"CREATE TEMPORARY TABLE {MOVED_TABLE} (LIKE {RATING_TABLE})"
+                )
+                cursor.execute(
+                    f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+                    "WHERE user_id >= %s AND user_id < %s RETURNING *) "
+                    f"INSERT INTO {MOVED_TABLE} SELECT * FROM moved",
+                    [low, high],
+                )
+                cursor.execute(create_partition_sql(index))
+                cursor.execute(
+                    f"INSERT INTO {RATING_TABLE} SELECT * FROM {MOVED_TABLE}"
+                )
+                cursor.execute(f"DROP TABLE {MOVED_TABLE}")
+        created.append(index)
+    return created
+
+
+def ensure_partitions_ahead(connection=default_connection):
+    """
+    Create the partitions of every user id up to PARTITIONS_AHEAD
+    past the newest user, moving their ratings out of the default
+    partition. Returns the indices created.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM core_user")
+        newest = partition_index(cursor.fetchone()[0])
+    return ensure_partitions(range(newest + PARTITIONS_AHEAD + 1), connection)
+
+
+@receiver(post_save, sender="core.User")
+def user_created(sender, instance, created, raw=False, using=None, **kwargs):
+    """
+    Create the partition of a new user and PARTITIONS_AHEAD after
+    it once the user is committed, before their ratings arrive.
+    """
+    if not created or raw:
+        return
+    first = partition_index(instance.pk)
+    missing = set(range(first, first + PARTITIONS_AHEAD + 1)) - _known
+    if not missing:
+        return
+    connection = connections[using]
+
+    def create():
+        ensure_partitions(missing, connection)
+        _known.update(missing)
+
+    transaction.on_commit(create, using=using)
+
+
+def split_by_partition(frame, user_column="user_id"):
+    """
+    Return {partition index: rows} for a frame of ratings.
+    """
+    indices = partition_index(frame[user_column])
+    return {
+        int(index): rows for index, rows in frame.groupby(indices, sort=True)
+    }
@@ -0,0 +1,249 @@
+"""
+Query counting, timing and N+1 detection for requests and tests.
+"""
+
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from asgiref.sync import (
+    iscoroutinefunction,
+    markcoroutinefunction,
+    sync_to_async,
+)
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+PLACEHOLDER_LIST = re.compile(r"\((?:\s*(?:%s|\?)\s*,)+\s*(?:%s|\?)\s*\)")
+WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(sql):
+    """
+    Return the shape of a SQL statement: literals and
+    parameter lists are replaced so that queries differing
+    only by their parameters compare equal.
+    """
+    sql = STRING_LITERAL.sub("?", sql)
+    sql = NUMBER_LITERAL.sub("?", sql)
+    sql = sql.replace("%s", "?")
+    sql = PLACEHOLDER_LIST.sub("(...)", sql)
+    return WHITESPACE.sub(" ", sql).strip()
+
+
+class QueryBudgetExceeded(AssertionError):
+    """
+    Raised when a request or block runs more queries
+    than its budget allows.
+    """
+
+
+class QueryRecorder:
+    """
+    Context manager that records every SQL statement executed
+    on all database connections with its duration.
+    """
+
+    def __init__(self):
+        self.queries = []
+        self._stack = None
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        for connection in connections.all():
+            self._stack.enter_context(connection.execute_wrapper(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stack.close()
+        return False
+
+    def __call__(self, execute, sql, params, many, context):
+        """
+        Execute wrapper: time the statement and record it.
+        """
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, time.perf_counter() - start))
+
+    @property
+    def count(self):
+        """
+        Number of recorded queries.
+        """
+        return len(self.queries)
+
+    @property
+    def total_seconds(self):
+        """
+        Total time spent executing the recorded queries.
+        """
+        return sum(duration for _, duration in self.queries)
+
+    def repeated_shapes(self, threshold=2):
+        """
+        Return {shape: count} for query shapes executed at least
+        threshold times, the signature of an N+1 pattern.
+        """
+        shapes = Counter(normalize_sql(sql) for sql, _ in self.queries)
+        return {s: n for s, n in shapes.items() if n >= threshold}
+
+    def report(self, threshold=2):
+        """
+        Return a human-readable summary of the recorded queries.
+        """
+        lines = [f"{self.count} queries in {self.total_seconds * 1000:.1f}ms"]
+        for shape, count in self.repeated_shapes(threshold).items():
+            lines.append(f"  {count}x {shape}")
+        return "\n".join(lines)
+
+
+class QueryBudgetMiddleware:
+    """
+    Counts and times SQL per request. Adds X-Query-Count and
+    X-Query-Time-Ms headers, logs repeated query shapes and
+    requests over the per-view budget in QUERY_BUDGETS
+    (keyed by URL name, e.g. "movies:movie-list", or by method
+    and URL name, e.g. "POST rating:rating-list"), and raises
+    QueryBudgetExceeded when QUERY_BUDGET_RAISE is set.
+
+    Under ASGI the middleware stays async so async views are not
+    forced onto a thread. Sync views and the async ORM run on the
+    request's thread-sensitive sync_to_async thread, so the
+    recorder is installed on that thread's connections.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not getattr(settings, "QUERY_BUDGET_ENABLED", False):
+            return self.get_response(request)
+
+        with QueryRecorder() as recorder:
+            response = self.get_response(request)
+        return self.finish(request, response, recorder)
+
+    async def __acall__(self, request):
+        if not getattr(settings, "QUERY_BUDGET_ENABLED", False):
+            return await self.get_response(request)
+
+        recorder = QueryRecorder()
+        await sync_to_async(recorder.__enter__)()
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(recorder.__exit__)(None, None, None)
+        return self.finish(request, response, recorder)
+
+    def finish(self, request, response, recorder):
+        """
+        Add the query headers and check the request's budget.
+        """
+        response["X-Query-Count"] = str(recorder.count)
+        response["X-Query-Time-Ms"] = f"{recorder.total_seconds * 1000:.2f}"
+        self.check(request, recorder)
+        return response
+
+    def check(self, request, recorder):
+        """
+        Log or raise when the request looks like an N+1 or
+        exceeds its declared budget.
+        """
+        match = request.resolver_match
+        view_name = match.view_name if match else None
+        threshold = getattr(settings, "QUERY_BUDGET_REPEAT_THRESHOLD", 5)
+        repeated = recorder.repeated_shapes(threshold)
+        if repeated:
+            logger.warning(
+                "Repeated queries on %s %s (possible N+1):\n%s",
+                request.method,
+                request.path,
+                recorder.report(threshold),
+            )
+
+        budgets = getattr(settings, "QUERY_BUDGETS", {})
+        budget = budgets.get(
+            f"{request.method} {view_name}", budgets.get(view_name)
+        )
+        if budget is not None and recorder.count > budget:
+            message = (
+                f"{request.method} {request.path} ({view_name}) ran "
+                f"{recorder.count} queries, budget is {budget}.\n"
+                f"{recorder.report()}"
+            )
+            if getattr(settings, "QUERY_BUDGET_RAISE", False):
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+
+
+class QueryBudgetTestMixin:
+    """
+    TestCase mixin providing assertQueryBudget.
+    """
+
+    def assertQueryBudget(self, max_queries, max_repeats=None):
+        """
+        Context manager failing the test when the block runs
+        more than max_queries queries, or any query shape more
+        than max_repeats times.
+
+            with self.assertQueryBudget(3, max_repeats=1):
+                self.client.get(MOVIES_URL)
+        """
+        return _QueryBudgetContext(self, max_queries, max_repeats)
+
+    def assertViewQueryBudget(self, view_name, max_repeats=1):
+        """
+        assertQueryBudget using the budget declared for the URL
+        name in settings.QUERY_BUDGETS.
+        """
+        return self.assertQueryBudget(
+            settings.QUERY_BUDGETS[view_name], max_repeats
+        )
+
+
+class _QueryBudgetContext(QueryRecorder):
+    """
+    QueryRecorder that asserts the budget on exit.
+    """
+
+    def __init__(self, test_case, max_queries, max_repeats):
+        super().__init__()
+        self.test_case = test_case
+        self.max_queries = max_queries
+        self.max_repeats = max_repeats
+
+    def __exit__(self, exc_type, *exc_info):
+        super().__exit__(exc_type, *exc_info)
+        if exc_type is not None:
+            return False
+        if self.count > self.max_queries:
+            self.test_case.fail(
+                f"Query budget exceeded: {self.count} > "
+                f"{self.max_queries}.\n{self.report()}"
+            )
+        if self.max_repeats is not None:
+            repeated = self.repeated_shapes(self.max_repeats + 1)
+            if repeated:
+                self.test_case.fail(
+                    f"Query shape repeated more than {self.max_repeats} "
+                    f"times.\n{self.report(self.max_repeats + 1)}"
+                )
+        return False
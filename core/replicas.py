@@ -0,0 +1,132 @@
+"""
+Read-replica routing. Reads go to the primary unless the code
+runs inside replica_reads(), which read-only viewset actions
+and the recommendations endpoint enter. A user who just wrote
+through the API is pinned to the primary for a few seconds so
+they read their own writes despite replication lag.
+"""
+
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.permissions import SAFE_METHODS
+
+# Whether reads in the current request may use a replica
+_replica_reads = ContextVar("replica_reads", default=False)
+
+
+def replicas():
+    """
+    Return the configured replica aliases.
+    """
+    return getattr(settings, "DATABASE_REPLICAS", [])
+
+
+def choose_replica():
+    """
+    Return a random replica alias.
+    """
+    return random.choice(replicas())
+
+
+@contextmanager
+def replica_reads(enabled=True):
+    """
+    Let reads inside the block go to a replica.
+    """
+    token = _replica_reads.set(enabled)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def _pin_key(user_id):
+    return f"replicas:pinned:{user_id}"
+
+
+def pin_to_primary(user):
+    """
+    Send the user's replica reads to the primary for
+    REPLICA_PIN_SECONDS.
+    """
+    cache.set(_pin_key(user.pk), True, settings.REPLICA_PIN_SECONDS)
+
+
+def is_pinned(user):
+    """
+    Return whether the user wrote recently.
+    """
+    return bool(cache.get(_pin_key(user.pk)))
+
+
+async def ais_pinned(user):
+    """
+    Async is_pinned.
+    """
+    return bool(await cache.aget(_pin_key(user.pk)))
+
+
+class ReplicaRouter:
+    """
+    Route reads to a replica inside replica_reads() and
+    everything else to the primary. Replicas are copies of the
+    primary, so they are never migrated.
+    """
+
+    def db_for_read(self, model, **hints):
+        if _replica_reads.get() and replicas():
+            return choose_replica()
+        return None
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in replicas():
+            return False
+        return None
+
+
+class PinOnWriteMixin:
+    """
+    Viewset mixin pinning the user to the primary after a
+    successful write.
+    """
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        if (
+            request.method not in SAFE_METHODS
+            and response.status_code < 400
+            and request.user.is_authenticated
+        ):
+            pin_to_primary(request.user)
+        return response
+
+
+class ReplicaReadMixin(PinOnWriteMixin):
+    """
+    Viewset mixin serving replica_actions from a replica unless
+    the user is pinned to the primary.
+    """
+
+    replica_actions = ("list", "retrieve")
+
+    def dispatch(self, request, *args, **kwargs):
+        with replica_reads(False):
+            return super().dispatch(request, *args, **kwargs)
+
+    def initial(self, request, *args, **kwargs):
+        # Authentication and permission checks read the primary
+        super().initial(request, *args, **kwargs)
+        if self.action in self.replica_actions and not is_pinned(request.user):
+            _replica_reads.set(True)
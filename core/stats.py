@@ -0,0 +1,230 @@
+"""
+Materialized per-movie and per-user rating statistics.
+
+MovieStats and UserStats are rebuilt in bulk by the loader
+(rebuild_rating_stats) and kept current by the Rating signals
+below: each save or delete adjusts the affected rows with one
+relative UPDATE (or upsert), so concurrent writes do not lose
+counts. QuerySet.update() and bulk_create bypass signals;
+run rebuild_rating_stats after bulk changes.
+"""
+
+from decimal import Decimal
+
+from django.db import connections, router, transaction
+from django.db.models import (
+    Count,
+    DateTimeField,
+    F,
+    FloatField,
+    Max,
+    Sum,
+    Value,
+)
+from django.db.models.functions import Cast, Coalesce, Greatest, NullIf
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+from core.models import Movie, MovieStats, Rating, UserStats
+
+BATCH_SIZE = 5000
+
+# Stats models and the Rating field holding their key
+TARGETS = (
+    (MovieStats, "movies_id"),
+    (UserStats, "user_id"),
+)
+
+
+UPSERT = """
+INSERT INTO {table} ({key}, rating_count, rating_sum, rating_mean,
+    last_rated_at, changed_at)
+VALUES (%s, %s, %s, %s, %s, %s)
+ON CONFLICT ({key}) DO UPDATE SET
+    rating_count = {table}.rating_count + excluded.rating_count,
+    rating_sum = {table}.rating_sum + excluded.rating_sum,
+    rating_mean = ({table}.rating_sum + excluded.rating_sum) * 1.0
+        / NULLIF({table}.rating_count + excluded.rating_count, 0),
+    last_rated_at = COALESCE(
+        {greatest}({table}.last_rated_at, excluded.last_rated_at),
+        excluded.last_rated_at
+    ),
+    changed_at = excluded.changed_at
+"""
+
+
+def _change(model, pk, count, delta, rated_at):
+    """
+    Add count ratings summing to delta to one stats row. New
+    ratings upsert the row in one statement (Postgres and
+    SQLite); changes and deletes only update an existing row.
+    Every change sets changed_at.
+    """
+    now = timezone.now()
+    if count <= 0:
+        values = {
+            "changed_at": now,
+            "rating_count": F("rating_count") + count,
+            "rating_sum": F("rating_sum") + delta,
+            # SET expressions see the old row, so the mean is
+            # recomputed from the old sum and count plus the change
+            "rating_mean": Cast(F("rating_sum") + delta, FloatField())
+            / NullIf(F("rating_count") + count, 0),
+        }
+        if rated_at is not None:
+            latest = Value(rated_at, output_field=DateTimeField())
+            # SQLite's max() is NULL when either side is
+            values["last_rated_at"] = Coalesce(
+                Greatest(F("last_rated_at"), latest), latest
+            )
+        model.objects.filter(pk=pk).update(**values)
+        return
+    connection = connections[router.db_for_write(model)]
+    ops = connection.ops
+    sql = UPSERT.format(
+        table=ops.quote_name(model._meta.db_table),
+        key=ops.quote_name(model._meta.pk.column),
+        greatest="GREATEST" if connection.vendor == "postgresql" else "MAX",
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            sql,
+            [
+                pk,
+                count,
+                ops.adapt_decimalfield_value(delta, 12, 1),
+                float(delta) / count,
+                ops.adapt_datetimefield_value(rated_at),
+                ops.adapt_datetimefield_value(now),
+            ],
+        )
+
+
+def apply_rating_change(rating, count, delta, rated_at=None):
+    """
+    Apply a change of count ratings and delta rating points to
+    the stats of the rating's movie and user.
+    """
+    for model, field in TARGETS:
+        _change(model, getattr(rating, field), count, delta, rated_at)
+
+
+def _stats_objects(model, key, rows):
+    """
+    Build stats rows from (key, count, total, last) aggregates,
+    all changed now.
+    """
+    now = timezone.now()
+    return [
+        model(
+            **{key: pk},
+            rating_count=count,
+            rating_sum=total or 0,
+            rating_mean=float(total) / count if count else None,
+            last_rated_at=last,
+            changed_at=now,
+        )
+        for pk, count, total, last in rows
+    ]
+
+
+def rebuild_rating_stats():
+    """
+    Recompute every stats row from core_rating with one
+    aggregate query per table. Every movie gets a row, rated or
+    not, so popularity ordering sees a count for each.
+    """
+    with transaction.atomic():
+        MovieStats.objects.all().delete()
+        movies = (
+            Movie.objects.order_by()
+            .annotate(
+                count=Count("rating"),
+                total=Sum("rating__rating"),
+                last=Max("rating__timestamp"),
+            )
+            .values_list("id", "count", "total", "last")
+        )
+        MovieStats.objects.bulk_create(
+            _stats_objects(MovieStats, "movie_id", movies.iterator()),
+            batch_size=BATCH_SIZE,
+        )
+
+        UserStats.objects.all().delete()
+        users = (
+            Rating.objects.order_by()
+            .values("user_id")
+            .annotate(
+                count=Count("id"),
+                total=Sum("rating"),
+                last=Max("timestamp"),
+            )
+            .values_list("user_id", "count", "total", "last")
+        )
+        UserStats.objects.bulk_create(
+            _stats_objects(UserStats, "user_id", users.iterator()),
+            batch_size=BATCH_SIZE,
+        )
+
+
+@receiver(post_save, sender=Movie)
+def movie_created(sender, instance, created, raw=False, **kwargs):
+    """
+    Give a new movie an empty stats row.
+    """
+    if created and not raw:
+        MovieStats.objects.create(movie=instance)
+
+
+@receiver(pre_save, sender=Rating)
+def remember_previous_rating(sender, instance, raw=False, **kwargs):
+    """
+    Keep the stored value, movie and user of an updated rating
+    for post_save.
+    """
+    instance._previous_rating = None
+    instance._previous_keys = {}
+    if raw or instance._state.adding:
+        return
+    fields = [field for _, field in TARGETS]
+    row = (
+        Rating.objects.filter(pk=instance.pk)
+        .values_list("rating", *fields)
+        .first()
+    )
+    if row is not None:
+        instance._previous_rating = row[0]
+        instance._previous_keys = dict(zip(fields, row[1:]))
+
+
+@receiver(post_save, sender=Rating)
+def rating_saved(sender, instance, created, raw=False, **kwargs):
+    """
+    Count a new rating, or the change of an updated one. A
+    rating moved to another movie or user is taken off the old
+    stats rows and counted on the new ones.
+    """
+    if raw:
+        return
+    value = Decimal(str(instance.rating))
+    previous = getattr(instance, "_previous_rating", None)
+    if created or previous is None:
+        apply_rating_change(instance, 1, value, instance.timestamp)
+        return
+    previous_keys = getattr(instance, "_previous_keys", {})
+    for model, field in TARGETS:
+        key = getattr(instance, field)
+        old_key = previous_keys.get(field, key)
+        if old_key == key:
+            _change(model, key, 0, value - previous, instance.timestamp)
+        else:
+            _change(model, old_key, -1, -previous, None)
+            _change(model, key, 1, value, instance.timestamp)
+
+
+@receiver(post_delete, sender=Rating)
+def rating_deleted(sender, instance, **kwargs):
+    """
+    Remove a deleted rating from the stats.
+    """
+    apply_rating_change(instance, -1, -Decimal(str(instance.rating)))
@@ -0,0 +1,137 @@
+"""
+Tests for the activity log and its consumers.
+"""
+
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from core import activity
+from core.models import ActivityEvent, Movie, Rating
+
+RATING_URL = reverse("rating:rating-list")
+TAGS_URL = reverse("tag:tag-list")
+
+
+class ActivityLogTests(TestCase):
+    """Test events are recorded for rating and tag writes"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@example.com", "testpass123"
+        )
+        self.client.force_authenticate(self.user)
+        self.movie = Movie.objects.create(
+            user=self.user, title="Sample Movie", genre="Action", movieId=1
+        )
+
+    def kinds(self):
+        return list(ActivityEvent.objects.values_list("kind", flat=True))
+
+    def test_rating_lifecycle_is_logged(self):
+        """Test creating, changing and deleting a rating"""
+        res = self.client.post(
+            RATING_URL, {"movies": self.movie.id, "rating": "4.5"}
+        )
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        url = reverse("rating:rating-detail", args=[res.data["id"]])
+        self.client.patch(url, {"rating": "3.0"})
+        self.client.delete(url)
+
+        self.assertEqual(
+            self.kinds(),
+            [
+                ActivityEvent.RATING_CREATED,
+                ActivityEvent.RATING_UPDATED,
+                ActivityEvent.RATING_DELETED,
+            ],
+        )
+        updated = ActivityEvent.objects.get(kind=ActivityEvent.RATING_UPDATED)
+        self.assertEqual(updated.user_id, self.user.id)
+        self.assertEqual(updated.movie_id, self.movie.id)
+        self.assertEqual(updated.payload, {"rating": "3.0", "previous": "4.5"})
+
+    def test_tags_are_logged(self):
+        """Test a created tag is logged"""
+        res = self.client.post(
+            TAGS_URL, {"movie": self.movie.id, "tag": "classic"}
+        )
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        event = ActivityEvent.objects.get()
+        self.assertEqual(event.kind, ActivityEvent.TAG_CREATED)
+        self.assertEqual(event.payload, {"tag": "classic"})
+
+    def test_batch_writes_events_together(self):
+        """Test a batch defers its inserts to the end"""
+        with activity.batch():
+            with self.assertNumQueries(0):
+                for value in ("1.0", "2.0", "3.0"):
+                    activity.record("rating.created", rating=value)
+            self.assertFalse(ActivityEvent.objects.exists())
+        self.assertEqual(ActivityEvent.objects.count(), 3)
+
+    def test_failed_write_logs_nothing(self):
+        """Test events roll back with the write they describe"""
+        Rating.objects.create(user=self.user, movies=self.movie, rating=4)
+        ActivityEvent.objects.all().delete()
+        res = self.client.post(
+            RATING_URL, {"movies": self.movie.id, "rating": "2.0"}
+        )
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(ActivityEvent.objects.exists())
+
+
+class ConsumerTests(TestCase):
+    """Test tailing the log by offset"""
+
+    def setUp(self):
+        self.events = [
+            activity.record(ActivityEvent.TAG_CREATED, tag=str(i))
+            for i in range(5)
+        ]
+        # Sequences are not reset between tests on PostgreSQL, so
+        # start the consumers right before this test's first event
+        start = self.events[0].id - 1
+        for name in ("test", "cli"):
+            activity.Consumer(name).commit(start)
+
+    def test_consume_resumes_from_committed_offset(self):
+        """Test a consumer only sees events after its offset"""
+        seen = []
+        consumer = activity.Consumer("test", batch_size=2)
+        while consumer.consume(seen.extend):
+            pass
+        self.assertEqual(seen, self.events)
+
+        later = activity.record(ActivityEvent.TAG_DELETED)
+        resumed = activity.Consumer("test")
+        self.assertEqual(resumed.offset, self.events[-1].id)
+        self.assertEqual(resumed.poll(), [later])
+
+    def test_recent_gaps_wait_for_in_flight_writes(self):
+        """Test consumers stop at a fresh gap and skip old ones"""
+        ActivityEvent.objects.filter(id=self.events[2].id).delete()
+        consumer = activity.Consumer("test", settle_seconds=60)
+        self.assertEqual(consumer.poll(), self.events[:2])
+
+        ActivityEvent.objects.update(
+            created_at=timezone.now() - timedelta(minutes=5)
+        )
+        self.assertEqual(
+            [event.id for event in consumer.poll()],
+            [event.id for event in self.events if event != self.events[2]],
+        )
+
+    def test_tail_command(self):
+        """Test the command prints events and commits its offset"""
+        out = StringIO()
+        call_command("tail_activity", consumer="cli", stdout=out)
+        self.assertEqual(len(out.getvalue().splitlines()), 5)
+        self.assertEqual(activity.Consumer("cli").offset, self.events[-1].id)
@@ -6,6 +6,8 @@ from django.test import TestCase
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 from django.test import Client
+from core.models import Movie, Rating
+from core.query_budget import QueryRecorder
 
 
 class AdminSiteTests(TestCase):
@@ -41,3 +43,25 @@ class AdminSiteTests(TestCase):
         url = reverse("admin:core_user_add")
         res = self.client.get(url)
         self.assertEqual(res.status_code, 200)
+
+    def test_rating_list_queries_do_not_scale(self):
+        """Test the rating changelist does not run a query per row."""
+        url = reverse("admin:core_rating_changelist")
+        movie = Movie.objects.create(
+            user=self.user, title="Sample", genre="Drama", movieId=1
+        )
+        Rating.objects.create(user=self.user, movies=movie, rating=4)
+        with QueryRecorder() as one_row:
+            self.client.get(url)
+        for movie_id in range(2, 7):
+            movie = Movie.objects.create(
+                user=self.user,
+                title=f"Sample {movie_id}",
+                genre="Drama",
+                movieId=movie_id,
+            )
+            Rating.objects.create(user=self.user, movies=movie, rating=4)
+        with QueryRecorder() as six_rows:
+            res = self.client.get(url)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(six_rows.count, one_row.count)
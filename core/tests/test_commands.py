@@ -2,11 +2,25 @@
 This file test custom Django management commands.
 """
 
+import os
+import tempfile
+from io import StringIO
 from unittest.mock import patch
 from psycopg2 import OperationalError as Psycopg2Error
+from django.contrib.auth import get_user_model
 from django.core.management import call_command
 from django.db.utils import OperationalError
-from django.test import SimpleTestCase
+from django.test import SimpleTestCase, TestCase
+from core.management.commands.retrain_recommender import database_delta
+from core.management.commands.train_recommender import (
+    activity_offset,
+    load_ratings,
+)
+from core import activity
+from core.models import ActivityEvent, Movie, Rating
+from src.factor_model import FactorModel
+from src.retraining import read_metadata
+from src.tests.test_sgd_svd import low_rank_ratings
 
 
 @patch("core.management.commands.wait_for_db.Command.check")  # noqa
@@ -28,3 +42,134 @@ class CommandTests(SimpleTestCase):
         call_command("wait_for_db")
         self.assertEqual(patched_check.call_count, 6)
         patched_check.assert_called_with(databases=["default"])
+
+
+class SeedLoadtestCommandTests(TestCase):
+    """Test the seed_loadtest command"""
+
+    def test_seed_loadtest_is_idempotent(self):
+        """Test seeding creates users, movies and ratings once"""
+        options = {"users": 3, "movies": 10, "ratings": 30, "seed": 1}
+        call_command("seed_loadtest", **options)
+        call_command("seed_loadtest", **options)
+        self.assertEqual(
+            get_user_model()
+            .objects.filter(email__startswith="loadtest")
+            .count(),
+            3,
+        )
+        self.assertEqual(Movie.objects.count(), 10)
+        self.assertGreater(Rating.objects.count(), 0)
+        user = get_user_model().objects.get(email="loadtest1@example.com")
+        self.assertTrue(user.check_password("loadtest123"))
+
+
+class TrainRecommenderCommandTests(TestCase):
+    """Test the train_recommender command"""
+
+    def test_train_from_db(self):
+        """Test training on database ratings exports a factor model"""
+        call_command("seed_loadtest", users=5, movies=20, ratings=100, seed=1)
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, "factor_model.npz")
+            call_command(
+                "train_recommender", from_db=True, output=output, epochs=2
+            )
+            model = FactorModel.load(output)
+            metadata = read_metadata(output)
+        self.assertEqual(metadata["mode"], "full")
+        self.assertEqual(metadata["activity_offset"], activity_offset())
+        self.assertEqual(
+            set(model.item_ids.tolist()),
+            set(Rating.objects.values_list("movies__movieId", flat=True)),
+        )
+        self.assertEqual(
+            set(model.user_ids.tolist()),
+            set(Rating.objects.values_list("user_id", flat=True)),
+        )
+
+
+class RetrainRecommenderCommandTests(TestCase):
+    """Test the retrain_recommender command"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.model = os.path.join(self.tmp.name, "factor_model.npz")
+        ratings = low_rank_ratings()
+        ratings["timestamp"] = 1_000_000 + ratings.index
+        self.ratings = ratings
+
+    def write_ratings(self, ratings):
+        ratings.to_csv(os.path.join(self.tmp.name, "ratings.csv"), index=False)
+
+    def retrain(self, **options):
+        out = StringIO()
+        call_command(
+            "retrain_recommender",
+            path=self.tmp.name,
+            model=self.model,
+            factors=4,
+            lr=0.02,
+            min_delta=100,
+            stdout=out,
+            **options,
+        )
+        return out.getvalue()
+
+    def test_warm_retrain_from_csv(self):
+        """Test new CSV rows warm-start a new published version"""
+        self.write_ratings(self.ratings.iloc[:15_000])
+        self.retrain(full=True, epochs=20)
+        trained = read_metadata(self.model)
+        self.assertEqual(trained["mode"], "cold")
+        self.assertEqual(trained["trained_until"], 1_000_000 + 14_999)
+
+        self.write_ratings(self.ratings)
+        self.assertIn("published version", self.retrain())
+        retrained = read_metadata(self.model)
+        self.assertEqual(retrained["mode"], "warm")
+        self.assertEqual(retrained["previous_version"], trained["version"])
+        self.assertLess(retrained["rmse"], retrained["previous_rmse"])
+        self.assertEqual(
+            set(FactorModel.load(self.model).user_ids.tolist()),
+            set(self.ratings["userId"].tolist()),
+        )
+
+        self.assertIn("Only 0 new ratings", self.retrain())
+
+    def test_full_retrain_is_validated_against_the_published_model(self):
+        """Test --full only replaces a better model with --force"""
+        self.write_ratings(self.ratings)
+        self.retrain(full=True, epochs=20)
+        trained = read_metadata(self.model)
+
+        self.assertIn("not promoted", self.retrain(full=True, epochs=0))
+        self.assertEqual(read_metadata(self.model), trained)
+        self.assertIn(
+            "published version", self.retrain(full=True, epochs=0, force=True)
+        )
+        self.assertNotEqual(read_metadata(self.model), trained)
+
+    def test_cold_retrain_without_a_model(self):
+        """Test retraining without a published model starts cold"""
+        self.write_ratings(self.ratings)
+        self.retrain(epochs=2)
+        self.assertEqual(read_metadata(self.model)["mode"], "cold")
+
+    def test_database_delta_follows_the_activity_log(self):
+        """Test the delta holds ratings changed since the offset"""
+        call_command("seed_loadtest", users=3, movies=5, ratings=6, seed=1)
+        offset = activity_offset()
+        rating = Rating.objects.first()
+        rating.rating = 1
+        rating.save()
+        ratings = load_ratings("", from_db=True)
+
+        delta = database_delta(ratings, offset)
+        self.assertEqual(
+            delta[["userId", "movieId", "rating"]].values.tolist(),
+            [[rating.user_id, rating.movies.movieId, 1.0]],
+        )
+        activity.record(ActivityEvent.RATINGS_LOADED, count=1)
+        self.assertIsNone(database_delta(ratings, offset))
@@ -0,0 +1,81 @@
+"""
+Tests for running database work on worker connections.
+"""
+
+import threading
+from unittest.mock import patch
+
+import pandas as pd
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.test import TransactionTestCase
+from core.db import chunked, run_in_workers
+from core.load_data_ml import MovieLensDataLoader
+from core.models import Movie, Rating
+
+
+class RunInWorkersTests(TransactionTestCase):
+    """Test the worker connection helper"""
+
+    def test_chunked(self):
+        """Test sequences are split into consecutive slices"""
+        self.assertEqual(chunked([1, 2, 3, 4, 5], 2), [[1, 2], [3, 4], [5]])
+        self.assertEqual(chunked([], 2), [])
+
+    def test_each_worker_has_its_own_connection(self):
+        """Test workers use and then close dedicated connections"""
+        barrier = threading.Barrier(3)
+        used = []
+        closed = []
+
+        def work(chunk):
+            barrier.wait(timeout=5)
+            connection = connections["default"]
+            connection.ensure_connection()
+            used.append(connection)
+            return sum(chunk)
+
+        def close_all():
+            closed.append(connections["default"])
+
+        with patch.object(connections, "close_all", close_all):
+            results = run_in_workers(work, [[1, 2], [3], [4, 5]], workers=3)
+
+        self.assertEqual(results, [3, 3, 9])
+        self.assertEqual(len({id(connection) for connection in used}), 3)
+        self.assertNotIn(connections["default"], used)
+        self.assertCountEqual(map(id, closed), map(id, used))
+
+    def test_errors_are_raised(self):
+        """Test a failing chunk is re-raised to the caller"""
+
+        def work(chunk):
+            raise ValueError(chunk)
+
+        with self.assertRaises(ValueError):
+            run_in_workers(work, [1, 2], workers=2)
+
+    @patch("core.load_data_ml.BATCH_SIZE", 1)
+    def test_loader_inserts_from_workers(self):
+        """Test ratings inserted by several workers all arrive"""
+        user = get_user_model().objects.create_user(
+            "test@example.com", "testpass123"
+        )
+        for movie_id in (1, 2, 3):
+            Movie.objects.create(
+                movieId=movie_id, title=f"Movie {movie_id}", user=user
+            )
+        ratings = pd.DataFrame(
+            {
+                "userId": [user.id] * 3,
+                "movieId": [1, 2, 3],
+                "rating": [4.5, 3.0, 2.0],
+                "timestamp": [1_000_000_000] * 3,
+            }
+        )
+        MovieLensDataLoader(workers=2).load_ratings(ratings)
+
+        self.assertEqual(
+            sorted(Rating.objects.values_list("movies__movieId", flat=True)),
+            [1, 2, 3],
+        )
@@ -0,0 +1,160 @@
+"""
+Tests for the background job queue.
+"""
+
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from core import jobs
+from core.models import Job
+
+LIMITS = {"import": 1, "train": 1, "evaluate": 2, "precompute": 1}
+
+
+def steps(context, steps=3, fail=False):
+    """Handler reporting progress once per step"""
+    for step in range(steps):
+        context.progress(step / steps, f"Step {step}")
+    if fail:
+        raise RuntimeError("Step failed")
+    return {"steps": steps}
+
+
+@override_settings(
+    JOB_CONCURRENCY=LIMITS, JOB_MAX_RUNNING=3, JOB_PROGRESS_SECONDS=0
+)
+class JobQueueTests(TestCase):
+    """Test queueing, claiming and running jobs"""
+
+    def setUp(self):
+        patcher = patch.dict(
+            jobs.HANDLERS, {Job.TRAIN: (steps, frozenset({"steps", "fail"}))}
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_enqueue_validates_params(self):
+        """Test unknown kinds and params are rejected"""
+        with self.assertRaises(ValueError):
+            jobs.enqueue("backup")
+        with self.assertRaises(ValueError):
+            jobs.enqueue(Job.TRAIN, {"factors": 10})
+        job = jobs.enqueue(Job.TRAIN, {"steps": 2})
+        self.assertEqual(job.status, Job.QUEUED)
+
+    def test_claim_respects_concurrency_limits(self):
+        """Test per-kind and total limits hold back queued jobs"""
+        train = [jobs.enqueue(Job.TRAIN) for _ in range(2)]
+        evaluate = [jobs.enqueue(Job.EVALUATE) for _ in range(3)]
+
+        claimed = [jobs.claim("w") for _ in range(4)]
+        self.assertEqual(
+            [job.pk if job else None for job in claimed],
+            [train[0].pk, evaluate[0].pk, evaluate[1].pk, None],
+        )
+        self.assertEqual(claimed[0].status, Job.RUNNING)
+        self.assertEqual(claimed[0].worker, "w")
+
+        Job.objects.filter(pk=evaluate[0].pk).update(status=Job.SUCCEEDED)
+        self.assertEqual(jobs.claim("w", [Job.TRAIN]), None)
+        self.assertEqual(jobs.claim("w").pk, evaluate[2].pk)
+
+    def test_run_job_records_progress_and_result(self):
+        """Test a successful job ends with its result"""
+        jobs.enqueue(Job.TRAIN, {"steps": 4})
+        job = jobs.run_job(jobs.claim("w"))
+        self.assertEqual(job.status, Job.SUCCEEDED)
+        self.assertEqual(job.result, {"steps": 4})
+        self.assertEqual(job.progress, 1.0)
+        self.assertIsNotNone(job.finished_at)
+
+    def test_run_job_records_failure(self):
+        """Test a raising handler fails the job with its traceback"""
+        jobs.enqueue(Job.TRAIN, {"fail": True})
+        with self.assertLogs("core.jobs", "ERROR"):
+            job = jobs.run_job(jobs.claim("w"))
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertIn("Step failed", job.error)
+        self.assertEqual(job.message, "Step 2")
+
+    def test_cancel(self):
+        """Test queued jobs cancel at once, running ones at progress"""
+        queued = jobs.enqueue(Job.TRAIN)
+        running = jobs.enqueue(Job.TRAIN)
+        self.assertEqual(jobs.cancel(queued).status, Job.CANCELLED)
+
+        job = jobs.claim("w")
+        self.assertEqual(job.pk, running.pk)
+        self.assertEqual(jobs.cancel(job).status, Job.RUNNING)
+        jobs.run_job(job)
+        self.assertEqual(job.status, Job.CANCELLED)
+        self.assertIsNone(job.result)
+
+    def test_reap_stale(self):
+        """Test running jobs without a recent heartbeat are failed"""
+        jobs.enqueue(Job.TRAIN)
+        jobs.enqueue(Job.EVALUATE)
+        stale, fresh = jobs.claim("w"), jobs.claim("w")
+        Job.objects.filter(pk=stale.pk).update(
+            heartbeat_at=timezone.now() - timedelta(hours=1)
+        )
+        self.assertEqual(jobs.reap_stale(), 1)
+        stale.refresh_from_db()
+        fresh.refresh_from_db()
+        self.assertEqual(stale.status, Job.FAILED)
+        self.assertEqual(fresh.status, Job.RUNNING)
+
+    # Closing connections would end the test transaction on PostgreSQL
+    @patch("core.management.commands.run_jobs.close_old_connections")
+    def test_run_jobs_command(self, _):
+        """Test a burst worker runs the queue and exits"""
+        first = jobs.enqueue(Job.TRAIN)
+        second = jobs.enqueue(Job.TRAIN, {"fail": True})
+        out = StringIO()
+        with self.assertLogs("core.jobs", "ERROR"):
+            call_command("run_jobs", burst=True, stdout=out)
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.status, Job.SUCCEEDED)
+        self.assertEqual(second.status, Job.FAILED)
+        self.assertIn(f"Finished job #{first.pk}", out.getvalue())
+
+
+class EvaluateJobTests(TestCase):
+    """Test the evaluate handler end to end"""
+
+    @patch("core.management.commands.run_jobs.close_old_connections")
+    def test_evaluate_from_db(self, _):
+        """Test an evaluate job stores held-out metrics"""
+        call_command("seed_loadtest", users=5, movies=20, ratings=100, seed=1)
+        jobs.enqueue(
+            Job.EVALUATE, {"from_db": True, "epochs": 2, "factors": 5}
+        )
+        call_command("run_jobs", burst=True, stdout=StringIO())
+        job = Job.objects.get(kind=Job.EVALUATE)
+        self.assertEqual(job.status, Job.SUCCEEDED, job.error)
+        self.assertEqual(job.result["k"], 10)
+        self.assertGreater(job.result["test_ratings"], 0)
+        self.assertGreater(job.result["rmse"], 0)
+
+
+class ScheduleTests(TestCase):
+    """Test periodic job scheduling"""
+
+    def test_schedule_waits_for_the_interval(self):
+        """Test a kind is queued again only once the last job ended
+        and the interval passed"""
+        first = jobs.schedule(Job.RETRAIN, 3600, {"from_db": True})
+        self.assertEqual(first.params, {"from_db": True})
+        self.assertIsNone(jobs.schedule(Job.RETRAIN, 0))
+
+        Job.objects.filter(pk=first.pk).update(status=Job.SUCCEEDED)
+        self.assertIsNone(jobs.schedule(Job.RETRAIN, 3600))
+        Job.objects.filter(pk=first.pk).update(
+            created_at=timezone.now() - timedelta(hours=2)
+        )
+        self.assertIsNotNone(jobs.schedule(Job.RETRAIN, 3600))
@@ -0,0 +1,49 @@
+"""
+Tests for loading MovieLens data into the database.
+"""
+
+import pandas as pd
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from core.load_data_ml import MovieLensDataLoader
+from core.models import Movie, MovieStats, Rating, Tag
+
+
+class LoadDataTests(TestCase):
+    """Test the database loader"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "test@example.com", "testpass123"
+        )
+        self.movies = [
+            Movie.objects.create(
+                movieId=movie_id, title=f"Movie {movie_id}", user=self.user
+            )
+            for movie_id in (2571, 1)
+        ]
+
+    def test_ratings_and_tags_map_to_existing_rows(self):
+        """Test rows are linked by movieId and unknown ids skipped"""
+        user_id = self.user.id
+        ratings = pd.DataFrame(
+            {
+                "userId": [user_id, user_id, user_id + 1],
+                "movieId": [1, 99, 2571],
+                "rating": [4.5, 3.0, 2.0],
+                "timestamp": [1_000_000_000] * 3,
+            }
+        )
+        loader = MovieLensDataLoader()
+        loader.load_ratings(ratings)
+        loader.load_tags(ratings.assign(tag="classic"))
+
+        rating = Rating.objects.get()
+        self.assertEqual(rating.movies, self.movies[1])
+        self.assertEqual(float(rating.rating), 4.5)
+        self.assertEqual(Tag.objects.get().movie, self.movies[1])
+        # Bulk-loaded ratings are counted by the stats rebuild
+        counts = dict(
+            MovieStats.objects.values_list("movie_id", "rating_count")
+        )
+        self.assertEqual(counts, {self.movies[0].id: 0, self.movies[1].id: 1})
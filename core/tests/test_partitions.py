@@ -0,0 +1,170 @@
+"""
+Tests for rating partitioning and the COPY helpers.
+"""
+
+import io
+from contextlib import contextmanager
+from unittest import skipIf, skipUnless
+
+import pandas as pd
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from core import partitions
+from core.db import copy_csv
+from core.jobs import claim, enqueue, run_job
+from core.models import Movie, Rating
+from core.partitions import (
+    DEFAULT_PARTITION,
+    USERS_PER_PARTITION,
+    create_partition_sql,
+    ensure_partitions,
+    ensure_partitions_ahead,
+    is_partitioned,
+    partition_bounds,
+    partition_exists,
+    partition_index,
+    partition_name,
+    split_by_partition,
+)
+
+ON_POSTGRES = connection.vendor == "postgresql"
+
+
+class FakeCursor:
+    """Django cursor wrapper around a fake DB-API cursor"""
+
+    def __init__(self, raw):
+        self.cursor = raw
+
+
+class Psycopg2Cursor:
+    def copy_expert(self, sql, buffer):
+        self.copied = (sql, buffer.read())
+
+
+class Psycopg3Cursor:
+    @contextmanager
+    def copy(self, sql):
+        self.sql = sql
+        self.written = []
+        yield self
+
+    def write(self, data):
+        self.written.append(data)
+
+
+class PartitionTests(SimpleTestCase):
+    """Test partition layout helpers"""
+
+    def test_ranges(self):
+        """Test users map to consecutive ranges"""
+        self.assertEqual(partition_index(1), 0)
+        self.assertEqual(partition_index(USERS_PER_PARTITION), 1)
+        self.assertEqual(partition_bounds(1), (25_000, 50_000))
+        self.assertEqual(partition_name(3), "core_rating_p003")
+        self.assertEqual(
+            create_partition_sql(1),
+            "CREATE TABLE IF NOT EXISTS core_rating_p001 PARTITION OF "
+            "core_rating FOR VALUES FROM (25000) TO (50000)",
+        )
+
+    def test_split_by_partition(self):
+        """Test rows are grouped by their user's partition"""
+        rows = pd.DataFrame(
+            {"user_id": [1, 60_000, 2, 25_000], "rating": [1, 2, 3, 4]}
+        )
+        partitions = split_by_partition(rows)
+        self.assertEqual(sorted(partitions), [0, 1, 2])
+        self.assertEqual(partitions[0]["rating"].tolist(), [1, 3])
+        self.assertEqual(partitions[1]["user_id"].tolist(), [25_000])
+
+    @skipIf(ON_POSTGRES, "Postgres partitions the rating table")
+    def test_not_partitioned_off_postgres(self):
+        """Test other databases keep the plain rating table"""
+        self.assertFalse(is_partitioned())
+
+
+@skipUnless(ON_POSTGRES, "Partitioning needs Postgres")
+class PostgresPartitionTests(TestCase):
+    """Test partitions are created ahead of users on Postgres"""
+
+    def setUp(self):
+        partitions._known.clear()
+        self.owner = get_user_model().objects.create_user(
+            "owner@example.com", "testpass123"
+        )
+        self.movie = Movie.objects.create(
+            user=self.owner, title="Sample Movie", genre="Action", movieId=1
+        )
+
+    def create_user(self, user_id):
+        return get_user_model().objects.create_user(
+            f"user{user_id}@example.com", "testpass123", id=user_id
+        )
+
+    def rows_in(self, table, user_id):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT COUNT(*) FROM {table} WHERE user_id = %s", [user_id]
+            )
+            return cursor.fetchone()[0]
+
+    def test_migration_partitions_the_table(self):
+        """Test the migration creates the initial ranges"""
+        self.assertTrue(is_partitioned())
+        self.assertTrue(partition_exists(0))
+        self.assertTrue(partition_exists(9))
+
+    def test_rows_move_out_of_the_default_partition(self):
+        """Test a new range takes its rows from the default one"""
+        user = self.create_user(260_000)
+        Rating.objects.create(user=user, movies=self.movie, rating=4)
+        self.assertEqual(self.rows_in(DEFAULT_PARTITION, user.id), 1)
+
+        self.assertEqual(ensure_partitions([10, 10]), [10])
+        self.assertEqual(ensure_partitions([10]), [])
+        self.assertEqual(self.rows_in(DEFAULT_PARTITION, user.id), 0)
+        self.assertEqual(self.rows_in(partition_name(10), user.id), 1)
+        self.assertEqual(Rating.objects.get(user=user).rating, 4)
+
+    def test_new_users_get_partitions_ahead(self):
+        """Test creating a user creates its range and the next"""
+        with self.captureOnCommitCallbacks(execute=True):
+            user = self.create_user(276_000)
+        self.assertTrue(partition_exists(11))
+        self.assertTrue(partition_exists(12))
+        Rating.objects.create(user=user, movies=self.movie, rating=5)
+        self.assertEqual(self.rows_in(partition_name(11), user.id), 1)
+
+    def test_partitions_job(self):
+        """Test the periodic job covers users already created"""
+        user = self.create_user(301_000)
+        Rating.objects.create(user=user, movies=self.movie, rating=3)
+        self.assertEqual(ensure_partitions_ahead(), [10, 11, 12, 13])
+
+        self.create_user(330_000)
+        enqueue("partitions")
+        job = run_job(claim("test"))
+        self.assertEqual(job.result, {"created": [14]})
+        self.assertEqual(self.rows_in(partition_name(12), user.id), 1)
+
+
+class CopyCsvTests(SimpleTestCase):
+    """Test COPY on both psycopg versions"""
+
+    def test_psycopg2(self):
+        raw = Psycopg2Cursor()
+        copy_csv(
+            FakeCursor(raw), "core_rating_p000", ["id"], io.StringIO("1\n")
+        )
+        sql, data = raw.copied
+        self.assertIn("FROM STDIN WITH (FORMAT csv)", sql)
+        self.assertIn("core_rating_p000", sql)
+        self.assertEqual(data, "1\n")
+
+    def test_psycopg3(self):
+        raw = Psycopg3Cursor()
+        copy_csv(FakeCursor(raw), "t", ["id", "rating"], io.StringIO("1,2\n"))
+        self.assertIn("COPY", raw.sql)
+        self.assertEqual(raw.written, ["1,2\n"])
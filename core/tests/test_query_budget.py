@@ -0,0 +1,113 @@
+"""
+Tests for the query budget instrumentation.
+"""
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+from core.models import Movie, Rating
+from core.query_budget import (
+    QueryBudgetExceeded,
+    QueryBudgetTestMixin,
+    QueryRecorder,
+    normalize_sql,
+)
+
+MOVIES_URL = reverse("movies:movie-list")
+
+
+class NormalizeSqlTests(TestCase):
+    """Test SQL shape normalization."""
+
+    def test_literals_and_in_lists_are_collapsed(self):
+        """Test queries differing only by parameters share a shape."""
+        first = normalize_sql("SELECT * FROM t WHERE id = 1 AND n = 'a'")
+        second = normalize_sql("SELECT * FROM t WHERE id = 22 AND n = 'b'")
+        self.assertEqual(first, second)
+        self.assertEqual(
+            normalize_sql("SELECT * FROM t WHERE id IN (%s, %s, %s)"),
+            "SELECT * FROM t WHERE id IN (...)",
+        )
+
+
+class QueryBudgetTests(QueryBudgetTestMixin, TestCase):
+    """Test the recorder, middleware and test helper."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "test@example.com", "testpass123"
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        for movie_id in range(1, 6):
+            movie = Movie.objects.create(
+                user=self.user,
+                title=f"Movie {movie_id}",
+                genre="Drama",
+                movieId=movie_id,
+            )
+            Rating.objects.create(user=self.user, movies=movie, rating=4)
+
+    def test_recorder_detects_n_plus_one(self):
+        """Test repeated query shapes are reported."""
+        with QueryRecorder() as recorder:
+            [str(rating) for rating in Rating.objects.all()]
+        self.assertEqual(recorder.count, 11)
+        self.assertIn(5, recorder.repeated_shapes().values())
+
+    def test_select_related_avoids_n_plus_one(self):
+        """Test the helper passes when FKs are selected together."""
+        with self.assertQueryBudget(1, max_repeats=1):
+            [
+                str(rating)
+                for rating in Rating.objects.select_related("user", "movies")
+            ]
+
+    def test_helper_fails_over_budget(self):
+        """Test the helper fails a block that exceeds its budget."""
+        with self.assertRaises(AssertionError):
+            with self.assertQueryBudget(2):
+                [str(rating) for rating in Rating.objects.all()]
+
+    @override_settings(QUERY_BUDGET_ENABLED=True)
+    def test_middleware_sets_headers(self):
+        """Test the middleware reports the query count."""
+        res = self.client.get(MOVIES_URL)
+        self.assertEqual(res["X-Query-Count"], "2")
+        self.assertIn("X-Query-Time-Ms", res)
+
+    @override_settings(
+        QUERY_BUDGET_ENABLED=True,
+        QUERY_BUDGET_RAISE=True,
+        QUERY_BUDGETS={"movies:movie-list": 1},
+    )
+    def test_middleware_raises_over_budget(self):
+        """Test the middleware raises when a view exceeds its budget."""
+        with self.assertRaises(QueryBudgetExceeded):
+            self.client.get(MOVIES_URL)
+
+    @override_settings(QUERY_BUDGET_ENABLED=True)
+    async def test_middleware_counts_under_asgi(self):
+        """Test sync views served over ASGI are counted."""
+        token = await Token.objects.acreate(user=self.user)
+        res = await self.async_client.get(
+            MOVIES_URL, headers={"Authorization": f"Token {token.key}"}
+        )
+        self.assertEqual(res.status_code, 200)
+        # Token authentication adds one query
+        self.assertEqual(res["X-Query-Count"], "3")
+
+    @override_settings(
+        QUERY_BUDGET_ENABLED=True,
+        QUERY_BUDGET_RAISE=True,
+        QUERY_BUDGETS={"movies:movie-list": 1},
+    )
+    async def test_middleware_raises_over_budget_under_asgi(self):
+        """Test the budget is enforced over ASGI."""
+        token = await Token.objects.acreate(user=self.user)
+        with self.assertRaises(QueryBudgetExceeded):
+            await self.async_client.get(
+                MOVIES_URL, headers={"Authorization": f"Token {token.key}"}
+            )
@@ -0,0 +1,114 @@
+"""
+Tests for read-replica routing.
+"""
+
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from core.models import Movie, Rating
+from core.replicas import ReplicaRouter, is_pinned, replica_reads
+
+MOVIES_URL = reverse("movies:movie-list")
+RATING_URL = reverse("rating:rating-list")
+
+
+@override_settings(DATABASE_REPLICAS=["replica_1"])
+class ReplicaRouterTests(SimpleTestCase):
+    """Test the router"""
+
+    def setUp(self):
+        self.router = ReplicaRouter()
+
+    def test_reads_use_primary_by_default(self):
+        """Test reads outside replica_reads go to the primary"""
+        self.assertIsNone(self.router.db_for_read(Movie))
+
+    def test_replica_reads(self):
+        """Test reads inside replica_reads go to a replica"""
+        with replica_reads():
+            self.assertEqual(self.router.db_for_read(Movie), "replica_1")
+            with replica_reads(False):
+                self.assertIsNone(self.router.db_for_read(Movie))
+            self.assertEqual(self.router.db_for_write(Movie), "default")
+        self.assertIsNone(self.router.db_for_read(Movie))
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_no_replicas(self):
+        """Test reads stay on the primary without replicas"""
+        with replica_reads():
+            self.assertIsNone(self.router.db_for_read(Movie))
+
+    def test_replicas_are_not_migrated(self):
+        """Test migrations only run on the primary"""
+        self.assertFalse(self.router.allow_migrate("replica_1", "core"))
+        self.assertIsNone(self.router.allow_migrate("default", "core"))
+
+
+@override_settings(DATABASE_REPLICAS=["replica_1"])
+class ReplicaRoutingAPITests(TestCase):
+    """Test which API reads are sent to replicas"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "test@example.com", "testpass123"
+        )
+        self.client.force_authenticate(self.user)
+        self.movie = Movie.objects.create(
+            user=self.user, title="Sample Movie", genre="Action", movieId=1
+        )
+        self.replica_reads = []
+        # Record replica reads but serve them from the test database
+        patcher = patch(
+            "core.replicas.choose_replica", side_effect=self.choose_replica
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def choose_replica(self):
+        self.replica_reads.append(True)
+        return "default"
+
+    def test_catalogue_reads_use_replicas(self):
+        """Test list and retrieve read from a replica"""
+        res = self.client.get(MOVIES_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(self.replica_reads)
+
+        self.replica_reads.clear()
+        res = self.client.get(
+            reverse("movies:movie-detail", args=[self.movie.id])
+        )
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(self.replica_reads)
+
+    def test_rating_reads_use_primary(self):
+        """Test the rating viewset always reads the primary"""
+        res = self.client.get(RATING_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertFalse(self.replica_reads)
+
+    def test_reads_after_rating_use_primary(self):
+        """Test a user who rated reads their own writes"""
+        res = self.client.post(
+            RATING_URL, {"movies": self.movie.id, "rating": "4.5"}
+        )
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(is_pinned(self.user))
+
+        res = self.client.get(MOVIES_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertFalse(self.replica_reads)
+        self.assertTrue(Rating.objects.filter(user=self.user).exists())
+
+    def test_failed_writes_do_not_pin(self):
+        """Test rejected writes leave the user on replicas"""
+        res = self.client.post(RATING_URL, {"movies": self.movie.id})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(is_pinned(self.user))
@@ -0,0 +1,16 @@
+"""
+Guard Django startup against eager ML imports.
+"""
+
+from django.test import SimpleTestCase
+from benchmarks.startup import run
+
+
+class StartupTests(SimpleTestCase):
+    """Test manage.py check and worker boot stay lightweight"""
+
+    def test_no_ml_imports_at_startup(self):
+        """Test check and worker boot do not import the ML stack"""
+        results = run(repeat=1)
+        for name, result in results.items():
+            self.assertEqual(result["forbidden"], [], name)
@@ -0,0 +1,105 @@
+"""
+Tests for the materialized rating statistics.
+"""
+
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from core.models import Movie, MovieStats, Rating, UserStats
+from core.stats import rebuild_rating_stats
+
+
+class RatingStatsTests(TestCase):
+    """Test stats follow Rating writes"""
+
+    def setUp(self):
+        User = get_user_model()
+        self.users = [
+            User.objects.create_user(f"user{i}@example.com", "testpass123")
+            for i in range(2)
+        ]
+        self.movie = Movie.objects.create(
+            movieId=1, title="Movie 1", user=self.users[0]
+        )
+
+    def rate(self, user, value):
+        return Rating.objects.create(
+            user=user, movies=self.movie, rating=Decimal(value)
+        )
+
+    def test_created_ratings_are_counted(self):
+        """Test new ratings add to movie and user stats"""
+        first = self.rate(self.users[0], "4.0")
+        second = self.rate(self.users[1], "3.0")
+
+        stats = MovieStats.objects.get(movie=self.movie)
+        self.assertEqual(stats.rating_count, 2)
+        self.assertEqual(stats.rating_sum, Decimal("7.0"))
+        self.assertAlmostEqual(stats.rating_mean, 3.5)
+        self.assertEqual(
+            stats.last_rated_at, max(first.timestamp, second.timestamp)
+        )
+        user_stats = UserStats.objects.get(user=self.users[1])
+        self.assertEqual(user_stats.rating_count, 1)
+        self.assertAlmostEqual(user_stats.rating_mean, 3.0)
+
+    def test_updated_rating_changes_sum(self):
+        """Test changing a rating adjusts the sum and mean only"""
+        self.rate(self.users[0], "4.0")
+        rating = self.rate(self.users[1], "2.0")
+        rating.rating = Decimal("5.0")
+        rating.save()
+
+        stats = MovieStats.objects.get(movie=self.movie)
+        self.assertEqual(stats.rating_count, 2)
+        self.assertEqual(stats.rating_sum, Decimal("9.0"))
+        self.assertAlmostEqual(stats.rating_mean, 4.5)
+
+    def test_moved_rating_changes_both_movies(self):
+        """Test moving a rating takes it off the old movie"""
+        other = Movie.objects.create(
+            movieId=2, title="Movie 2", user=self.users[0]
+        )
+        self.rate(self.users[1], "4.0")
+        rating = self.rate(self.users[0], "2.0")
+        rating.movies = other
+        rating.rating = Decimal("3.0")
+        rating.save()
+
+        old = MovieStats.objects.get(movie=self.movie)
+        self.assertEqual(old.rating_count, 1)
+        self.assertEqual(old.rating_sum, Decimal("4.0"))
+        new = MovieStats.objects.get(movie=other)
+        self.assertEqual(new.rating_count, 1)
+        self.assertEqual(new.rating_sum, Decimal("3.0"))
+        user_stats = UserStats.objects.get(user=self.users[0])
+        self.assertEqual(user_stats.rating_count, 1)
+        self.assertEqual(user_stats.rating_sum, Decimal("3.0"))
+
+    def test_deleted_ratings_are_removed(self):
+        """Test deletes decrement the stats"""
+        rating = self.rate(self.users[0], "4.0")
+        rating.delete()
+
+        stats = MovieStats.objects.get(movie=self.movie)
+        self.assertEqual(stats.rating_count, 0)
+        self.assertEqual(stats.rating_sum, Decimal("0.0"))
+        self.assertIsNone(stats.rating_mean)
+
+    def test_rebuild_matches_bulk_inserts(self):
+        """Test a rebuild counts ratings that bypassed signals"""
+        Rating.objects.bulk_create(
+            [
+                Rating(user=user, movies=self.movie, rating=value)
+                for user, value in zip(self.users, ("5.0", "2.0"))
+            ]
+        )
+        self.assertEqual(MovieStats.objects.get().rating_count, 0)
+
+        rebuild_rating_stats()
+
+        stats = MovieStats.objects.get(movie=self.movie)
+        self.assertEqual(stats.rating_count, 2)
+        self.assertAlmostEqual(stats.rating_mean, 3.5)
+        self.assertEqual(UserStats.objects.count(), 2)
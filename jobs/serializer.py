@@ -0,0 +1,42 @@
+"""
+Serializer for Job model
+"""
+
+from rest_framework import serializers
+from core import jobs
+from core.models import Job
+
+
+class JobSerializer(serializers.ModelSerializer):
+    """
+    Serializer for background jobs; only kind and params are
+    writable
+    """
+
+    class Meta:
+        model = Job
+        fields = (
+            "id",
+            "kind",
+            "params",
+            "status",
+            "progress",
+            "message",
+            "result",
+            "error",
+            "cancel_requested",
+            "created_by",
+            "created_at",
+            "started_at",
+            "finished_at",
+        )
+        read_only_fields = tuple(
+            field for field in fields if field not in ("kind", "params")
+        )
+
+    def validate(self, attrs):
+        try:
+            jobs.validate_params(attrs["kind"], attrs.get("params", {}))
+        except ValueError as exc:
+            raise serializers.ValidationError({"params": str(exc)})
+        return attrs
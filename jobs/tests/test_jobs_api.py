@@ -0,0 +1,104 @@
+"""
+This module contains tests for the background jobs API.
+"""
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from core import jobs
+from core.models import Job
+
+JOBS_URL = reverse("jobs:job-list")
+
+
+def cancel_url(job_id):
+    """
+    Return the cancel URL of a job.
+    """
+    return reverse("jobs:job-cancel", args=[job_id])
+
+
+class PublicJobApiTests(TestCase):
+    """
+    Test the jobs API is closed to anonymous and regular users.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_auth_required(self):
+        """
+        Test that authentication is required.
+        """
+        res = self.client.get(JOBS_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_staff_required(self):
+        """
+        Test that regular users cannot queue jobs.
+        """
+        user = get_user_model().objects.create_user(
+            "user@example.com", "testpass123"
+        )
+        self.client.force_authenticate(user)
+        res = self.client.post(JOBS_URL, {"kind": Job.TRAIN}, format="json")
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(Job.objects.exists())
+
+
+class StaffJobApiTests(TestCase):
+    """
+    Test queueing and monitoring jobs as staff.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            "staff@example.com", "testpass123", is_staff=True
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_create_job(self):
+        """
+        Test queueing a job with params.
+        """
+        payload = {"kind": Job.TRAIN, "params": {"epochs": 5}}
+        res = self.client.post(JOBS_URL, payload, format="json")
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        job = Job.objects.get(id=res.data["id"])
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertEqual(job.params, {"epochs": 5})
+        self.assertEqual(job.created_by, self.user)
+
+    def test_create_job_rejects_unknown_params(self):
+        """
+        Test params a job kind does not accept are rejected.
+        """
+        payload = {"kind": Job.TRAIN, "params": {"output": "/tmp/x"}}
+        res = self.client.post(JOBS_URL, payload, format="json")
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("params", res.data)
+
+    def test_list_jobs_by_status(self):
+        """
+        Test listing jobs filtered by status.
+        """
+        queued = jobs.enqueue(Job.TRAIN)
+        jobs.cancel(jobs.enqueue(Job.IMPORT))
+
+        res = self.client.get(JOBS_URL, {"status": Job.QUEUED})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([job["id"] for job in res.data], [queued.id])
+
+    def test_cancel_job(self):
+        """
+        Test cancelling a queued job.
+        """
+        job = jobs.enqueue(Job.PRECOMPUTE)
+        res = self.client.post(cancel_url(job.id))
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data["status"], Job.CANCELLED)
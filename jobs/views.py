@@ -0,0 +1,56 @@
+"""
+Background job views
+"""
+
+from rest_framework import mixins, viewsets
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.decorators import action
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from core import jobs
+from core.models import Job
+from jobs import serializer
+
+
+class JobViewSet(
+    viewsets.GenericViewSet,
+    mixins.ListModelMixin,
+    mixins.CreateModelMixin,
+    mixins.RetrieveModelMixin,
+):
+    """
+    Queue, monitor and cancel background jobs. Staff only.
+    """
+
+    authentication_classes = (TokenAuthentication,)
+    permission_classes = (IsAdminUser,)
+    queryset = Job.objects.all()
+    serializer_class = serializer.JobSerializer
+    pagination_class = PageNumberPagination
+
+    def get_queryset(self):
+        """
+        Filter by ?status= and ?kind= when given
+        """
+        queryset = super().get_queryset()
+        for field in ("status", "kind"):
+            value = self.request.query_params.get(field)
+            if value:
+                queryset = queryset.filter(**{field: value})
+        return queryset
+
+    def perform_create(self, serializer):
+        """
+        Queue the job for the run_jobs workers
+        """
+        serializer.save(created_by=self.request.user)
+
+    @action(detail=True, methods=["post"])
+    def cancel(self, request, pk=None):
+        """
+        Cancel a queued job, or stop a running one at its next
+        progress point
+        """
+        job = jobs.cancel(self.get_object())
+        return Response(self.get_serializer(job).data)
@@ -3,10 +3,12 @@ Link Views
 """
 
 from rest_framework import viewsets, mixins
+from rest_framework.exceptions import ValidationError
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.authentication import TokenAuthentication
 from rest_framework.permissions import IsAuthenticated
 from core.models import Link
+from core.replicas import ReplicaReadMixin
 from link import serializer
 
 
@@ -15,6 +17,7 @@ class LinkPagination(PageNumberPagination):
 
 
 class LinkViewSet(
+    ReplicaReadMixin,
     viewsets.GenericViewSet,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
@@ -28,7 +31,7 @@ class LinkViewSet(
 
     authentication_classes = (TokenAuthentication,)
     permission_classes = (IsAuthenticated,)
-    queryset = Link.objects.all()
+    queryset = Link.objects.select_related("user", "movie", "linked_movie")
     serializer_class = serializer.LinkSerializer
     pagination_class = LinkPagination
 
@@ -56,7 +59,5 @@ class LinkViewSet(
             linked_movie=serializer.validated_data["linked_movie"],
             link_type=serializer.validated_data["link_type"],
         ).exists():
-            raise serializer.ValidationError(
-                "You have already created this link."
-            )
+            raise ValidationError("You have already created this link.")
         serializer.save(user=self.request.user)
@@ -0,0 +1,394 @@
+"""
+HTTP load test for the DRF API with scripted user journeys.
+
+Each virtual user logs in through the token endpoint, then loops
+over weighted journeys (browse, rate, tag, recommend) until the
+duration ends. Latency is recorded per endpoint and reported as
+RPS and p50/p95/p99.
+
+Usage (see run_loadtest.sh to seed and start a local server):
+    python -m loadtest.run_loadtest --host http://127.0.0.1:8089 \\
+        --users 20 --duration 60 --journeys browse=5 rate=2 tag=1
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import threading
+import time
+from urllib.parse import urlencode, urlsplit
+
+TOKEN_PATH = "/api/user/token/"
+MOVIES_PATH = "/api/movies/movies/"
+RATINGS_PATH = "/api/rating/ratings/"
+TAGS_PATH = "/api/tag/tags/"
+RECOMMENDATIONS_PATH = "/api/recommendations/"
+
+RATING_VALUES = [v / 2 for v in range(2, 11)]
+TAG_WORDS = ["classic", "funny", "plot twist", "atmospheric", "surreal"]
+# Journeys run unless --journeys is given
+DEFAULT_JOURNEYS = ["browse=5", "rate=2", "tag=1", "recommend=2"]
+
+
+def percentile(sorted_values, fraction):
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not sorted_values:
+        return None
+    rank = max(int(round(fraction * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+class Stats:
+    """
+    Thread-safe per-endpoint latency and status recorder.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = {}
+        self.statuses = {}
+
+    def record(self, name, seconds, status):
+        """
+        Record one request latency and status under name.
+        """
+        with self._lock:
+            self.latencies.setdefault(name, []).append(seconds)
+            counts = self.statuses.setdefault(name, {})
+            counts[status] = counts.get(status, 0) + 1
+
+    def summary(self, elapsed):
+        """
+        Return per-endpoint and total RPS and latency percentiles.
+        """
+        endpoints = {}
+        everything = []
+        for name, values in sorted(self.latencies.items()):
+            everything.extend(values)
+            endpoints[name] = self._describe(
+                values, self.statuses[name], elapsed
+            )
+        statuses = {}
+        for counts in self.statuses.values():
+            for status, count in counts.items():
+                statuses[status] = statuses.get(status, 0) + count
+        return {
+            "endpoints": endpoints,
+            "total": self._describe(everything, statuses, elapsed),
+        }
+
+    @staticmethod
+    def _describe(values, statuses, elapsed):
+        """
+        Summarize one list of latencies and its status counts.
+        """
+        ordered = sorted(values)
+        errors = sum(
+            count
+            for status, count in statuses.items()
+            if not str(status).startswith(("2", "3"))
+        )
+
+        def ms(value):
+            return None if value is None else round(value * 1000, 2)
+
+        return {
+            "requests": len(ordered),
+            "errors": errors,
+            "rps": round(len(ordered) / elapsed, 2) if elapsed else None,
+            "mean_ms": ms(sum(ordered) / len(ordered)) if ordered else None,
+            "p50_ms": ms(percentile(ordered, 0.50)),
+            "p95_ms": ms(percentile(ordered, 0.95)),
+            "p99_ms": ms(percentile(ordered, 0.99)),
+            "max_ms": ms(ordered[-1]) if ordered else None,
+            "status": {str(k): v for k, v in sorted(statuses.items())},
+        }
+
+
+class Client:
+    """
+    Keep-alive HTTP client for one virtual user.
+    """
+
+    def __init__(self, host, stats, timeout=30):
+        parts = urlsplit(host)
+        self.netloc = parts.netloc
+        self.https = parts.scheme == "https"
+        self.stats = stats
+        self.timeout = timeout
+        self.token = None
+        self._connection = None
+
+    def _connect(self):
+        """
+        Open a new keep-alive connection.
+        """
+        cls = (
+            http.client.HTTPSConnection
+            if self.https
+            else http.client.HTTPConnection
+        )
+        self._connection = cls(self.netloc, timeout=self.timeout)
+
+    def request(self, method, path, name, body=None, query=None):
+        """
+        Send a request and record its latency under name.
+        Returns (status, parsed JSON or None).
+        """
+        headers = {"Accept": "application/json"}
+        if self.token:
+            headers["Authorization"] = f"Token {self.token}"
+        payload = None
+        if body is not None:
+            payload = json.dumps(body)
+            headers["Content-Type"] = "application/json"
+        url = f"{path}?{urlencode(query)}" if query else path
+
+        if self._connection is None:
+            self._connect()
+        start = time.perf_counter()
+        try:
+            self._connection.request(method, url, payload, headers)
+            response = self._connection.getresponse()
+            raw = response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            # Drop the broken keep-alive connection
+            self._connection.close()
+            self._connection = None
+            self.stats.record(name, time.perf_counter() - start, "error")
+            return "error", None
+        self.stats.record(name, time.perf_counter() - start, status)
+        try:
+            return status, json.loads(raw) if raw else None
+        except ValueError:
+            return status, None
+
+    def close(self):
+        """
+        Close the keep-alive connection.
+        """
+        if self._connection is not None:
+            self._connection.close()
+
+
+def login(client, email, password):
+    """
+    Obtain a token through CreateTokenView.
+    """
+    status, data = client.request(
+        "POST",
+        TOKEN_PATH,
+        f"POST {TOKEN_PATH}",
+        body={"email": email, "password": password},
+    )
+    if status == 200 and data:
+        client.token = data["token"]
+    return client.token is not None
+
+
+def browse(client, rng, state):
+    """
+    List a catalogue page, search it and open one movie.
+    """
+    status, data = client.request(
+        "GET",
+        MOVIES_PATH,
+        f"GET {MOVIES_PATH}",
+        query={"page": rng.randint(1, state.get("pages", 1))},
+    )
+    if status == 200 and data:
+        state["pages"] = max(1, -(-data["count"] // 10))
+        state["movie_ids"] = [m["id"] for m in data["results"]] or (
+            state.get("movie_ids", [])
+        )
+    client.request(
+        "GET",
+        MOVIES_PATH,
+        f"GET {MOVIES_PATH}?search",
+        query={"search": rng.choice(["Synthetic", "Drama", "Comedy"])},
+    )
+    if state.get("movie_ids"):
+        movie_id = rng.choice(state["movie_ids"])
+        client.request(
+            "GET", f"{MOVIES_PATH}{movie_id}/", f"GET {MOVIES_PATH}<id>/"
+        )
+
+
+def rate(client, rng, state):
+    """
+    Rate a browsed movie, then list own ratings.
+    """
+    if not state.get("movie_ids"):
+        return browse(client, rng, state)
+    client.request(
+        "POST",
+        RATINGS_PATH,
+        f"POST {RATINGS_PATH}",
+        body={
+            "movies": rng.choice(state["movie_ids"]),
+            "rating": rng.choice(RATING_VALUES),
+        },
+    )
+    client.request("GET", RATINGS_PATH, f"GET {RATINGS_PATH}")
+
+
+def tag(client, rng, state):
+    """
+    Tag a browsed movie, then list own tags.
+    """
+    if not state.get("movie_ids"):
+        return browse(client, rng, state)
+    client.request(
+        "POST",
+        TAGS_PATH,
+        f"POST {TAGS_PATH}",
+        body={
+            "movie": rng.choice(state["movie_ids"]),
+            "tag": rng.choice(TAG_WORDS),
+        },
+    )
+    client.request("GET", TAGS_PATH, f"GET {TAGS_PATH}")
+
+
+def recommend(client, rng, state):
+    """
+    Fetch personalised recommendations.
+    """
+    client.request(
+        "GET",
+        RECOMMENDATIONS_PATH,
+        f"GET {RECOMMENDATIONS_PATH}",
+        query={"top_n": 10},
+    )
+
+
+JOURNEYS = {
+    "browse": browse,
+    "rate": rate,
+    "tag": tag,
+    "recommend": recommend,
+}
+
+
+def virtual_user(index, options, stats, deadline):
+    """
+    Log in and run weighted journeys until the deadline.
+    """
+    rng = random.Random(options.seed + index)
+    client = Client(options.host, stats)
+    email = options.email_pattern.format(index % options.accounts + 1)
+    try:
+        if not login(client, email, options.password):
+            return
+        names = list(options.journeys)
+        weights = [options.journeys[name] for name in names]
+        state = {}
+        browse(client, rng, state)
+        while time.monotonic() < deadline:
+            JOURNEYS[rng.choices(names, weights)[0]](client, rng, state)
+            if options.think_time:
+                time.sleep(rng.uniform(0, 2 * options.think_time))
+    finally:
+        client.close()
+
+
+def run(options):
+    """
+    Run the load test and return the summary dict.
+    """
+    stats = Stats()
+    start = time.monotonic()
+    deadline = start + options.ramp_up + options.duration
+    threads = []
+    for index in range(options.users):
+        thread = threading.Thread(
+            target=virtual_user,
+            args=(index, options, stats, deadline),
+            daemon=True,
+        )
+        thread.start()
+        threads.append(thread)
+        if options.ramp_up:
+            time.sleep(options.ramp_up / options.users)
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - start
+    summary = stats.summary(elapsed)
+    summary["config"] = {
+        "host": options.host,
+        "users": options.users,
+        "duration": options.duration,
+        "ramp_up": options.ramp_up,
+        "journeys": options.journeys,
+        "elapsed_seconds": round(elapsed, 3),
+    }
+    return summary
+
+
+def parse_journeys(values):
+    """
+    Parse name=weight pairs into a dict.
+    """
+    journeys = {}
+    for value in values:
+        name, _, weight = value.partition("=")
+        if name not in JOURNEYS:
+            raise argparse.ArgumentTypeError(f"Unknown journey {name!r}")
+        journeys[name] = float(weight or 1)
+    return journeys
+
+
+def main(argv=None):
+    """
+    Parse arguments, run the load test and write the JSON report.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="http://127.0.0.1:8089")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=60)
+    parser.add_argument("--ramp-up", type=float, default=5)
+    parser.add_argument("--think-time", type=float, default=0)
+    parser.add_argument(
+        "--journeys",
+        nargs="*",
+        default=DEFAULT_JOURNEYS,
+    )
+    parser.add_argument(
+        "--accounts",
+        type=int,
+        default=100,
+        help="Number of seeded accounts (seed_loadtest --users).",
+    )
+    parser.add_argument("--email-pattern", default="loadtest{}@example.com")
+    parser.add_argument("--password", default="loadtest123")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--output", default=os.path.join("loadtest", "results", "latest.json")
+    )
+    options = parser.parse_args(argv)
+    options.journeys = parse_journeys(options.journeys)
+
+    summary = run(options)
+    os.makedirs(os.path.dirname(options.output) or ".", exist_ok=True)
+    with open(options.output, "w") as f:
+        json.dump(summary, f, indent=2)
+
+    header = f"{'endpoint':<36}{'reqs':>8}{'err':>6}{'rps':>9}"
+    print(header + f"{'p50':>9}{'p95':>9}{'p99':>9}  (ms)")
+    rows = list(summary["endpoints"].items()) + [("TOTAL", summary["total"])]
+    for name, row in rows:
+        print(
+            f"{name:<36}{row['requests']:>8}{row['errors']:>6}"
+            f"{row['rps'] or 0:>9.1f}{row['p50_ms'] or 0:>9.1f}"
+            f"{row['p95_ms'] or 0:>9.1f}{row['p99_ms'] or 0:>9.1f}"
+        )
+    print(f"Report written to {options.output}")
+
+
+if __name__ == "__main__":
+    main()
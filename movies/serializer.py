@@ -9,7 +9,22 @@ from core.models import Movie
 class MovieSerializer(serializers.ModelSerializer):
     """Serializer for movie objects"""
 
+    # Read from the materialized MovieStats row
+    rating_count = serializers.IntegerField(
+        source="stats.rating_count", read_only=True, default=0
+    )
+    average_rating = serializers.FloatField(
+        source="stats.rating_mean", read_only=True, default=None
+    )
+
     class Meta:
         model = Movie
-        fields = ("id", "title", "genre", "movieId")
+        fields = (
+            "id",
+            "title",
+            "genre",
+            "movieId",
+            "rating_count",
+            "average_rating",
+        )
         read_only_fields = ("id",)
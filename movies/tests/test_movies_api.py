@@ -7,7 +7,8 @@ from django.test import TestCase
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
-from core.models import Movie
+from core.models import Movie, Rating
+from core.query_budget import QueryBudgetTestMixin
 from movies.serializer import MovieSerializer
 from django.db import models
 
@@ -50,7 +51,7 @@ class publicMovieApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
 
 
-class privateMovieApiTests(TestCase):
+class privateMovieApiTests(QueryBudgetTestMixin, TestCase):
     """
     Test the private movies API.
     """
@@ -91,3 +92,38 @@ class privateMovieApiTests(TestCase):
         serializer = MovieSerializer(movies, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.data["results"], serializer.data)
+
+    def test_list_within_query_budget(self):
+        """
+        Test listing movies stays within the declared query budget.
+        """
+        for _ in range(5):
+            create_movie(user=self.user)
+        with self.assertViewQueryBudget("movies:movie-list"):
+            res = self.client.get(MOVIES_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_rating_stats_and_popularity_ordering(self):
+        """
+        Test movies carry their rating stats and can be ordered
+        by popularity.
+        """
+        quiet = create_movie(user=self.user, title="Quiet", movieId=10)
+        popular = create_movie(user=self.user, title="Popular", movieId=11)
+        other = get_user_model().objects.create_user(
+            "other@example.com", "testpass123"
+        )
+        Rating.objects.create(user=self.user, movies=popular, rating=4)
+        Rating.objects.create(user=other, movies=popular, rating=3)
+
+        res = self.client.get(MOVIES_URL, {"ordering": "-stats__rating_count"})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        results = res.data["results"]
+        self.assertEqual(
+            [movie["id"] for movie in results], [popular.id, quiet.id]
+        )
+        self.assertEqual(results[0]["rating_count"], 2)
+        self.assertAlmostEqual(results[0]["average_rating"], 3.5)
+        self.assertEqual(results[1]["rating_count"], 0)
+        self.assertIsNone(results[1]["average_rating"])
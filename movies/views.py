@@ -4,10 +4,12 @@ Views for the movies app.
 
 from rest_framework import filters
 from rest_framework import viewsets, mixins
+from rest_framework.exceptions import ValidationError
 from rest_framework.authentication import TokenAuthentication
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAuthenticated
 from core.models import Movie
+from core.replicas import ReplicaReadMixin
 from movies import serializer
 
 
@@ -16,6 +18,7 @@ class MoviePagination(PageNumberPagination):
 
 
 class MovieViewSet(
+    ReplicaReadMixin,
     viewsets.GenericViewSet,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
@@ -28,12 +31,18 @@ class MovieViewSet(
     """
 
     serializer_class = serializer.MovieSerializer
-    queryset = Movie.objects.all()
+    queryset = Movie.objects.select_related("stats")
     authentication_classes = (TokenAuthentication,)
     permission_classes = (IsAuthenticated,)
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ["title", "genres"]
-    ordering_fields = ["id", "title"]
+    search_fields = ["title", "genre"]
+    # Popularity and average rating come from MovieStats
+    ordering_fields = [
+        "id",
+        "title",
+        "stats__rating_count",
+        "stats__rating_mean",
+    ]
     pagination_class = MoviePagination
 
     def get_queryset(self):
@@ -45,5 +54,5 @@ class MovieViewSet(
         if Movie.objects.filter(
             title=serializer.validated_data["title"]
         ).exists():
-            raise serializer.ValidationError("This movie already exists.")
+            raise ValidationError("This movie already exists.")
         serializer.save(user=self.request.user)
@@ -8,6 +8,7 @@ from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient
 from core.models import Movie, Rating
+from core.query_budget import QueryBudgetTestMixin
 from rating.serializer import RatingSerializer
 
 
@@ -43,7 +44,7 @@ class publicRatingAPI(TestCase):
         self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
 
 
-class privateRatingAPI(TestCase):
+class privateRatingAPI(QueryBudgetTestMixin, TestCase):
     """
     Test the private rating API.
     """
@@ -97,3 +98,41 @@ class privateRatingAPI(TestCase):
         serializer = RatingSerializer(rating, many=True)
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.data["results"], serializer.data)
+
+    def test_create_rating(self):
+        """
+        Test creating a rating, and that rating the same
+        movie twice is rejected.
+        """
+        movies = Movie.objects.create(
+            user=self.user,
+            title="Sample Movie",
+            genre="Action",
+            movieId=1,
+        )
+        payload = {"movies": movies.id, "rating": "4.5"}
+        res = self.client.post(RATING_URL, payload)
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(
+            Rating.objects.filter(user=self.user, movies=movies).exists()
+        )
+
+        res = self.client.post(RATING_URL, {**payload, "rating": "3.0"})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_list_within_query_budget(self):
+        """
+        Test listing ratings stays within the declared query budget.
+        """
+        for movie_id in range(1, 6):
+            movies = Movie.objects.create(
+                user=self.user,
+                title=f"Sample Movie {movie_id}",
+                genre="Action",
+                movieId=movie_id,
+            )
+            create_rating(user=self.user, movies=movies)
+        with self.assertViewQueryBudget("rating:rating-list"):
+            res = self.client.get(RATING_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data["results"]), 5)
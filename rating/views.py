@@ -3,10 +3,13 @@ Views for the rating app.
 """
 
 from rest_framework import viewsets, mixins
+from rest_framework.exceptions import ValidationError
 from rest_framework.authentication import TokenAuthentication
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAuthenticated
 from core.models import Rating
+from core.activity import BatchActivityMixin
+from core.replicas import PinOnWriteMixin
 from rating import serializer
 from rest_framework import filters
 
@@ -16,6 +19,8 @@ class RatingPagination(PageNumberPagination):
 
 
 class RatingViewSet(
+    PinOnWriteMixin,
+    BatchActivityMixin,
     viewsets.GenericViewSet,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
@@ -30,11 +35,11 @@ class RatingViewSet(
     pagination_class = RatingPagination
 
     serializer_class = serializer.RatingSerializer
-    queryset = Rating.objects.all()
+    queryset = Rating.objects.select_related("user", "movies")
     authentication_classes = (TokenAuthentication,)
     permission_classes = (IsAuthenticated,)
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ["movie__title"]
+    search_fields = ["movies__title"]
     ordering_fields = ["created_at", "rating"]
 
     def get_queryset(self):
@@ -49,9 +54,8 @@ class RatingViewSet(
         Create a new rating.
         """
         if Rating.objects.filter(
-            movie=serializer.validated_data["movies"]
+            user=self.request.user,
+            movies=serializer.validated_data["movies"],
         ).exists():
-            raise serializer.ValidationError(
-                "You have already rated this movie."
-            )
+            raise ValidationError("You have already rated this movie.")
         serializer.save(user=self.request.user)
@@ -0,0 +1,85 @@
+"""
+Micro-batching of concurrent scoring requests.
+"""
+
+import asyncio
+
+
+class RequestCoalescer:
+    """
+    Collects requests submitted within max_wait seconds of each
+    other (or until max_batch_size are pending) and passes them
+    to batch_fn as one list, run on executor. batch_fn returns
+    one result per request, in order; each caller gets its own.
+
+    State is bound to the running event loop and reset when
+    a new loop is seen, so one instance can be shared by a
+    process serving from several loops over its lifetime.
+    """
+
+    def __init__(
+        self, batch_fn, max_batch_size=64, max_wait=0.002, executor=None
+    ):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.executor = executor
+        self.batches = 0
+        self.requests = 0
+        self._loop = None
+        self._pending = []
+        self._timer = None
+
+    @property
+    def mean_batch_size(self):
+        """
+        Average number of requests per executed batch.
+        """
+        return self.requests / self.batches if self.batches else 0.0
+
+    async def submit(self, request):
+        """
+        Queue a request and wait for its result.
+        """
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._pending = []
+            self._timer = None
+        future = loop.create_future()
+        self._pending.append((request, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self):
+        """
+        Hand the pending requests to a batch task.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            self._loop.create_task(self._run(batch))
+
+    async def _run(self, batch):
+        """
+        Run batch_fn off the loop and fan results back out.
+        """
+        self.batches += 1
+        self.requests += len(batch)
+        try:
+            results = await self._loop.run_in_executor(
+                self.executor, self.batch_fn, [r for r, _ in batch]
+            )
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
@@ -0,0 +1,280 @@
+"""
+Model loading and thread-offloaded scoring for recommendations.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from django.conf import settings
+from core.models import Movie, Rating, UserStats
+from recommendation.batching import RequestCoalescer
+from src.lazy import LazyModule
+
+# NumPy-backed model code loads with the first request, not at
+# URLconf import, so management commands start without it
+factor_model = LazyModule("src.factor_model")
+shared_arrays = LazyModule("src.shared_arrays")
+topn_table = LazyModule("src.topn_table")
+
+logger = logging.getLogger(__name__)
+
+_model = None
+# (inode, mtime) of the model file _model was loaded from
+_model_version = None
+# Shared memory segment backing _model in "shared_memory" mode
+_segment = None
+_table = None
+# TopNTable.version of the table in _table
+_table_version = None
+_model_lock = threading.Lock()
+_executor = None
+_coalescer = None
+
+
+def _file_version(path):
+    """
+    Return the (inode, mtime) of path, which changes when a new
+    version is published over it, or None when it is missing.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns
+
+
+def get_model():
+    """
+    Return the factor model, loading it on first use and again
+    once a new version has been published at its path (see
+    src.retraining.publish). A model whose file disappears keeps
+    being served.
+    """
+    global _model, _model_version
+    path = settings.RECOMMENDER_MODEL_PATH
+    version = _file_version(path)
+    if _model is None or (version is not None and version != _model_version):
+        with _model_lock:
+            if _model is None or (
+                version is not None and version != _model_version
+            ):
+                _model = _load_model(path)
+                _model_version = version
+    return _model
+
+
+def _load_model(path):
+    """
+    Load the model privately, or into a shared memory segment
+    mapped by every worker when RECOMMENDER_MODEL_SHARING is
+    "shared_memory". The segment of a replaced version is
+    unlinked; workers still serving it keep their mapping.
+    """
+    global _segment
+    if settings.RECOMMENDER_MODEL_SHARING == "shared_memory":
+        model, segment = factor_model.FactorModel.load_shared(path)
+        if _segment is not None and _segment.name != segment.name:
+            try:
+                _segment.unlink()
+            except FileNotFoundError:
+                # Another worker unlinked it first
+                pass
+        _segment = segment
+        return model
+    return factor_model.FactorModel.load(path)
+
+
+def preload():
+    """
+    Load the model and table at application import when
+    RECOMMENDER_PRELOAD is set. Under gunicorn --preload this
+    runs once in the master and forked workers share the
+    arrays copy-on-write.
+    """
+    if not settings.RECOMMENDER_PRELOAD:
+        return
+    try:
+        get_model()
+    except FileNotFoundError:
+        logger.warning(
+            "No recommender model at %s to preload.",
+            settings.RECOMMENDER_MODEL_PATH,
+        )
+    get_table()
+
+
+def memory_stats():
+    """
+    Return this worker's RSS split into shared and private
+    bytes next to the size of the model it serves.
+    """
+    stats = {
+        "pid": os.getpid(),
+        "sharing": settings.RECOMMENDER_MODEL_SHARING,
+        "model_bytes": _model.nbytes if _model is not None else 0,
+        "segment": _segment.name if _segment is not None else None,
+        "segment_bytes": _segment.size if _segment is not None else 0,
+    }
+    stats.update(shared_arrays.process_memory())
+    return stats
+
+
+def get_table():
+    """
+    Return the precomputed TopNTable, or None when no table has
+    been built. The table is reopened when a newer one has been
+    saved since it was opened. Touches the filesystem, so async
+    code calls it off the event loop.
+    """
+    global _table, _table_version
+    path = settings.RECOMMENDER_TOPN_PATH
+    version = topn_table.TopNTable.version(path)
+    if version != _table_version:
+        with _model_lock:
+            if version != _table_version:
+                try:
+                    _table = (
+                        topn_table.TopNTable.open(path)
+                        if version is not None
+                        else None
+                    )
+                except FileNotFoundError:
+                    # Replaced while opening; retried next call
+                    return _table
+                _table_version = version
+    return _table
+
+
+def reset_model():
+    """
+    Drop the loaded model and table so the next request
+    reloads them.
+    """
+    global _model, _model_version, _segment, _table, _table_version
+    with _model_lock:
+        _model = None
+        _model_version = None
+        _segment = None
+        _table = None
+        _table_version = None
+
+
+def get_executor():
+    """
+    Return the bounded thread pool used for scoring. NumPy
+    releases the GIL in the matrix products, so scoring threads
+    run in parallel with each other and with the event loop.
+    """
+    global _executor
+    if _executor is None:
+        with _model_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.RECOMMENDER_SCORING_THREADS,
+                    thread_name_prefix="recommender",
+                )
+    return _executor
+
+
+def get_coalescer():
+    """
+    Return the coalescer batching concurrent scoring requests,
+    or None when RECOMMENDER_BATCH_MAX_SIZE disables batching.
+    """
+    global _coalescer
+    if settings.RECOMMENDER_BATCH_MAX_SIZE <= 1:
+        return None
+    if _coalescer is None:
+        _coalescer = RequestCoalescer(
+            score_batch,
+            max_batch_size=settings.RECOMMENDER_BATCH_MAX_SIZE,
+            max_wait=settings.RECOMMENDER_BATCH_MAX_WAIT_MS / 1000,
+            executor=get_executor(),
+        )
+    return _coalescer
+
+
+def score_batch(requests):
+    """
+    Score (user_id, rated movieIds, top_n) requests with one
+    matrix-matrix product and return one ranking per request.
+    """
+    user_ids, rated, top_ns = zip(*requests)
+    rankings = get_model().recommend_batch(user_ids, rated, max(top_ns))
+    return [ranking[:top_n] for ranking, top_n in zip(rankings, top_ns)]
+
+
+async def rank(user_id, rated, top_n):
+    """
+    Return the top-n (movieId, score) pairs for a user, scored
+    off the event loop and batched with concurrent requests.
+    """
+    coalescer = get_coalescer()
+    if coalescer is not None:
+        return await coalescer.submit((user_id, rated, top_n))
+    loop = asyncio.get_running_loop()
+    model = await loop.run_in_executor(get_executor(), get_model)
+    return await loop.run_in_executor(
+        get_executor(), model.recommend, user_id, rated, top_n
+    )
+
+
+async def rated_movie_ids(user):
+    """
+    Return the movieIds the user has rated.
+    """
+    return [
+        movie_id
+        async for movie_id in Rating.objects.filter(user=user).values_list(
+            "movies__movieId", flat=True
+        )
+    ]
+
+
+async def precomputed(user, top_n):
+    """
+    Return the user's precomputed recommendations, or None when
+    there is no table, the user is not in it, or they created,
+    changed or deleted a rating after it was built.
+    """
+    loop = asyncio.get_running_loop()
+    table = await loop.run_in_executor(get_executor(), get_table)
+    if table is None or top_n > table.top_n:
+        return None
+    built_at = datetime.fromtimestamp(table.built_at, tz=timezone.utc)
+    if await UserStats.objects.filter(
+        user=user, changed_at__gt=built_at
+    ).aexists():
+        return None
+    return table.lookup(user.id, top_n)
+
+
+async def recommend_for_user(user, top_n=10):
+    """
+    Return the top-n recommendations for a user as dicts
+    with movieId, title, genre and score.
+    """
+    ranked = await precomputed(user, top_n)
+    if ranked is None:
+        rated = await rated_movie_ids(user)
+        ranked = await rank(user.id, rated, top_n)
+    movies = {
+        movie.movieId: movie
+        async for movie in Movie.objects.filter(
+            movieId__in=[movie_id for movie_id, _ in ranked]
+        )
+    }
+    return [
+        {
+            "movieId": movie_id,
+            "title": movies[movie_id].title,
+            "genre": movies[movie_id].genre,
+            "score": round(score, 4),
+        }
+        for movie_id, score in ranked
+        if movie_id in movies
+    ]
@@ -0,0 +1,77 @@
+"""
+Tests for the request coalescer.
+"""
+
+import asyncio
+
+from django.test import SimpleTestCase
+from recommendation.batching import RequestCoalescer
+
+
+class RequestCoalescerTests(SimpleTestCase):
+    """
+    Test batching and fan-out of concurrent requests.
+    """
+
+    def test_concurrent_requests_share_a_batch(self):
+        """
+        Test requests within the wait window run as one batch
+        and each caller gets its own result.
+        """
+        batches = []
+
+        def double(batch):
+            batches.append(list(batch))
+            return [value * 2 for value in batch]
+
+        coalescer = RequestCoalescer(double, max_batch_size=10)
+
+        async def submit_all():
+            return await asyncio.gather(
+                *(coalescer.submit(value) for value in range(4))
+            )
+
+        self.assertEqual(asyncio.run(submit_all()), [0, 2, 4, 6])
+        self.assertEqual(batches, [[0, 1, 2, 3]])
+        self.assertEqual(coalescer.mean_batch_size, 4)
+
+    def test_full_batch_flushes_immediately(self):
+        """
+        Test batches never exceed max_batch_size.
+        """
+        sizes = []
+
+        def identity(batch):
+            sizes.append(len(batch))
+            return batch
+
+        coalescer = RequestCoalescer(identity, max_batch_size=3, max_wait=1)
+
+        async def submit_all():
+            return await asyncio.gather(
+                *(coalescer.submit(value) for value in range(6))
+            )
+
+        self.assertEqual(asyncio.run(submit_all()), list(range(6)))
+        self.assertEqual(sizes, [3, 3])
+
+    def test_errors_reach_every_caller(self):
+        """
+        Test an exception in the batch function is raised
+        to each waiting request.
+        """
+
+        def fail(batch):
+            raise FileNotFoundError("model.npz")
+
+        coalescer = RequestCoalescer(fail)
+
+        async def submit_all():
+            return await asyncio.gather(
+                coalescer.submit(1),
+                coalescer.submit(2),
+                return_exceptions=True,
+            )
+
+        results = asyncio.run(submit_all())
+        self.assertTrue(all(isinstance(r, FileNotFoundError) for r in results))
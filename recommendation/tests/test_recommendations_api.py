@@ -0,0 +1,220 @@
+"""
+This module contains tests for the async recommendations API.
+"""
+
+import os
+import tempfile
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from core.models import Movie, Rating, UserStats
+from recommendation import services
+from src.factor_model import FactorModel
+from src.retraining import publish
+from src.tests.test_factor_model import sample_factor_model
+from src.topn_table import TopNTable
+
+RECOMMENDATIONS_URL = reverse("recommendation:recommendations")
+
+
+class RecommendationsAPITests(TestCase):
+    """
+    Test the recommendations endpoint.
+    """
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            "test@example.com", "testpass123"
+        )
+        # The test user takes the place of userId 1 in the model
+        user_id = self.user.id
+        self.tmp = tempfile.TemporaryDirectory()
+        self.model_path = os.path.join(self.tmp.name, "factor_model.npz")
+        sample_factor_model((user_id + 2, user_id, user_id + 1)).save(
+            self.model_path
+        )
+        self.topn_path = os.path.join(self.tmp.name, "topn")
+        self.settings_override = override_settings(
+            RECOMMENDER_MODEL_PATH=self.model_path,
+            RECOMMENDER_TOPN_PATH=self.topn_path,
+        )
+        self.settings_override.enable()
+        services.reset_model()
+
+        self.token = Token.objects.create(user=self.user)
+        self.movies = {
+            movie_id: Movie.objects.create(
+                movieId=movie_id,
+                title=f"Movie {movie_id}",
+                genre="Drama",
+                user=self.user,
+            )
+            for movie_id in (1, 2, 2571, 3000)
+        }
+
+    def tearDown(self):
+        services.reset_model()
+        self.settings_override.disable()
+        self.tmp.cleanup()
+
+    def get(self, **params):
+        return self.client.get(
+            RECOMMENDATIONS_URL,
+            params,
+            HTTP_AUTHORIZATION=f"Token {self.token.key}",
+        )
+
+    def test_auth_required(self):
+        """
+        Test that authentication is required.
+        """
+        res = self.client.get(RECOMMENDATIONS_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_recommendations_skip_rated_movies(self):
+        """
+        Test recommendations are ranked and exclude rated movies.
+        """
+        Rating.objects.create(user=self.user, movies=self.movies[1], rating=5)
+
+        res = self.get(top_n=2)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        results = res.json()["results"]
+        self.assertEqual([r["movieId"] for r in results], [2, 2571])
+        self.assertEqual(results[0]["title"], "Movie 2")
+
+    def test_published_models_are_served(self):
+        """
+        Test a model published over the served one is loaded
+        by the next request.
+        """
+        self.assertEqual(
+            [r["movieId"] for r in self.get(top_n=2).json()["results"]],
+            [1, 2],
+        )
+        model = FactorModel.load(self.model_path)
+        model.item_bias[:] = [0, 0, 0, 10]
+        publish(model, self.model_path)
+
+        results = self.get(top_n=2).json()["results"]
+        self.assertEqual(results[0]["movieId"], 3000)
+
+    def test_top_n_must_be_integer(self):
+        """
+        Test a non-integer top_n is rejected.
+        """
+        res = self.get(top_n="many")
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_missing_model_returns_503(self):
+        """
+        Test the endpoint reports an unavailable model.
+        """
+        services.reset_model()
+        with override_settings(RECOMMENDER_MODEL_PATH="/nonexistent.npz"):
+            res = self.get()
+        self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+
+    def test_precomputed_table_is_served(self):
+        """
+        Test users without new activity are served from the
+        precomputed table.
+        """
+        model = FactorModel.load(self.model_path)
+        table = TopNTable.build(model, top_n=3)
+        # Mark the stored rows so they differ from online scoring
+        table.items[:] = [3000, 2571, 2]
+        table.save(self.topn_path)
+
+        res = self.get(top_n=2)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        results = res.json()["results"]
+        self.assertEqual([r["movieId"] for r in results], [3000, 2571])
+
+    def test_tables_built_later_are_served(self):
+        """
+        Test a table saved after the first request, and each
+        newer one, is picked up without a restart.
+        """
+        self.assertEqual(self.get(top_n=2).status_code, status.HTTP_200_OK)
+        model = FactorModel.load(self.model_path)
+        for items in ([3000, 2571, 2], [2, 3000, 2571]):
+            table = TopNTable.build(model, top_n=3)
+            table.items[:] = items
+            table.save(self.topn_path)
+
+            results = self.get(top_n=2).json()["results"]
+            self.assertEqual([r["movieId"] for r in results], items[:2])
+
+    def test_new_activity_bypasses_precomputed_table(self):
+        """
+        Test users who rated after the table was built are
+        scored online.
+        """
+        model = FactorModel.load(self.model_path)
+        table = TopNTable.build(model, top_n=3)
+        table.items[:] = [3000, 2571, 2]
+        table.built_at -= 60
+        table.save(self.topn_path)
+        Rating.objects.create(user=self.user, movies=self.movies[1], rating=5)
+
+        res = self.get(top_n=2)
+
+        results = res.json()["results"]
+        self.assertEqual([r["movieId"] for r in results], [2, 2571])
+
+    def test_changed_and_deleted_ratings_bypass_precomputed_table(self):
+        """
+        Test updating or deleting a rating after the table was
+        built also scores the user online.
+        """
+        rating = Rating.objects.create(
+            user=self.user, movies=self.movies[1], rating=5
+        )
+        model = FactorModel.load(self.model_path)
+        for change in ("update", "delete"):
+            table = TopNTable.build(model, top_n=3)
+            table.items[:] = [3000, 2571, 2]
+            table.built_at -= 60
+            # The rating and its stats predate the table
+            earlier = timezone.now() - timedelta(seconds=120)
+            Rating.objects.filter(pk=rating.pk).update(created_at=earlier)
+            UserStats.objects.filter(user=self.user).update(changed_at=earlier)
+            table.save(self.topn_path)
+            if change == "update":
+                rating.rating = 2
+                rating.save()
+            else:
+                rating.delete()
+
+            results = self.get(top_n=2).json()["results"]
+            self.assertEqual(
+                [r["movieId"] for r in results],
+                [2, 2571] if change == "update" else [1, 2],
+            )
+
+    def test_memory_stats_staff_only(self):
+        """
+        Test the memory report needs a staff token.
+        """
+        memory_url = reverse("recommendation:memory")
+        headers = {"HTTP_AUTHORIZATION": f"Token {self.token.key}"}
+        res = self.client.get(memory_url, **headers)
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.user.is_staff = True
+        self.user.save()
+        self.get()
+        res = self.client.get(memory_url, **headers)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        stats = res.json()
+        self.assertEqual(stats["sharing"], "private")
+        self.assertEqual(stats["model_bytes"], services.get_model().nbytes)
@@ -0,0 +1,13 @@
+"""
+Recommendation URL patterns.
+"""
+
+from django.urls import path
+from recommendation import views
+
+app_name = "recommendation"
+
+urlpatterns = [
+    path("", views.recommendations, name="recommendations"),
+    path("memory/", views.memory, name="memory"),
+]
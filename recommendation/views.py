@@ -0,0 +1,79 @@
+"""
+Views for the recommendation app.
+"""
+
+from django.http import JsonResponse
+from rest_framework.authtoken.models import Token
+from core.replicas import ais_pinned, replica_reads
+from recommendation import services
+
+MAX_TOP_N = 100
+
+
+async def authenticate(request):
+    """
+    Return the user for a "Token <key>" Authorization header,
+    or None.
+    """
+    parts = request.headers.get("Authorization", "").split()
+    if len(parts) != 2 or parts[0].lower() != "token":
+        return None
+    try:
+        token = await Token.objects.select_related("user").aget(key=parts[1])
+    except Token.DoesNotExist:
+        return None
+    return token.user if token.user.is_active else None
+
+
+async def recommendations(request):
+    """
+    Return personalised recommendations for the authenticated
+    user. Scoring runs in a thread pool so the event loop keeps
+    serving other requests.
+    """
+    if request.method != "GET":
+        return JsonResponse(
+            {"detail": f'Method "{request.method}" not allowed.'}, status=405
+        )
+    user = await authenticate(request)
+    if user is None:
+        return JsonResponse(
+            {"detail": "Authentication credentials were not provided."},
+            status=401,
+        )
+    try:
+        top_n = int(request.GET.get("top_n", 10))
+    except ValueError:
+        return JsonResponse(
+            {"top_n": ["A valid integer is required."]}, status=400
+        )
+    top_n = max(1, min(top_n, MAX_TOP_N))
+
+    try:
+        # Users who just rated read the primary to see their ratings
+        with replica_reads(not await ais_pinned(user)):
+            results = await services.recommend_for_user(user, top_n)
+    except FileNotFoundError:
+        return JsonResponse(
+            {"detail": "Recommendation model is not available."}, status=503
+        )
+    return JsonResponse({"results": results})
+
+
+async def memory(request):
+    """
+    Return this worker's RSS, shared and private memory next to
+    the size of the loaded model. Staff only.
+    """
+    user = await authenticate(request)
+    if user is None:
+        return JsonResponse(
+            {"detail": "Authentication credentials were not provided."},
+            status=401,
+        )
+    if not user.is_staff:
+        return JsonResponse(
+            {"detail": "You do not have permission to perform this action."},
+            status=403,
+        )
+    return JsonResponse(services.memory_stats())
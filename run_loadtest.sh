@@ -0,0 +1,35 @@
+#!/bin/bash
+
+# Seed a local database, start the API and run the load test.
+# Extra arguments are passed to loadtest/run_loadtest.py, e.g.
+#   ./run_loadtest.sh --users 50 --duration 120
+# Set POSTGRES_HOST/POSTGRES_NAME/... to test against Postgres,
+# otherwise a local SQLite file stands in for it.
+
+export DJANGO_SETTINGS_MODULE=app.settings_loadtest
+PORT=${LOADTEST_PORT:-8089}
+
+python manage.py migrate --noinput &&
+python manage.py seed_loadtest --users ${LOADTEST_ACCOUNTS:-100} &&
+python manage.py train_recommender --from-db &&
+python manage.py precompute_recommendations --from-db || exit 1
+
+if command -v uvicorn > /dev/null; then
+  # ASGI keeps the async recommendations view on the event loop
+  uvicorn app.asgi:application --port $PORT --workers ${LOADTEST_WORKERS:-4} &
+elif command -v gunicorn > /dev/null; then
+  gunicorn app.wsgi -b 127.0.0.1:$PORT -w ${LOADTEST_WORKERS:-4} &
+else
+  # runserver latencies include ~40ms Nagle/delayed-ACK stalls on
+  # keep-alive connections; install gunicorn for meaningful numbers
+  python manage.py runserver --noreload --nothreading 127.0.0.1:$PORT &
+fi
+SERVER_PID=$!
+trap "kill $SERVER_PID" EXIT
+
+until python -c "import urllib.request; urllib.request.urlopen('http://127.0.0.1:$PORT/api/schema/')" 2> /dev/null; do
+  sleep 1
+done
+
+python -m loadtest.run_loadtest --host http://127.0.0.1:$PORT \
+  --accounts ${LOADTEST_ACCOUNTS:-100} "$@"
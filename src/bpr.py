@@ -0,0 +1,231 @@
+"""
+This module contains BPR, a Bayesian Personalized Ranking model
+fitted by NumPy mini-batch SGD over sampled (user, positive,
+negative) triples, optionally Hogwild-style across processes
+sharing one copy of the factors.
+"""
+
+import secrets
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from src.factor_model import FactorModel
+from src.implicit import ImplicitFeedback
+from src.shared_arrays import attach, publish
+
+# Interactions, shared factor views and options of pool workers
+# (inherited on fork instead of pickled per task)
+_WORKER_STATE = {}
+
+
+def _init_worker(segment, feedback, options):
+    """
+    Map the shared factors writable in the worker process.
+    """
+    shm, arrays = attach(segment, writable=True)
+    _WORKER_STATE.update(
+        shm=shm, arrays=arrays, feedback=feedback, options=options
+    )
+
+
+def _train_part(task):
+    """
+    Train one worker's part of an epoch; task is (epoch, part,
+    parts). Returns the number of triples trained on.
+    """
+    epoch, part, parts = task
+    state = _WORKER_STATE
+    return _train(
+        state["feedback"],
+        state["arrays"],
+        state["options"],
+        epoch,
+        part,
+        parts,
+    )
+
+
+def _train(feedback, arrays, options, epoch, part=0, parts=1):
+    """
+    Apply the SGD updates of part of an epoch to arrays in place
+    and return the number of triples trained on. All parts of an
+    epoch share its seed, so together they make one pass.
+    """
+    trained = 0
+    for users, positives, negatives in feedback.triples(
+        options["batch_size"],
+        sampler=options["sampler"],
+        seed=(options["seed"], epoch),
+        shard=part,
+        n_shards=parts,
+    ):
+        _step(
+            users,
+            positives,
+            negatives,
+            options["lr"],
+            options["reg"],
+            arrays["user_factors"],
+            arrays["item_factors"],
+            arrays["item_bias"],
+        )
+        trained += len(users)
+    return trained
+
+
+def _add_rows(target, rows, values):
+    """
+    np.add.at(target, rows, values) for a C-contiguous 2-D
+    target, through the (several times faster) 1-D np.add.at on
+    its flat view.
+    """
+    flat = target.view()
+    # Raises instead of silently updating a copy
+    flat.shape = (-1,)
+    width = target.shape[1]
+    columns = np.arange(width)
+    np.add.at(flat, (rows[:, None] * width + columns).ravel(), values.ravel())
+
+
+def _step(u, i, j, lr, reg, P, Q, b):
+    """
+    Apply one BPR update for a batch of triples, in place:
+    gradient ascent on ln sigmoid(x_uij) with
+    x_uij = P[u] . (Q[i] - Q[j]) + b[i] - b[j].
+    """
+    pu, qi, qj = P[u], Q[i], Q[j]
+    bi, bj = b[i], b[j]
+    difference = qi - qj
+    x = np.einsum("ij,ij->i", pu, difference) + bi - bj
+    # lr * sigmoid(-x), sigmoid(-x) being the derivative of
+    # ln sigmoid(x), written without overflow
+    g = lr * 0.5 * (1 - np.tanh(0.5 * x))
+    decay = lr * reg
+    difference *= g[:, None]
+    difference -= decay * pu
+    _add_rows(P, u, difference)
+    # Positive and negative items in one scatter
+    pu *= g[:, None]
+    items = np.concatenate([i, j])
+    _add_rows(Q, items, np.concatenate([pu - decay * qi, -pu - decay * qj]))
+    np.add.at(b, items, np.concatenate([g - decay * bi, -g - decay * bj]))
+
+
+class BPR:
+    """
+    Bayesian Personalized Ranking (Rendle et al.): scores
+    user factors . item factors + item bias, fitted so that each
+    user's interactions rank above items they did not interact
+    with, by mini-batch SGD on ln sigmoid(score(u, i) -
+    score(u, j)) over sampled (user, positive, negative) triples.
+    Updates of a batch are computed from the same parameters and
+    summed, as in SGDSVD.
+
+    With n_jobs > 1 the factors live in a shared memory segment
+    and every worker process trains on its own part of each
+    epoch, updating them without locks (Hogwild). Concurrent
+    updates of one row can overwrite each other, which sparse
+    interactions make rare and SGD tolerates; the result is then
+    not reproducible run to run.
+    """
+
+    def __init__(
+        self,
+        n_factors=64,
+        n_epochs=20,
+        lr=0.05,
+        reg=0.0025,
+        init_std=0.1,
+        batch_size=1024,
+        sampler="uniform",
+        n_jobs=1,
+        seed=0,
+    ):
+        """
+        Initialize the hyperparameters, the negative sampler
+        ("uniform" or "popularity", see ImplicitFeedback) and the
+        number of training processes.
+        """
+        self.n_factors = n_factors
+        self.n_epochs = n_epochs
+        self.lr = lr
+        self.reg = reg
+        self.init_std = init_std
+        self.batch_size = batch_size
+        self.sampler = sampler
+        self.n_jobs = n_jobs
+        self.seed = seed
+
+    def fit(self, interactions, callback=None):
+        """
+        Fit on an ImplicitFeedback, or on a ratings DataFrame or
+        RatingsStore where every rating is an interaction, and
+        return a FactorModel. Its user bias and global mean are
+        zero: scores rank items for a user but are not ratings.
+        callback(epoch) is called after every epoch.
+        """
+        if not isinstance(interactions, ImplicitFeedback):
+            interactions = ImplicitFeedback.from_ratings(interactions)
+        rng = np.random.default_rng(self.seed)
+        arrays = {
+            "user_factors": self._initial(interactions.n_users, rng),
+            "item_factors": self._initial(interactions.n_items, rng),
+            "item_bias": np.zeros(interactions.n_items, dtype=np.float32),
+        }
+        options = {
+            "batch_size": self.batch_size,
+            "sampler": self.sampler,
+            "lr": self.lr,
+            "reg": self.reg,
+            "seed": self.seed,
+        }
+        if self.n_jobs == 1:
+            for epoch in range(self.n_epochs):
+                _train(interactions, arrays, options, epoch)
+                if callback is not None:
+                    callback(epoch)
+        else:
+            arrays = self._fit_hogwild(interactions, arrays, options, callback)
+        return FactorModel(
+            user_ids=interactions.users.ids,
+            item_ids=interactions.items.ids,
+            user_factors=arrays["user_factors"],
+            item_factors=arrays["item_factors"],
+            item_bias=arrays["item_bias"],
+        )
+
+    def _fit_hogwild(self, interactions, arrays, options, callback):
+        """
+        Train n_jobs processes on the factors in a shared memory
+        segment and return a private copy of the trained arrays.
+        """
+        segment = f"recsys-bpr-{secrets.token_hex(8)}"
+        shm, shared = publish(segment, arrays, writable=True)
+        try:
+            with ProcessPoolExecutor(
+                max_workers=self.n_jobs,
+                initializer=_init_worker,
+                initargs=(segment, interactions, options),
+            ) as pool:
+                for epoch in range(self.n_epochs):
+                    tasks = [
+                        (epoch, part, self.n_jobs)
+                        for part in range(self.n_jobs)
+                    ]
+                    # Every epoch waits for all parts
+                    list(pool.map(_train_part, tasks))
+                    if callback is not None:
+                        callback(epoch)
+            return {name: array.copy() for name, array in shared.items()}
+        finally:
+            # The views must be gone before the segment is closed
+            shared.clear()
+            shm.close()
+            shm.unlink()
+
+    def _initial(self, n, rng):
+        """
+        Return random float32 factors for n rows.
+        """
+        factors = rng.normal(0, self.init_std, (n, self.n_factors))
+        return factors.astype(np.float32)
@@ -4,16 +4,122 @@ class that loads the MovieLens dataset files.
 """
 
 import pandas as pd
+from src.profiling import RunReport
+
+# Compact dtypes for the numeric MovieLens columns; ids fit in
+# int32. Text columns are left to pandas.
+DTYPES = {
+    "movies": {"movieId": "int32", "title": "object", "genres": "object"},
+    "ratings": {
+        "userId": "int32",
+        "movieId": "int32",
+        "rating": "float32",
+        "timestamp": "int64",
+    },
+    "tags": {
+        "userId": "int32",
+        "movieId": "int32",
+        "tag": "object",
+        "timestamp": "int64",
+    },
+    "links": {"movieId": "int32", "imdbId": "int32", "tmdbId": "float64"},
+}
+
+
+class MovieLensDataset:
+    """
+    Lazy view of the MovieLens files. Each table (movies,
+    ratings, tags, links) is read on first attribute access and
+    memoized; usecols maps table names to the columns to read,
+    so content-only callers never parse ratings.csv.
+
+        dataset = MovieLensDataset("ml-32m/", usecols={
+            "ratings": ["userId", "movieId", "rating"]})
+        dataset.movies      # reads movies.csv only
+    """
+
+    TABLES = tuple(DTYPES)
+
+    def __init__(self, path="", usecols=None, report=None):
+        """
+        Initialize path, per-table column projections and the
+        RunReport receiving "load.<name>" stages.
+        """
+        self.path = path
+        self.usecols = dict(usecols or {})
+        self.report = report if report is not None else RunReport("loader")
+        self._frames = {}
+
+    def __getattr__(self, name):
+        if name in MovieLensDataset.TABLES:
+            return self.load(name)
+        raise AttributeError(
+            f"{type(self).__name__!r} object has no attribute {name!r}"
+        )
+
+    def is_loaded(self, name):
+        """
+        Return whether a table has been read with its default
+        projection.
+        """
+        return self._key(name, None) in self._frames
+
+    def load(self, name, usecols=None):
+        """
+        Return a table, reading it once per column projection.
+        usecols defaults to the dataset's projection for name.
+        """
+        key = self._key(name, usecols)
+        if key not in self._frames:
+            columns = list(key[1]) if key[1] else None
+            full = self._frames.get((name, None))
+            if full is not None and columns:
+                # Project the already loaded table instead of re-reading
+                self._frames[key] = full[columns]
+            else:
+                self._frames[key] = self._read(name, columns)
+        return self._frames[key]
+
+    def _key(self, name, usecols):
+        """
+        Return the memoization key of a table projection.
+        """
+        if name not in self.TABLES:
+            raise ValueError(f"Unknown MovieLens table {name!r}")
+        usecols = usecols if usecols is not None else self.usecols.get(name)
+        return name, tuple(usecols) if usecols else None
+
+    def _read(self, name, usecols=None):
+        """
+        Read one dataset file as a timed "load.<name>" stage.
+        """
+        dtypes = DTYPES[name]
+        if usecols:
+            dtypes = {c: t for c, t in dtypes.items() if c in usecols}
+        with self.report.stage(f"load.{name}") as info:
+            frame = pd.read_csv(
+                f"{self.path}{name}.csv", usecols=usecols, dtype=dtypes
+            )
+            info["items"] = len(frame)
+        return frame
 
 
 class MovieLensDataLoader:
     """The MovieLensDataLoader class loads the MovieLens dataset files."""
 
-    def __init__(self, path=""):
+    def __init__(self, path="", report=None):
         """
         Initialize path to the MovieLens dataset files.
+        Stage timings are recorded into report (a RunReport).
         """
         self.path = path
+        self.report = report if report is not None else RunReport("loader")
+
+    def dataset(self, usecols=None):
+        """
+        Return a lazy MovieLensDataset over the files in path.
+        """
+        return MovieLensDataset(self.path, usecols, self.report)
 
     def load_data(self):
         """Loads MovieLens dataset files
@@ -26,10 +132,11 @@ class MovieLensDataLoader:
         links (pd.DataFrame): Links dataset
         """
         try:
-            MOVIES = pd.read_csv(f"{self.path}movies.csv")
-            RATINGS = pd.read_csv(f"{self.path}ratings.csv")
-            TAGS = pd.read_csv(f"{self.path}tags.csv")
-            LINKS = pd.read_csv(f"{self.path}links.csv")
+            DATASET = self.dataset()
+            MOVIES = DATASET.movies
+            RATINGS = DATASET.ratings
+            TAGS = DATASET.tags
+            LINKS = DATASET.links
 
             print("Files loaded successfully!")
             return MOVIES, RATINGS, TAGS, LINKS
@@ -1,25 +1,43 @@
-""" Module for evaluating collaborative filtering model. """
+"""Module for evaluating collaborative filtering model."""
 
-from surprise import accuracy
 import numpy as np
+from src.implicit import RELEVANCE_THRESHOLD
+from src.lazy import surprise_accuracy as accuracy
+from src.profiling import RunReport
 
 
 class Evaluator:
     """Class to evaluate collaborative filtering model."""
 
-    def __init__(self):
-        pass
+    def __init__(self, report=None):
+        """
+        Stage timings are recorded into report (a RunReport).
+        """
+        self.report = report if report is not None else RunReport("evaluator")
 
     def evaluate_rmse(self, predictions):
         """
         Evaluate RMSE (Root Mean Squared Error)
         for collaborative filtering model.
         """
-        return accuracy.rmse(predictions)
+        with self.report.stage("evaluate.rmse", items=len(predictions)):
+            return accuracy.rmse(predictions)
 
-    def evaluate_precision_at_k(self, predictions, k=10):
+    def evaluate_precision_at_k(
+        self, predictions, k=10, threshold=RELEVANCE_THRESHOLD
+    ):
         """
         Evaluate Precision@K for top-n recommendations.
+        Items rated at or above threshold are relevant.
+        """
+        with self.report.stage(
+            "evaluate.precision_at_k", items=len(predictions)
+        ):
+            return self._precision_at_k(predictions, k, threshold)
+
+    def _precision_at_k(self, predictions, k, threshold):
+        """
+        Mean per-user Precision@K over the predictions.
         """
         user_est_true = {}
         for uid, _, true_r, est, _ in predictions:
@@ -31,7 +49,9 @@ class Evaluator:
             # Sort by estimated rating
             user_ratings.sort(key=lambda x: x[0], reverse=True)
             # Number of relevant items
-            relevant = sum((true_r >= 4.0) for (_, true_r) in user_ratings[:k])
+            relevant = sum(
+                (true_r >= threshold) for (_, true_r) in user_ratings[:k]
+            )
             # Precision@K
             precisions.append(relevant / k)
         return np.mean(precisions)
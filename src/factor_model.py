@@ -0,0 +1,289 @@
+"""
+This module contains the FactorModel class, a serving
+artifact for matrix factorization recommenders.
+"""
+
+import numpy as np
+from src.id_map import MISSING, IdMap
+from src.shared_arrays import attach_or_publish, segment_name
+
+ARRAYS = (
+    "user_ids",
+    "item_ids",
+    "user_factors",
+    "item_factors",
+    "user_bias",
+    "item_bias",
+)
+
+
+def _sort_order(ids):
+    """
+    Return the order sorting ids, or None when already sorted.
+    """
+    ids = np.asarray(ids)
+    if len(ids) < 2 or np.all(ids[1:] > ids[:-1]):
+        return None
+    return np.argsort(ids, kind="stable")
+
+
+def _take(array, order, dtype=None):
+    """
+    Return array reordered by order; without an order (and with
+    a matching dtype) the input is returned as is, not copied.
+    """
+    array = np.asarray(array, dtype=dtype)
+    return array if order is None else np.ascontiguousarray(array[order])
+
+
+class FactorModel:
+    """
+    User and item factors, biases and the global mean of a
+    trained matrix factorization model, stored as plain float32
+    arrays so scoring is a single matrix-vector product.
+    users and items are the IdMaps of the raw userIds and
+    movieIds; rows of the factor arrays are their dense indices.
+    """
+
+    def __init__(
+        self,
+        user_ids,
+        item_ids,
+        user_factors,
+        item_factors,
+        user_bias=None,
+        item_bias=None,
+        global_mean=0.0,
+    ):
+        """
+        Initialize from arrays; rows are re-sorted by id. Arrays
+        already sorted and float32 are used without copying, so
+        a model can sit on shared or memory-mapped buffers.
+        """
+        user_order = _sort_order(user_ids)
+        item_order = _sort_order(item_ids)
+        self.users = IdMap(_take(user_ids, user_order))
+        self.items = IdMap(_take(item_ids, item_order))
+        self.user_factors = _take(user_factors, user_order, np.float32)
+        self.item_factors = _take(item_factors, item_order, np.float32)
+        if user_bias is None:
+            user_bias = np.zeros(len(self.user_ids))
+        if item_bias is None:
+            item_bias = np.zeros(len(self.item_ids))
+        self.user_bias = _take(user_bias, user_order, np.float32)
+        self.item_bias = _take(item_bias, item_order, np.float32)
+        self.global_mean = float(global_mean)
+
+    @property
+    def user_ids(self):
+        """
+        Sorted raw userIds, one per factor row.
+        """
+        return self.users.ids
+
+    @property
+    def item_ids(self):
+        """
+        Sorted raw movieIds, one per factor row.
+        """
+        return self.items.ids
+
+    @property
+    def nbytes(self):
+        """
+        Memory held by the model arrays.
+        """
+        return sum(array.nbytes for array in self.arrays().values())
+
+    def arrays(self):
+        """
+        Return the model as a dict of arrays (see from_arrays).
+        """
+        arrays = {name: getattr(self, name) for name in ARRAYS}
+        arrays["global_mean"] = np.array(self.global_mean)
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """
+        Build a model from a dict written by arrays, without
+        copying the arrays.
+        """
+        return cls(
+            global_mean=float(arrays["global_mean"]),
+            **{name: arrays[name] for name in ARRAYS},
+        )
+
+    @classmethod
+    def from_surprise(cls, svd):
+        """
+        Build a FactorModel from a fitted Surprise SVD.
+        """
+        trainset = svd.trainset
+        user_ids = [trainset.to_raw_uid(u) for u in trainset.all_users()]
+        item_ids = [trainset.to_raw_iid(i) for i in trainset.all_items()]
+        use_bias = getattr(svd, "biased", True)
+        return cls(
+            user_ids=np.asarray(user_ids),
+            item_ids=np.asarray(item_ids),
+            user_factors=svd.pu,
+            item_factors=svd.qi,
+            user_bias=svd.bu if use_bias else None,
+            item_bias=svd.bi if use_bias else None,
+            global_mean=trainset.global_mean if use_bias else 0.0,
+        )
+
+    def user_index(self, user_id):
+        """
+        Return the row of a userId, or None for unknown users.
+        """
+        return self.users.index(user_id)
+
+    def item_indices(self, movie_ids):
+        """
+        Return the rows of the given movieIds that are known.
+        """
+        indices = self.items.indices(movie_ids)
+        return indices[indices != MISSING]
+
+    def score(self, user_id):
+        """
+        Return predicted ratings of every item for a user.
+        Unknown users get the item-bias (popularity) ranking.
+        """
+        scores = self.global_mean + self.item_bias
+        index = self.user_index(user_id)
+        if index is not None:
+            scores = (
+                scores
+                + self.user_bias[index]
+                + self.item_factors @ self.user_factors[index]
+            )
+        return scores
+
+    def score_batch(self, user_ids):
+        """
+        Return a (len(user_ids), n_items) matrix of predicted
+        ratings, one matrix-matrix product for the whole batch.
+        """
+        positions = self.users.indices(user_ids)
+        known = positions != MISSING
+        factors = self.user_factors[positions] * known[:, None]
+        bias = np.where(known, self.user_bias[positions], 0)
+        return (
+            (self.global_mean + self.item_bias)[None, :]
+            + bias[:, None]
+            + factors @ self.item_factors.T
+        )
+
+    def predict(self, user_ids, movie_ids):
+        """
+        Return predicted ratings of parallel arrays of userIds
+        and movieIds. Unknown users or movies contribute no bias
+        and no factors, as in Surprise.
+        """
+        users = self.users.indices(user_ids)
+        items = self.items.indices(movie_ids)
+        known_users, known_items = users != MISSING, items != MISSING
+        predictions = (
+            self.global_mean
+            + np.where(known_users, self.user_bias[users], 0)
+            + np.where(known_items, self.item_bias[items], 0)
+        )
+        both = known_users & known_items
+        predictions[both] += np.einsum(
+            "ij,ij->i",
+            self.user_factors[users[both]],
+            self.item_factors[items[both]],
+        )
+        return predictions
+
+    def top_n(self, scores, exclude_movie_ids=(), top_n=10):
+        """
+        Return the top-n (movieId, score) pairs from a score
+        vector, skipping excluded movieIds.
+        """
+        scores = np.array(scores, dtype=np.float32)
+        scores[self.item_indices(list(exclude_movie_ids))] = -np.inf
+        top_n = min(top_n, len(scores))
+        if top_n <= 0:
+            return []
+        top = np.argpartition(-scores, top_n - 1)[:top_n]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        top = top[np.isfinite(scores[top])]
+        return list(zip(self.item_ids[top].tolist(), scores[top].tolist()))
+
+    def recommend(self, user_id, exclude_movie_ids=(), top_n=10):
+        """
+        Return the top-n (movieId, predicted rating) pairs
+        for a user, skipping movies they already rated.
+        """
+        return self.top_n(self.score(user_id), exclude_movie_ids, top_n)
+
+    def recommend_batch(self, user_ids, exclude_movie_ids=None, top_n=10):
+        """
+        Batched recommend: return one list of top-n
+        (movieId, predicted rating) pairs per user.
+        exclude_movie_ids holds one iterable per user.
+        """
+        scores = self.score_batch(user_ids)
+        for row, excluded in enumerate(exclude_movie_ids or ()):
+            scores[row, self.item_indices(list(excluded))] = -np.inf
+        top, top_scores = self.top_n_batch(scores, top_n)
+        return [
+            [
+                (movie_id, score)
+                for movie_id, score in zip(
+                    self.item_ids[row_top].tolist(), row_scores.tolist()
+                )
+                if np.isfinite(score)
+            ]
+            for row_top, row_scores in zip(top, top_scores)
+        ]
+
+    @staticmethod
+    def top_n_batch(scores, top_n):
+        """
+        Return the item rows and scores of the top-n entries of
+        each row of a score matrix, best first. Excluded entries
+        (-inf) sort last and keep their -inf score.
+        """
+        top_n = min(top_n, scores.shape[1])
+        if top_n <= 0:
+            empty = np.empty((len(scores), 0))
+            return empty.astype(np.int64), empty.astype(scores.dtype)
+        top = np.argpartition(-scores, top_n - 1, axis=1)[:, :top_n]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        return (
+            np.take_along_axis(top, order, axis=1),
+            np.take_along_axis(top_scores, order, axis=1),
+        )
+
+    def save(self, path):
+        """
+        Persist the model to a .npz file.
+        """
+        np.savez(path, **self.arrays())
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load a model written by save.
+        """
+        with np.load(path, allow_pickle=False) as data:
+            return cls.from_arrays({name: data[name] for name in data.files})
+
+    @classmethod
+    def load_shared(cls, path):
+        """
+        Load a model into a shared memory segment named after
+        the file, or map that segment when another process has
+        already published it, so all workers share one copy.
+        Returns (model, segment); keep the segment referenced
+        for as long as the model is used.
+        """
+        segment, arrays, _ = attach_or_publish(
+            segment_name(path), lambda: cls.load(path).arrays()
+        )
+        return cls.from_arrays(arrays), segment
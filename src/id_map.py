@@ -0,0 +1,91 @@
+"""
+This module contains the IdMap class, which maps sparse
+MovieLens userIds and movieIds to dense contiguous indices.
+"""
+
+import numpy as np
+
+# Unknown ids map to this index
+MISSING = -1
+
+
+class IdMap:
+    """
+    Dense int32 indices for a set of raw ids. ids holds the
+    raw ids in sorted order, so index -> id is ids[index] and
+    id -> index is a binary search over ids. Arrays indexed by
+    the dense index (factor rows, CSR rows, top-n tables) can
+    then be addressed directly, without dict lookups.
+    """
+
+    def __init__(self, ids):
+        """
+        Initialize from raw ids; duplicates are dropped and
+        unsorted input is sorted.
+        """
+        ids = np.asarray(ids)
+        if len(ids) > 1 and not np.all(ids[1:] > ids[:-1]):
+            ids = np.unique(ids)
+        self.ids = ids
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, raw_id):
+        return self.index(raw_id) is not None
+
+    def __eq__(self, other):
+        return isinstance(other, IdMap) and np.array_equal(self.ids, other.ids)
+
+    def index(self, raw_id):
+        """
+        Return the dense index of one raw id, or None.
+        """
+        position = np.searchsorted(self.ids, raw_id)
+        if position < len(self.ids) and self.ids[position] == raw_id:
+            return int(position)
+        return None
+
+    def indices(self, raw_ids):
+        """
+        Return the int32 dense indices of raw ids, with
+        MISSING (-1) for ids not in the map.
+        """
+        raw_ids = np.asarray(raw_ids)
+        if not len(self.ids):
+            return np.full(raw_ids.shape, MISSING, dtype=np.int32)
+        positions = np.searchsorted(self.ids, raw_ids)
+        positions = np.minimum(positions, len(self.ids) - 1)
+        known = self.ids[positions] == raw_ids
+        return np.where(known, positions, MISSING).astype(np.int32)
+
+    def raw(self, indices):
+        """
+        Return the raw ids of dense indices.
+        """
+        return self.ids[indices]
+
+    def save(self, path):
+        """
+        Persist the sorted ids to a .npy file.
+        """
+        np.save(path, self.ids)
+
+    @classmethod
+    def load(cls, path, mmap_mode=None):
+        """
+        Load a map written by save, optionally memory-mapped.
+        """
+        return cls(np.load(path, mmap_mode=mmap_mode))
+
+
+def build_id_maps(ratings, movies=None):
+    """
+    Return (users, items) IdMaps for a ratings DataFrame. Items
+    cover the whole movies catalogue when movies is given.
+    """
+    users = IdMap(ratings["userId"].to_numpy())
+    movie_ids = ratings["movieId"].to_numpy()
+    if movies is not None:
+        movie_ids = np.concatenate([movie_ids, movies["movieId"].to_numpy()])
+    return users, IdMap(movie_ids)
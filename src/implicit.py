@@ -0,0 +1,312 @@
+"""
+This module contains the ImplicitFeedback class, which turns
+explicit ratings into implicit-feedback training data: positive
+user-item interactions with confidence weights, vectorized
+negative sampling and training batches streamed as NumPy arrays
+for pairwise (BPR) and pointwise (implicit ALS style) models.
+
+Usage:
+    feedback = ImplicitFeedback.from_ratings(ratings, threshold=4.0)
+    for users, positives, negatives in feedback.triples(4096):
+        ...
+"""
+
+import numpy as np
+from src.id_map import MISSING, IdMap
+from src.lazy import sparse
+from src.ratings_store import RatingsStore
+
+# Ratings at or above this are relevant (liked) items
+RELEVANCE_THRESHOLD = 4.0
+
+CONFIDENCE_SCHEMES = ("linear", "log")
+
+SAMPLERS = ("uniform", "popularity")
+
+
+def confidence(values, alpha=1.0, scheme="linear", epsilon=1.0):
+    """
+    Return float32 confidence weights of interaction strengths,
+    as in Hu, Koren and Volinsky: 1 + alpha * value ("linear")
+    or 1 + alpha * log(1 + value / epsilon) ("log").
+    """
+    values = np.asarray(values, dtype=np.float32)
+    if scheme == "linear":
+        return 1 + alpha * values
+    if scheme == "log":
+        return 1 + alpha * np.log1p(values / epsilon)
+    raise ValueError(
+        f"scheme must be one of {CONFIDENCE_SCHEMES}, got {scheme!r}"
+    )
+
+
+class ImplicitFeedback:
+    """
+    Positive interactions in CSR form: indptr[u]:indptr[u + 1] is
+    the slice of user u in indices (int32 item indices, sorted
+    within each row, so membership is a binary search of the row)
+    and confidence (float32 weights). users and items are the
+    IdMaps of the ratings the interactions came from.
+    """
+
+    ARRAYS = ("indptr", "indices", "confidence")
+
+    def __init__(self, users, items, **arrays):
+        """
+        Initialize from IdMaps and the arrays in ARRAYS.
+        """
+        self.users = users
+        self.items = items
+        for name in self.ARRAYS:
+            setattr(self, name, arrays[name])
+        self._popularity_cdf = {}
+
+    @classmethod
+    def from_ratings(
+        cls, ratings, threshold=None, alpha=1.0, scheme="linear", epsilon=1.0
+    ):
+        """
+        Build interactions from a ratings DataFrame (userId,
+        movieId, rating) or a RatingsStore. Ratings below
+        threshold are dropped (by default every rating is an
+        interaction); the rating value sets the confidence of the
+        others (see confidence).
+        """
+        if not isinstance(ratings, RatingsStore):
+            ratings = RatingsStore.from_frame(ratings)
+        n_users = len(ratings.users)
+        rows = np.repeat(
+            np.arange(n_users, dtype=np.int32), np.diff(ratings.user_indptr)
+        )
+        columns, values = ratings.item_indices, ratings.ratings
+        if threshold is not None:
+            keep = values >= threshold
+            rows, columns, values = rows[keep], columns[keep], values[keep]
+        order = np.lexsort((columns, rows))
+        indptr = np.zeros(n_users + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n_users), out=indptr[1:])
+        return cls(
+            ratings.users,
+            ratings.items,
+            indptr=indptr,
+            indices=columns[order],
+            confidence=confidence(values[order], alpha, scheme, epsilon),
+        )
+
+    def __len__(self):
+        return len(self.indices)
+
+    @property
+    def n_users(self):
+        """
+        Number of users, with or without interactions.
+        """
+        return len(self.users)
+
+    @property
+    def n_items(self):
+        """
+        Number of items, with or without interactions.
+        """
+        return len(self.items)
+
+    @property
+    def item_counts(self):
+        """
+        Number of interactions of each item.
+        """
+        return np.bincount(self.indices, minlength=self.n_items)
+
+    def user_of(self, positions):
+        """
+        Return the user index of each interaction position.
+        """
+        return (
+            np.searchsorted(self.indptr, positions, side="right") - 1
+        ).astype(np.int32)
+
+    def contains(self, rows, columns):
+        """
+        Return whether each (user index, item index) pair is an
+        interaction, by bisecting all users' rows at once.
+        """
+        rows = np.asarray(rows)
+        columns = np.asarray(columns)
+        if not len(self.indices):
+            return np.zeros(len(rows), dtype=bool)
+        low = self.indptr[rows]
+        high = self.indptr[rows + 1]
+        end = high.copy()
+        last = len(self.indices) - 1
+        active = low < high
+        while active.any():
+            middle = (low + high) // 2
+            right = active & (self.indices[np.minimum(middle, last)] < columns)
+            low = np.where(right, middle + 1, low)
+            high = np.where(active & ~right, middle, high)
+            active = low < high
+        return (low < end) & (self.indices[np.minimum(low, last)] == columns)
+
+    def _draw(self, n, sampler, rng, exponent):
+        """
+        Draw n item indices uniformly or by popularity.
+        """
+        if sampler == "uniform":
+            return rng.integers(0, self.n_items, n, dtype=np.int32)
+        cdf = self._popularity_cdf.get(exponent)
+        if cdf is None:
+            cdf = np.cumsum(self.item_counts.astype(np.float64) ** exponent)
+            cdf /= cdf[-1]
+            self._popularity_cdf[exponent] = cdf
+        return np.searchsorted(cdf, rng.random(n), side="right").astype(
+            np.int32
+        )
+
+    def sample_negatives(
+        self, rows, sampler="uniform", rng=None, exponent=0.75, rounds=100
+    ):
+        """
+        Return one negative item index per user index in rows:
+        items drawn uniformly or by popularity ** exponent
+        ("popularity", word2vec style), redrawn while they are
+        in the user's row. Users still without a negative after
+        rounds redraws (who interacted with nearly every item)
+        get MISSING (-1).
+        """
+        if sampler not in SAMPLERS:
+            raise ValueError(
+                f"sampler must be one of {SAMPLERS}, got {sampler!r}"
+            )
+        rng = rng if rng is not None else np.random.default_rng()
+        rows = np.asarray(rows)
+        negatives = self._draw(len(rows), sampler, rng, exponent)
+        rejected = np.flatnonzero(self.contains(rows, negatives))
+        for _ in range(rounds):
+            if not len(rejected):
+                break
+            drawn = self._draw(len(rejected), sampler, rng, exponent)
+            negatives[rejected] = drawn
+            rejected = rejected[self.contains(rows[rejected], drawn)]
+        negatives[rejected] = MISSING
+        return negatives
+
+    def _batches(
+        self, batch_size, n_negatives, sampler, seed, shuffle, shard, n_shards
+    ):
+        """
+        Yield (positions, users, negatives) for one pass over part
+        shard of n_shards equal parts of the (shuffled)
+        interactions, negatives shaped (batch, n_negatives).
+        Interactions whose user got no negative are skipped.
+        """
+        rng = np.random.default_rng(seed)
+        order = rng.permutation(len(self)) if shuffle else None
+        # Every part samples its negatives from its own stream
+        rng = rng.spawn(n_shards)[shard]
+        rows = np.repeat(
+            np.arange(self.n_users, dtype=np.int32), np.diff(self.indptr)
+        )
+        start = len(self) * shard // n_shards
+        stop = len(self) * (shard + 1) // n_shards
+        for begin in range(start, stop, batch_size):
+            end = min(begin + batch_size, stop)
+            if order is None:
+                positions = np.arange(begin, end)
+            else:
+                positions = order[begin:end]
+            users = rows[positions]
+            negatives = self.sample_negatives(
+                np.repeat(users, n_negatives), sampler, rng
+            ).reshape(-1, n_negatives)
+            keep = (negatives != MISSING).all(axis=1)
+            yield positions[keep], users[keep], negatives[keep]
+
+    def triples(
+        self,
+        batch_size=4096,
+        n_negatives=1,
+        sampler="uniform",
+        seed=0,
+        shuffle=True,
+        shard=0,
+        n_shards=1,
+    ):
+        """
+        Yield (users, positives, negatives) int32 batches of
+        pairwise training triples, one pass over the
+        interactions. negatives is shaped (batch,) for one
+        negative per positive and (batch, n_negatives) otherwise.
+        With n_shards, only part shard of the pass is yielded, so
+        parallel workers given the same seed split one pass.
+        """
+        for positions, users, negatives in self._batches(
+            batch_size, n_negatives, sampler, seed, shuffle, shard, n_shards
+        ):
+            if n_negatives == 1:
+                negatives = negatives[:, 0]
+            yield users, self.indices[positions], negatives
+
+    def pointwise(
+        self,
+        batch_size=4096,
+        n_negatives=1,
+        sampler="uniform",
+        seed=0,
+        shuffle=True,
+        shard=0,
+        n_shards=1,
+    ):
+        """
+        Yield (users, items, labels, weights) batches for
+        pointwise models, one pass over the interactions: each
+        positive (label 1, its confidence as weight) followed by
+        n_negatives sampled items (label 0, weight 1). shard and
+        n_shards split the pass as in triples.
+        """
+        for positions, users, negatives in self._batches(
+            batch_size, n_negatives, sampler, seed, shuffle, shard, n_shards
+        ):
+            items = np.column_stack([self.indices[positions], negatives])
+            labels = np.zeros(items.shape, dtype=np.float32)
+            labels[:, 0] = 1
+            weights = np.ones(items.shape, dtype=np.float32)
+            weights[:, 0] = self.confidence[positions]
+            yield (
+                np.repeat(users, n_negatives + 1),
+                items.ravel(),
+                labels.ravel(),
+                weights.ravel(),
+            )
+
+    def to_csr(self):
+        """
+        Return the user x item confidence matrix, sharing the
+        arrays.
+        """
+        return sparse.csr_matrix(
+            (self.confidence, self.indices, self.indptr),
+            shape=(self.n_users, self.n_items),
+        )
+
+    def save(self, path):
+        """
+        Persist the interactions to a .npz file.
+        """
+        np.savez(
+            path,
+            user_ids=self.users.ids,
+            item_ids=self.items.ids,
+            **{name: getattr(self, name) for name in self.ARRAYS},
+        )
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load interactions written by save.
+        """
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                IdMap(data["user_ids"]),
+                IdMap(data["item_ids"]),
+                **{name: data[name] for name in cls.ARRAYS},
+            )
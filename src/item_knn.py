@@ -0,0 +1,256 @@
+"""
+This module contains the ItemKNN class, an item-item
+collaborative filtering model with top-K neighbour tables.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from src.id_map import MISSING, IdMap
+from src.lazy import sparse
+from src.ratings_store import RatingsStore
+
+# Item x user matrix, user x item matrix and item norms shared
+# with pool workers (inherited on fork instead of pickled per task)
+_WORKER_STATE = {}
+
+
+def _init_worker(item_users, user_items, norms, k, shrinkage):
+    """
+    Store the matrices in the worker process.
+    """
+    _WORKER_STATE.update(
+        item_users=item_users,
+        user_items=user_items,
+        norms=norms,
+        k=k,
+        shrinkage=shrinkage,
+    )
+
+
+def _top_k_block(bounds):
+    """
+    Compute top-k neighbours for items in [start, end).
+    Returns (start, neighbours, similarities).
+    """
+    start, end = bounds
+    state = _WORKER_STATE
+    k = state["k"]
+    norms = state["norms"]
+    # (block x users) . (users x items) -> (block x items)
+    dots = (state["item_users"][start:end] @ state["user_items"]).toarray()
+    denominator = np.outer(norms[start:end], norms) + state["shrinkage"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sims = np.where(denominator > 0, dots / denominator, 0.0)
+    sims = sims.astype(np.float32)
+    # An item is never its own neighbour
+    sims[np.arange(end - start), np.arange(start, end)] = 0.0
+
+    k = min(k, sims.shape[1])
+    top = np.argpartition(-sims, k - 1, axis=1)[:, :k]
+    top_sims = np.take_along_axis(sims, top, axis=1)
+    order = np.argsort(-top_sims, axis=1, kind="stable")
+    top = np.take_along_axis(top, order, axis=1).astype(np.int32)
+    top_sims = np.take_along_axis(top_sims, order, axis=1)
+    # Mark empty slots so scoring can skip them
+    top[top_sims <= 0] = -1
+    top_sims[top_sims <= 0] = 0.0
+    return start, top, top_sims
+
+
+class ItemKNN:
+    """
+    Item-item collaborative filtering. Similarities are computed
+    with blocked sparse matrix products across a process pool and
+    only the top-k neighbours of each item are kept, as compact
+    int32/float32 tables.
+    """
+
+    SIMILARITIES = ("cosine", "adjusted_cosine")
+
+    def __init__(
+        self,
+        k=50,
+        similarity="cosine",
+        shrinkage=0.0,
+        block_size=256,
+        n_jobs=None,
+    ):
+        """
+        Initialize the neighbourhood size, similarity measure
+        and how the computation is split into blocks and processes.
+        """
+        if similarity not in self.SIMILARITIES:
+            raise ValueError(
+                f"similarity must be one of {self.SIMILARITIES}, "
+                f"got {similarity!r}"
+            )
+        self.k = k
+        self.similarity = similarity
+        self.shrinkage = shrinkage
+        self.block_size = block_size
+        self.n_jobs = n_jobs or os.cpu_count() or 1
+        self.items = None
+        self.neighbours = None
+        self.similarities = None
+        self.users = None
+        self.user_items = None
+
+    @property
+    def item_ids(self):
+        """
+        Sorted raw movieIds, one per neighbour table row.
+        """
+        return self.items.ids
+
+    @property
+    def user_ids(self):
+        """
+        Sorted raw userIds, one per user_items row.
+        """
+        return self.users.ids
+
+    def fit(self, ratings):
+        """
+        Compute neighbour tables from a ratings DataFrame
+        (userId, movieId, rating) or a RatingsStore. Returns self.
+        """
+        if not isinstance(ratings, RatingsStore):
+            ratings = RatingsStore.from_frame(ratings)
+        self.users = ratings.users
+        self.items = ratings.items
+        self.user_items = ratings.to_csr()
+
+        user_items = self.user_items.copy()
+        if self.similarity == "adjusted_cosine":
+            # Center each user's ratings on their mean
+            counts = np.diff(user_items.indptr)
+            sums = np.asarray(user_items.sum(axis=1)).ravel()
+            means = np.divide(sums, counts, where=counts > 0, out=sums)
+            user_items.data -= np.repeat(means, counts).astype(np.float32)
+        item_users = user_items.T.tocsr()
+        norms = np.sqrt(
+            np.asarray(item_users.multiply(item_users).sum(axis=1)).ravel()
+        )
+
+        n_items = len(self.item_ids)
+        k = min(self.k, max(n_items - 1, 1))
+        self.neighbours = np.full((n_items, k), -1, dtype=np.int32)
+        self.similarities = np.zeros((n_items, k), dtype=np.float32)
+        blocks = [
+            (start, min(start + self.block_size, n_items))
+            for start in range(0, n_items, self.block_size)
+        ]
+        initargs = (item_users, user_items, norms, k, self.shrinkage)
+
+        if self.n_jobs == 1 or len(blocks) == 1:
+            _init_worker(*initargs)
+            results = map(_top_k_block, blocks)
+            self._store(results)
+            _WORKER_STATE.clear()
+        else:
+            with ProcessPoolExecutor(
+                max_workers=self.n_jobs,
+                initializer=_init_worker,
+                initargs=initargs,
+            ) as pool:
+                self._store(pool.map(_top_k_block, blocks))
+        return self
+
+    def _store(self, results):
+        """
+        Copy block results into the neighbour tables.
+        """
+        for start, top, top_sims in results:
+            end = start + len(top)
+            self.neighbours[start:end, : top.shape[1]] = top
+            self.similarities[start:end, : top.shape[1]] = top_sims
+
+    def score(self, item_indices, ratings):
+        """
+        Score every item for a user who rated the given item
+        indices, by gathering the neighbours of each rated item
+        and summing similarity x rating.
+        """
+        neighbours = self.neighbours[item_indices]
+        weights = self.similarities[item_indices] * np.asarray(
+            ratings, dtype=np.float32
+        ).reshape(-1, 1)
+        valid = neighbours >= 0
+        scores = np.bincount(
+            neighbours[valid],
+            weights=weights[valid],
+            minlength=len(self.item_ids),
+        )
+        scores[item_indices] = -np.inf
+        return scores
+
+    def recommend_from_history(self, movie_ids, ratings, top_n=10):
+        """
+        Return the top-n (movieId, score) pairs for a user
+        history given as movieIds and ratings.
+        """
+        positions = self.items.indices(movie_ids)
+        known = positions != MISSING
+        scores = self.score(positions[known], np.asarray(ratings)[known])
+
+        top_n = min(top_n, len(scores))
+        top = np.argpartition(-scores, top_n - 1)[:top_n]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        top = top[np.isfinite(scores[top]) & (scores[top] > 0)]
+        return list(zip(self.item_ids[top].tolist(), scores[top].tolist()))
+
+    def recommend(self, user_id, top_n=10):
+        """
+        Return the top-n (movieId, score) pairs for a user
+        seen during fit.
+        """
+        position = self.users.index(user_id)
+        if position is None:
+            return []
+        row = self.user_items[position]
+        return self.recommend_from_history(
+            self.item_ids[row.indices], row.data, top_n
+        )
+
+    def save(self, path):
+        """
+        Persist the neighbour tables and the user x item matrix
+        recommend reads to a .npz file.
+        """
+        np.savez(
+            path,
+            item_ids=self.item_ids,
+            user_ids=self.user_ids,
+            user_indptr=self.user_items.indptr,
+            user_item_indices=self.user_items.indices,
+            user_ratings=self.user_items.data,
+            neighbours=self.neighbours,
+            similarities=self.similarities,
+            similarity=np.array(self.similarity),
+        )
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load neighbour tables and user histories written by save.
+        """
+        with np.load(path, allow_pickle=False) as data:
+            model = cls(
+                k=data["neighbours"].shape[1],
+                similarity=str(data["similarity"]),
+            )
+            model.items = IdMap(data["item_ids"])
+            model.users = IdMap(data["user_ids"])
+            model.user_items = sparse.csr_matrix(
+                (
+                    data["user_ratings"],
+                    data["user_item_indices"],
+                    data["user_indptr"],
+                ),
+                shape=(len(model.users), len(model.items)),
+            )
+            model.neighbours = data["neighbours"]
+            model.similarities = data["similarities"]
+        return model
@@ -0,0 +1,55 @@
+"""
+Import-on-first-use facade for the heavy ML dependencies, so
+that importing src modules (and the Django apps using them)
+does not pay for scikit-learn, SciPy or Surprise until they
+are actually called.
+"""
+
+import importlib
+
+
+class LazyModule:
+    """
+    Stand-in for a module that is imported on first attribute
+    access. Concurrent first uses are serialized by the import
+    lock, so facades are safe to share between threads.
+
+        sparse = LazyModule("scipy.sparse")
+        sparse.csr_matrix(...)   # scipy.sparse is imported here
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        """
+        Import the module once and return it.
+        """
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    @property
+    def loaded(self):
+        """
+        Whether the module has been imported through this facade.
+        """
+        return self._module is not None
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<LazyModule {self._name!r} ({state})>"
+
+
+sparse = LazyModule("scipy.sparse")
+sklearn_decomposition = LazyModule("sklearn.decomposition")
+sklearn_pairwise = LazyModule("sklearn.metrics.pairwise")
+sklearn_preprocessing = LazyModule("sklearn.preprocessing")
+sklearn_text = LazyModule("sklearn.feature_extraction.text")
+surprise = LazyModule("surprise")
+surprise_accuracy = LazyModule("surprise.accuracy")
+surprise_model_selection = LazyModule("surprise.model_selection")
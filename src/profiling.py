@@ -0,0 +1,269 @@
+"""
+This module contains the RunReport class that times pipeline
+stages, tracks peak memory and writes JSON run reports.
+
+Usage:
+    report = RunReport("train", profile="cprofile")
+    with report.stage("fit", items=len(ratings)):
+        model.fit(trainset)
+    with report.stage("load") as info:
+        frame = pd.read_csv(path)
+        info["items"] = len(frame)
+    report.save("reports/train.json")
+
+Compare two saved reports:
+    python -m src.profiling old.json new.json
+"""
+
+import cProfile
+import functools
+import json
+import logging
+import os
+import platform
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+
+def peak_rss_bytes():
+    """
+    Return the peak resident set size of this process in bytes,
+    or None when the platform does not expose it.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class RunReport:
+    """
+    Collects per-stage wall time, CPU time, peak RSS and
+    throughput, with optional cProfile/pyinstrument capture.
+    """
+
+    PROFILERS = (None, "cprofile", "pyinstrument")
+
+    def __init__(self, name="run", profile=None, profile_dir="profiles"):
+        """
+        Initialize the report. profile selects a profiler that
+        captures each outermost stage into profile_dir; nested
+        stages are covered by their enclosing stage's profile.
+        """
+        if profile not in self.PROFILERS:
+            raise ValueError(
+                f"profile must be one of {self.PROFILERS}, got {profile!r}"
+            )
+        self.name = name
+        self.profile = profile
+        self.profile_dir = profile_dir
+        self.stages = []
+        self._depth = 0
+        self.started_at = datetime.now(timezone.utc)
+
+    @contextmanager
+    def stage(self, name, items=None):
+        """
+        Time the enclosed block as a named stage.
+        items is the number of records processed, used
+        to report throughput; it can also be set inside the
+        block through the yielded dict.
+        """
+        info = {"items": items}
+        # Only one profiler can run at a time
+        profiler = self._start_profiler() if self._depth == 0 else None
+        self._depth += 1
+        rss_before = peak_rss_bytes()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield info
+        finally:
+            self._depth -= 1
+            items = info["items"]
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            rss_after = peak_rss_bytes()
+            record = {
+                "stage": name,
+                "depth": self._depth,
+                "wall_seconds": round(wall, 6),
+                "cpu_seconds": round(cpu, 6),
+                "peak_rss_bytes": rss_after,
+                "peak_rss_growth_bytes": (
+                    rss_after - rss_before
+                    if rss_after is not None and rss_before is not None
+                    else None
+                ),
+                "items": items,
+                "items_per_second": (
+                    round(items / wall, 3) if items and wall > 0 else None
+                ),
+            }
+            record["profile"] = self._stop_profiler(profiler, name)
+            self.stages.append(record)
+            logger.info(
+                "%s.%s: %.3fs wall, %.3fs cpu", self.name, name, wall, cpu
+            )
+
+    def timed(self, name=None):
+        """
+        Decorator that records every call of a function as a stage.
+        """
+
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.stage(name or func.__name__):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def _start_profiler(self):
+        """
+        Start the configured profiler, if any.
+        """
+        if self.profile == "cprofile":
+            profiler = cProfile.Profile()
+            profiler.enable()
+            return profiler
+        if self.profile == "pyinstrument":
+            try:
+                from pyinstrument import Profiler
+            except ImportError as exc:
+                raise ImportError(
+                    "profile='pyinstrument' requires the pyinstrument "
+                    "package (pip install pyinstrument)."
+                ) from exc
+            profiler = Profiler()
+            profiler.start()
+            return profiler
+        return None
+
+    def _stop_profiler(self, profiler, stage_name):
+        """
+        Stop the profiler and write its output.
+        Returns the output path, or None.
+        """
+        if profiler is None:
+            return None
+        os.makedirs(self.profile_dir, exist_ok=True)
+        base = os.path.join(self.profile_dir, f"{self.name}.{stage_name}")
+        if self.profile == "cprofile":
+            profiler.disable()
+            path = f"{base}.prof"
+            profiler.dump_stats(path)
+        else:
+            profiler.stop()
+            path = f"{base}.html"
+            with open(path, "w") as f:
+                f.write(profiler.output_html())
+        return path
+
+    def to_dict(self):
+        """
+        Return the report as a JSON-serializable dict.
+        """
+        try:
+            import numpy
+
+            numpy_version = numpy.__version__
+        except ImportError:
+            numpy_version = None
+        return {
+            "name": self.name,
+            "started_at": self.started_at.isoformat(),
+            "environment": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+                "numpy": numpy_version,
+            },
+            "stages": self.stages,
+            # Nested stages are already inside their parent's time
+            "total_wall_seconds": round(
+                sum(
+                    s["wall_seconds"]
+                    for s in self.stages
+                    if not s.get("depth")
+                ),
+                6,
+            ),
+            "peak_rss_bytes": peak_rss_bytes(),
+        }
+
+    def save(self, path):
+        """
+        Write the report as JSON.
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return path
+
+
+def compare_reports(old, new):
+    """
+    Compare two report dicts stage by stage.
+    Returns rows of (stage, old_seconds, new_seconds, ratio).
+    Repeated stages are summed.
+    """
+
+    def totals(report):
+        result = {}
+        for stage in report["stages"]:
+            result.setdefault(stage["stage"], 0.0)
+            result[stage["stage"]] += stage["wall_seconds"]
+        return result
+
+    old_totals, new_totals = totals(old), totals(new)
+    rows = []
+    for stage in list(old_totals) + [
+        s for s in new_totals if s not in old_totals
+    ]:
+        before = old_totals.get(stage)
+        after = new_totals.get(stage)
+        ratio = after / before if before and after is not None else None
+        rows.append((stage, before, after, ratio))
+    return rows
+
+
+def main(argv=None):
+    """
+    Print a stage-by-stage comparison of two JSON reports.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 2:
+        print("Usage: python -m src.profiling OLD.json NEW.json")
+        return 2
+    with open(argv[0]) as f:
+        old = json.load(f)
+    with open(argv[1]) as f:
+        new = json.load(f)
+    print(f"{'stage':<30}{'old (s)':>12}{'new (s)':>12}{'ratio':>10}")
+    for stage, before, after, ratio in compare_reports(old, new):
+        print(
+            f"{stage:<30}"
+            f"{'-' if before is None else f'{before:.3f}':>12}"
+            f"{'-' if after is None else f'{after:.3f}':>12}"
+            f"{'-' if ratio is None else f'{ratio:.2f}x':>10}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
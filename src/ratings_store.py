@@ -0,0 +1,173 @@
+"""
+This module contains the RatingsStore class, a compact
+columnar ratings table indexed by user and by item.
+"""
+
+import numpy as np
+from src.id_map import IdMap, build_id_maps
+from src.lazy import sparse
+
+
+class RatingsStore:
+    """
+    Ratings held as CSR-style NumPy arrays instead of a
+    DataFrame. Rows are sorted by dense user index:
+    user_indptr[u]:user_indptr[u + 1] is the slice of user u in
+    item_indices (int32), ratings (float32) and timestamps
+    (uint32). A second, item-sorted copy (item_indptr,
+    user_indices, item_ratings) serves per-item lookups. Both
+    are O(row length) slices; users and items are IdMaps.
+    """
+
+    ARRAYS = (
+        "user_indptr",
+        "item_indices",
+        "ratings",
+        "timestamps",
+        "item_indptr",
+        "user_indices",
+        "item_ratings",
+    )
+
+    def __init__(self, users, items, **arrays):
+        """
+        Initialize from IdMaps and the arrays in ARRAYS.
+        """
+        self.users = users
+        self.items = items
+        for name in self.ARRAYS:
+            setattr(self, name, arrays[name])
+
+    @classmethod
+    def from_frame(cls, ratings, movies=None):
+        """
+        Build a store from a ratings DataFrame (userId, movieId,
+        rating and optionally timestamp). Items cover the whole
+        movies catalogue when movies is given.
+        """
+        users, items = build_id_maps(ratings, movies)
+        if "timestamp" in ratings:
+            timestamps = ratings["timestamp"].to_numpy()
+        else:
+            timestamps = np.zeros(len(ratings), dtype=np.uint32)
+        return cls.from_codes(
+            users,
+            items,
+            users.indices(ratings["userId"].to_numpy()),
+            items.indices(ratings["movieId"].to_numpy()),
+            ratings["rating"].to_numpy(),
+            timestamps,
+        )
+
+    @classmethod
+    def from_codes(
+        cls, users, items, user_codes, item_codes, values, timestamps
+    ):
+        """
+        Build a store from IdMaps and parallel arrays of dense
+        user and item indices, ratings and timestamps, for
+        callers that already hold dense indices.
+        """
+        values = np.asarray(values, dtype=np.float32)
+        timestamps = np.asarray(timestamps, dtype=np.uint32)
+
+        # Stable sorts keep each user's (and item's) input order
+        by_user = np.argsort(user_codes, kind="stable")
+        by_item = np.argsort(item_codes, kind="stable")
+        return cls(
+            users,
+            items,
+            user_indptr=cls._indptr(user_codes, len(users)),
+            item_indices=item_codes[by_user],
+            ratings=values[by_user],
+            timestamps=timestamps[by_user],
+            item_indptr=cls._indptr(item_codes, len(items)),
+            user_indices=user_codes[by_item],
+            item_ratings=values[by_item],
+        )
+
+    @staticmethod
+    def _indptr(codes, n):
+        """
+        Return CSR row offsets for rows sorted by codes.
+        """
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(codes, minlength=n), out=indptr[1:])
+        return indptr
+
+    def __len__(self):
+        return len(self.ratings)
+
+    @property
+    def nbytes(self):
+        """
+        Memory held by the arrays and id maps.
+        """
+        return sum(getattr(self, name).nbytes for name in self.ARRAYS) + (
+            self.users.ids.nbytes + self.items.ids.nbytes
+        )
+
+    def user_slice(self, user_id):
+        """
+        Return the bounds of a user's rows, empty when unknown.
+        """
+        index = self.users.index(user_id)
+        if index is None:
+            return slice(0, 0)
+        return slice(self.user_indptr[index], self.user_indptr[index + 1])
+
+    def user_history(self, user_id):
+        """
+        Return (movieIds, ratings) the user rated.
+        """
+        rows = self.user_slice(user_id)
+        return self.items.raw(self.item_indices[rows]), self.ratings[rows]
+
+    def rated_movie_ids(self, user_id):
+        """
+        Return the movieIds the user rated.
+        """
+        return self.items.raw(self.item_indices[self.user_slice(user_id)])
+
+    def item_history(self, movie_id):
+        """
+        Return (userIds, ratings) of the users who rated a movie.
+        """
+        index = self.items.index(movie_id)
+        if index is None:
+            rows = slice(0, 0)
+        else:
+            rows = slice(self.item_indptr[index], self.item_indptr[index + 1])
+        return self.users.raw(self.user_indices[rows]), self.item_ratings[rows]
+
+    def to_csr(self):
+        """
+        Return the user x item rating matrix, sharing the arrays.
+        """
+        return sparse.csr_matrix(
+            (self.ratings, self.item_indices, self.user_indptr),
+            shape=(len(self.users), len(self.items)),
+        )
+
+    def save(self, path):
+        """
+        Persist the store to a .npz file.
+        """
+        np.savez(
+            path,
+            user_ids=self.users.ids,
+            item_ids=self.items.ids,
+            **{name: getattr(self, name) for name in self.ARRAYS},
+        )
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load a store written by save.
+        """
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                IdMap(data["user_ids"]),
+                IdMap(data["item_ids"]),
+                **{name: data[name] for name in cls.ARRAYS},
+            )
@@ -1,9 +1,19 @@
 """ Module for content-based and collaborative filtering recommendation. """
 
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from surprise import Dataset, Reader, SVD
-from surprise.model_selection import train_test_split
+import numpy as np
+from src.bpr import BPR
+from src.implicit import RELEVANCE_THRESHOLD, ImplicitFeedback
+from src.item_knn import ItemKNN
+from src.lazy import (
+    sklearn_pairwise,
+    sklearn_text,
+    surprise,
+    surprise_model_selection,
+)
+from src.profiling import RunReport
+from src.ratings_store import RatingsStore
+from src.retraining import split_holdout
+from src.title_index import TitleIndex
 
 
 class RecommenderSystem:
@@ -12,33 +22,103 @@ class RecommenderSystem:
     filtering recommendation.
     """
 
-    def __init__(self, MOVIES, RATINGS):
+    def __init__(
+        self,
+        MOVIES,
+        RATINGS,
+        tag_features=None,
+        tag_weight=0.5,
+        report=None,
+    ):
         """
         Initialize with movies and ratings DataFrames.
+        Optionally pass fitted TagFeatures (rows aligned to MOVIES)
+        to blend tag similarity into content-based filtering.
+        Stage timings are recorded into report (a RunReport).
         """
         self.movies = MOVIES
-        self.ratings = RATINGS
+        self._ratings = RATINGS
+        # Lazy MovieLensDataset supplying ratings, see from_dataset
+        self._dataset = None
+        self.report = (
+            report if report is not None else RunReport("recommender")
+        )
+        # Shared title/movieId -> row position lookups
+        self.title_index = TitleIndex(MOVIES)
+        if tag_features is not None and not np.array_equal(
+            tag_features.movie_ids, MOVIES["movieId"].to_numpy()
+        ):
+            raise ValueError("Tag features are not aligned to MOVIES rows.")
+        self.tag_features = tag_features
+        self.tag_weight = tag_weight
+        # Genre TF-IDF matrix, built on first content-based request
+        self._genre_matrix = None
+        # Columnar per-user/per-item ratings, built on first use
+        self._ratings_store = None
+
+    @classmethod
+    def from_dataset(cls, dataset, **kwargs):
+        """
+        Build from a lazy MovieLensDataset. Ratings are read on
+        first use, so content-based filtering only loads movies.
+        """
+        recommender = cls(dataset.movies, None, **kwargs)
+        recommender._dataset = dataset
+        return recommender
+
+    @property
+    def ratings(self):
+        """
+        Return the ratings DataFrame, loading it if needed.
+        """
+        if self._ratings is None and self._dataset is not None:
+            self._ratings = self._dataset.ratings
+        return self._ratings
+
+    @property
+    def ratings_store(self):
+        """
+        Return the RatingsStore of RATINGS, building it once.
+        """
+        if self._ratings_store is None:
+            with self.report.stage("build.ratings_store") as info:
+                self._ratings_store = RatingsStore.from_frame(self.ratings)
+                info["items"] = len(self._ratings_store)
+        return self._ratings_store
+
+    @property
+    def genre_matrix(self):
+        """
+        Return the genre TF-IDF matrix, computing it once.
+        """
+        if self._genre_matrix is None:
+            TFIDF = sklearn_text.TfidfVectorizer(stop_words="english")
+            self._genre_matrix = TFIDF.fit_transform(self.movies["genres"])
+        return self._genre_matrix
 
     def content_based_filtering(self, MOVIE_TITLE, TOP_N=10):
         """
         Content-based filtering
-        recommendation based on movie genres.
-        Recommends movies similar to the given movie title.
-        """
-        # Use TF-IDF Vectorizer to calculate the similarity between genres
-        TFIDF = TfidfVectorizer(stop_words="english")
-        TFIDF_MATRIX = TFIDF.fit_transform(self.movies["genres"])
-        # Compute cosine similarity
-        COSINE_SIM = cosine_similarity(TFIDF_MATRIX, TFIDF_MATRIX)
-        # Find the index of the movie that matches the title
-        IDX = self.movies[self.movies["title"] == MOVIE_TITLE].index[0]
-        # Get similarity scores for all movies
-        SIM_SCORES = list(enumerate(COSINE_SIM[IDX]))
-        # Sort movies by similarity scores
-        SIM_SCORES = sorted(SIM_SCORES, key=lambda x: x[1], reverse=True)
-        # fmt: off
-        MOVIE_INDICIES = [i[0] for i in SIM_SCORES[1: TOP_N + 1]]
-        # fmt: on
+        recommendation based on movie genres and,
+        when tag features are set, user tags.
+        Recommends movies similar to the given movie title
+        (or movieId). Raises MovieNotFoundError with near-match
+        suggestions when the movie is not in the catalogue.
+        """
+        # Find the row position of the movie that matches the title
+        IDX = self.title_index.resolve(MOVIE_TITLE)
+        # Cosine similarity of the query row against all movies
+        SIM_SCORES = sklearn_pairwise.cosine_similarity(
+            self.genre_matrix[IDX], self.genre_matrix
+        ).ravel()
+        if self.tag_features is not None:
+            TAG_SCORES = self.tag_features.similarity(IDX)
+            WEIGHT = self.tag_weight
+            SIM_SCORES = (1 - WEIGHT) * SIM_SCORES + WEIGHT * TAG_SCORES
+        # Sort movies by similarity scores (stable for ties)
+        ORDER = np.argsort(-SIM_SCORES, kind="stable")
+        # Skip the query movie itself
+        MOVIE_INDICIES = ORDER[ORDER != IDX][:TOP_N]
         # Return the top-n most similar movies
         return self.movies["title"].iloc[MOVIE_INDICIES]
 
@@ -49,17 +129,22 @@ class RecommenderSystem:
         """
 
         # Prepare data for Surprise library
-        READER = Reader(rating_scale=(1, 5))
-        DATA = Dataset.load_from_df(
+        READER = surprise.Reader(rating_scale=(1, 5))
+        DATA = surprise.Dataset.load_from_df(
             self.ratings[["userId", "movieId", "rating"]], READER
         )
         # Split data into training and testing sets
-        TRAINSET, TESTSET = train_test_split(DATA, TEST_SIZE=0.25)
+        with self.report.stage("split", items=len(self.ratings)):
+            TRAINSET, TESTSET = surprise_model_selection.train_test_split(
+                DATA, test_size=0.25
+            )
         # Use the SVD algorithm for collaborative filtering
-        svd = SVD()
-        svd.fit(TRAINSET)
+        svd = surprise.SVD()
+        with self.report.stage("fit", items=TRAINSET.n_ratings):
+            svd.fit(TRAINSET)
         # Test the model
-        predictions = svd.test(TESTSET)
+        with self.report.stage("predict", items=len(TESTSET)):
+            predictions = svd.test(TESTSET)
         return svd, predictions
 
     def recommend_movies(self, user_id, svd_model, top_n=10):
@@ -68,29 +153,105 @@ class RecommenderSystem:
         using collaborative filtering model (SVD).
         """
 
-        # Get all movies
-        ALL_MOVIES_ID = self.ratings["movieId"].unique()
-        # Predict ratings for all movies the user hasn't rated yet
-        MOVIES_NOT_RATED = self.ratings[
-            ~self.ratings["movieId"].isin(
-                self.ratings[self.ratings["userId"] == user_id]["movieId"]
+        with self.report.stage("recommend"):
+            RECOMMENDED_MOVIES_ID = self._rank_with_svd(
+                user_id, svd_model, top_n
             )
+        # Return movie titles in ranked order
+        return self.movies["title"].iloc[
+            self.title_index.positions_for_movie_ids(RECOMMENDED_MOVIES_ID)
         ]
-        # Get predictions for unrated movies
-        PREDICTIONS = [
-            (MOVIE_ID, svd_model.predict(user_id, MOVIE_ID).est)
-            for MOVIE_ID in MOVIES_NOT_RATED["movieId"]
-        ]
-        # Get predictions for all movies
+
+    def _rank_with_svd(self, user_id, svd_model, top_n):
+        """
+        Return the top-n movieIds by SVD predicted rating.
+        """
+        STORE = self.ratings_store
+        # Predict ratings for all movies the user hasn't rated yet
+        NOT_RATED = np.ones(len(STORE.items), dtype=bool)
+        NOT_RATED[STORE.item_indices[STORE.user_slice(user_id)]] = False
         PREDICTIONS = [
             (movie_id, svd_model.predict(user_id, movie_id).est)
-            for movie_id in ALL_MOVIES_ID
+            for movie_id in STORE.items.ids[NOT_RATED].tolist()
         ]
         # Sort predictions by predicted rating
         PREDICTIONS = sorted(PREDICTIONS, key=lambda x: x[1], reverse=True)
         # Return the top-n recommended movies
-        RECOMMENDED_MOVIES_ID = [pred[0] for pred in PREDICTIONS[:top_n]]
-        # Return movie titles
-        return self.movies[self.movies["movieId"].isin(RECOMMENDED_MOVIES_ID)][
-            "title"
+        return [pred[0] for pred in PREDICTIONS[:top_n]]
+
+    def item_based_filtering(self, k=50, similarity="cosine", n_jobs=None):
+        """
+        Train an item-item collaborative filtering model
+        keeping the top-k neighbours of each movie.
+        """
+        with self.report.stage("fit.item_knn", items=len(self.ratings)):
+            return ItemKNN(k=k, similarity=similarity, n_jobs=n_jobs).fit(
+                self.ratings_store
+            )
+
+    def recommend_movies_item_based(self, user_id, knn_model, top_n=10):
+        """
+        Recommend top-n movies for a given user
+        using the item-item model's neighbour tables.
+        """
+        with self.report.stage("recommend.item_knn"):
+            MOVIE_IDS, RATINGS = self.ratings_store.user_history(user_id)
+            RECOMMENDATIONS = knn_model.recommend_from_history(
+                MOVIE_IDS, RATINGS, top_n
+            )
+        RECOMMENDED_MOVIES_ID = [movie_id for movie_id, _ in RECOMMENDATIONS]
+        # Return movie titles in ranked order
+        return self.movies["title"].iloc[
+            self.title_index.positions_for_movie_ids(RECOMMENDED_MOVIES_ID)
+        ]
+
+    def bpr_filtering(
+        self,
+        factors=64,
+        epochs=20,
+        threshold=RELEVANCE_THRESHOLD,
+        n_jobs=1,
+        test_size=0.25,
+        seed=0,
+    ):
+        """
+        Train a BPR ranking model on the movies users rated at
+        or above threshold, holding out test_size of the ratings.
+        Returns the model and Surprise-style predictions of the
+        held-out ratings (ranking scores as estimates), for
+        Evaluator.evaluate_precision_at_k.
+        """
+        with self.report.stage("split.bpr", items=len(self.ratings)):
+            TRAIN, TEST = split_holdout(self.ratings, test_size, seed)
+            FEEDBACK = ImplicitFeedback.from_ratings(TRAIN, threshold)
+        bpr = BPR(n_factors=factors, n_epochs=epochs, n_jobs=n_jobs, seed=seed)
+        with self.report.stage("fit.bpr", items=len(FEEDBACK) * epochs):
+            model = bpr.fit(FEEDBACK)
+        with self.report.stage("predict.bpr", items=len(TEST)):
+            USER_IDS = TEST["userId"].to_numpy()
+            MOVIE_IDS = TEST["movieId"].to_numpy()
+            SCORES = model.predict(USER_IDS, MOVIE_IDS)
+            predictions = list(
+                zip(
+                    USER_IDS.tolist(),
+                    MOVIE_IDS.tolist(),
+                    TEST["rating"].tolist(),
+                    SCORES.tolist(),
+                    [{} for _ in range(len(TEST))],
+                )
+            )
+        return model, predictions
+
+    def recommend_movies_bpr(self, user_id, bpr_model, top_n=10):
+        """
+        Recommend top-n movies for a given user
+        ranked by a BPR model, skipping movies they rated.
+        """
+        with self.report.stage("recommend.bpr"):
+            RATED = self.ratings_store.rated_movie_ids(user_id)
+            RECOMMENDATIONS = bpr_model.recommend(user_id, RATED, top_n)
+        RECOMMENDED_MOVIES_ID = [movie_id for movie_id, _ in RECOMMENDATIONS]
+        # Return movie titles in ranked order
+        return self.movies["title"].iloc[
+            self.title_index.positions_for_movie_ids(RECOMMENDED_MOVIES_ID)
         ]
@@ -0,0 +1,230 @@
+"""
+This module contains the retraining pipeline: warm-started SVD
+on the ratings added since the published model, validated on a
+holdout before the new version is promoted, and the versioned
+publishing of factor models.
+
+Usage:
+    previous = FactorModel.load(path)
+    result = retrain(snapshot, previous=previous, delta=new_ratings)
+    if result["promote"]:
+        publish(result["model"], path, {"rmse": result["rmse"]})
+"""
+
+import json
+import os
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+from src.profiling import RunReport
+from src.sgd_svd import SGDSVD
+
+RATING_SCALE = (0.5, 5.0)
+
+
+def rmse(model, ratings, rating_scale=RATING_SCALE):
+    """
+    Return the RMSE of a FactorModel on a userId, movieId,
+    rating DataFrame, with predictions clipped to rating_scale.
+    """
+    predictions = np.clip(
+        model.predict(
+            ratings["userId"].to_numpy(), ratings["movieId"].to_numpy()
+        ),
+        *rating_scale,
+    )
+    errors = predictions - ratings["rating"].to_numpy(dtype=np.float64)
+    return float(np.sqrt(np.mean(errors**2)))
+
+
+def split_holdout(ratings, fraction, seed=0):
+    """
+    Return (train, holdout) with a random fraction of the rows
+    held out.
+    """
+    rng = np.random.default_rng(seed)
+    held = np.zeros(len(ratings), dtype=bool)
+    held[rng.permutation(len(ratings))[: int(len(ratings) * fraction)]] = True
+    return ratings[~held], ratings[held]
+
+
+def _pair_keys(ratings):
+    """
+    Return one int64 key per (userId, movieId) row.
+    """
+    users = ratings["userId"].to_numpy(dtype=np.int64)
+    movies = ratings["movieId"].to_numpy(dtype=np.int64)
+    return users * (1 << 32) + movies
+
+
+def retrain(
+    snapshot,
+    previous=None,
+    delta=None,
+    factors=100,
+    epochs=20,
+    warm_epochs=5,
+    lr=0.005,
+    replay=0.1,
+    holdout=0.1,
+    tolerance=0.0,
+    cold=False,
+    refit=False,
+    seed=0,
+    report=None,
+    callback=None,
+):
+    """
+    Train a new model on the userId, movieId, rating snapshot.
+
+    With a previous model and the delta (the snapshot rows added
+    or changed since it was trained) training warm-starts from
+    the previous factors and runs warm_epochs over the delta plus
+    a replayed sample (fraction replay) of the older rows, which
+    keeps the factors anchored to the rest of the data. Without
+    a previous model or a delta, or with cold, the model is
+    trained from scratch for epochs on the whole snapshot.
+
+    A holdout fraction of the delta (of the snapshot when the
+    delta is unknown) is left out of training. With a previous
+    model the new one is promoted when its RMSE there is at most
+    the previous model's plus tolerance; only a holdout drawn
+    from the delta is fair to both, on a snapshot holdout the
+    previous model has seen its rows. Without a previous model
+    it is promoted when its holdout RMSE is finite. The returned
+    model is the validated one; with refit, a promoted model is
+    instead fitted again with the holdout rows so it learns from
+    every new rating, at the cost of a second fit and of
+    publishing a model rmse was not measured on.
+
+    Returns a dict with the model, mode ("warm" or "cold"),
+    rmse, previous_rmse, promote, refit (whether the model was
+    refitted) and trained (rows fitted).
+    """
+    report = report if report is not None else RunReport("retrain")
+    warm = previous is not None and delta is not None and not cold
+    # Neither model was trained on held-out delta rows; a delta
+    # too small to hold any out falls back to the snapshot
+    held_from_delta = delta is not None and int(len(delta) * holdout) > 0
+    _, validation = split_holdout(
+        delta if held_from_delta else snapshot, holdout, seed
+    )
+    if warm:
+        older = snapshot[~np.isin(_pair_keys(snapshot), _pair_keys(delta))]
+        _, replayed = split_holdout(older, replay, seed)
+        train = pd.concat([delta, replayed])
+    else:
+        train = snapshot
+    train = train[~np.isin(_pair_keys(train), _pair_keys(validation))]
+    svd = SGDSVD(
+        n_factors=factors,
+        n_epochs=warm_epochs if warm else epochs,
+        lr=lr,
+        seed=seed,
+    )
+
+    def fit(rows, callback=None):
+        return svd.fit(
+            rows["userId"].to_numpy(),
+            rows["movieId"].to_numpy(),
+            rows["rating"].to_numpy(),
+            init=previous if warm else None,
+            callback=callback,
+        )
+
+    with report.stage("fit", items=len(train)):
+        model = fit(train, callback)
+    with report.stage("validate", items=len(validation)):
+        score = rmse(model, validation) if len(validation) else None
+        previous_score = (
+            rmse(previous, validation)
+            if previous is not None and len(validation)
+            else None
+        )
+    if previous is not None:
+        promote = (
+            score is not None
+            and previous_score is not None
+            and score <= previous_score + tolerance
+        )
+    else:
+        promote = score is not None and np.isfinite(score)
+    refit = bool(promote and refit and len(validation))
+    if refit:
+        train = pd.concat([train, validation])
+        with report.stage("refit", items=len(train)):
+            model = fit(train)
+    return {
+        "model": model,
+        "mode": "warm" if warm else "cold",
+        "rmse": score,
+        "previous_rmse": previous_score,
+        "promote": bool(promote),
+        "refit": refit,
+        "trained": len(train),
+    }
+
+
+def metadata_path(path):
+    """
+    Return the JSON metadata path stored next to a model file.
+    """
+    return f"{os.path.splitext(path)[0]}.json"
+
+
+def read_metadata(path):
+    """
+    Return the metadata published with the model at path, or an
+    empty dict.
+    """
+    try:
+        with open(metadata_path(path)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def _replace_json(path, data):
+    """
+    Write data as JSON to path atomically.
+    """
+    temporary = f"{path}.tmp"
+    with open(temporary, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(temporary, path)
+
+
+def publish(model, path, metadata=None, keep=5):
+    """
+    Save model as a new version and make it the one at path.
+    The version is archived under versions/ next to path (the
+    newest keep are kept) and then swapped in with an atomic
+    rename, so readers see the old or the new file, never a
+    partial one. Returns the metadata, with its version.
+    """
+    now = datetime.now(timezone.utc)
+    metadata = {
+        **(metadata or {}),
+        "version": now.strftime("%Y%m%dT%H%M%S%fZ"),
+        "published_at": now.isoformat(),
+    }
+    directory = os.path.dirname(path) or "."
+    versions = os.path.join(directory, "versions")
+    os.makedirs(versions, exist_ok=True)
+    archived = os.path.join(versions, f"{metadata['version']}.npz")
+    model.save(archived)
+    _replace_json(metadata_path(archived), metadata)
+
+    temporary = os.path.join(directory, f".{metadata['version']}.npz")
+    model.save(temporary)
+    os.replace(temporary, path)
+    _replace_json(metadata_path(path), metadata)
+
+    archives = sorted(
+        name for name in os.listdir(versions) if name.endswith(".npz")
+    )
+    for name in archives[:-keep] if keep else ():
+        os.remove(os.path.join(versions, name))
+        os.remove(metadata_path(os.path.join(versions, name)))
+    return metadata
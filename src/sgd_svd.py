@@ -0,0 +1,126 @@
+"""
+This module contains SGDSVD, a NumPy implementation of the
+biased SVD that Surprise fits, which can start from the factors
+of a previous FactorModel instead of a random initialization.
+"""
+
+import numpy as np
+from src.factor_model import FactorModel
+from src.id_map import IdMap
+
+
+class SGDSVD:
+    """
+    Biased matrix factorization (rating = mean + user bias +
+    item bias + user factors . item factors) fitted by
+    mini-batch SGD. Defaults match surprise.SVD. Updates of a
+    batch are computed from the same parameters and summed, so
+    batch_size trades a little per-rating accuracy for NumPy
+    throughput.
+    """
+
+    def __init__(
+        self,
+        n_factors=100,
+        n_epochs=20,
+        lr=0.005,
+        reg=0.02,
+        init_std=0.1,
+        batch_size=1024,
+        seed=0,
+    ):
+        """
+        Initialize the hyperparameters.
+        """
+        self.n_factors = n_factors
+        self.n_epochs = n_epochs
+        self.lr = lr
+        self.reg = reg
+        self.init_std = init_std
+        self.batch_size = batch_size
+        self.seed = seed
+
+    def fit(self, user_ids, movie_ids, ratings, init=None, callback=None):
+        """
+        Fit on parallel arrays of raw userIds, movieIds and
+        ratings and return a FactorModel. With init (a
+        FactorModel) training warm-starts: users and items it
+        knows keep their factors, biases and the global mean,
+        and only new ones are initialized randomly. The returned
+        model covers the ids of both. callback(epoch) is called
+        after every epoch.
+        """
+        user_ids = np.asarray(user_ids)
+        movie_ids = np.asarray(movie_ids)
+        ratings = np.asarray(ratings, dtype=np.float64)
+        rng = np.random.default_rng(self.seed)
+        if init is None:
+            users, items = IdMap(user_ids), IdMap(movie_ids)
+            global_mean = float(ratings.mean()) if len(ratings) else 0.0
+        else:
+            users = IdMap(np.concatenate([init.user_ids, user_ids]))
+            items = IdMap(np.concatenate([init.item_ids, movie_ids]))
+            global_mean = init.global_mean
+        user_factors, user_bias = self._initial(len(users), rng)
+        item_factors, item_bias = self._initial(len(items), rng)
+        if init is not None:
+            if init.user_factors.shape[1] != self.n_factors:
+                raise ValueError(
+                    f"Cannot warm-start {self.n_factors} factors from a "
+                    f"model with {init.user_factors.shape[1]}."
+                )
+            known_users = users.indices(init.user_ids)
+            known_items = items.indices(init.item_ids)
+            user_factors[known_users] = init.user_factors
+            item_factors[known_items] = init.item_factors
+            user_bias[known_users] = init.user_bias
+            item_bias[known_items] = init.item_bias
+
+        rows = users.indices(user_ids)
+        columns = items.indices(movie_ids)
+        for epoch in range(self.n_epochs):
+            order = rng.permutation(len(ratings))
+            for begin in range(0, len(order), self.batch_size):
+                end = begin + self.batch_size
+                batch = order[begin:end]
+                self._step(
+                    rows[batch],
+                    columns[batch],
+                    ratings[batch],
+                    global_mean,
+                    user_factors,
+                    item_factors,
+                    user_bias,
+                    item_bias,
+                )
+            if callback is not None:
+                callback(epoch)
+        return FactorModel(
+            user_ids=users.ids,
+            item_ids=items.ids,
+            user_factors=user_factors,
+            item_factors=item_factors,
+            user_bias=user_bias,
+            item_bias=item_bias,
+            global_mean=global_mean,
+        )
+
+    def _initial(self, n, rng):
+        """
+        Return random factors and zero biases for n rows.
+        """
+        factors = rng.normal(0, self.init_std, (n, self.n_factors))
+        return factors, np.zeros(n)
+
+    def _step(self, u, i, r, mean, P, Q, bu, bi):
+        """
+        Apply one SGD update for a batch of ratings, in place.
+        """
+        pu, qi = P[u], Q[i]
+        bu_u, bi_i = bu[u], bi[i]
+        err = r - (mean + bu_u + bi_i + np.einsum("ij,ij->i", pu, qi))
+        lr, reg = self.lr, self.reg
+        np.add.at(bu, u, lr * (err - reg * bu_u))
+        np.add.at(bi, i, lr * (err - reg * bi_i))
+        np.add.at(P, u, lr * (err[:, None] * qi - reg * pu))
+        np.add.at(Q, i, lr * (err[:, None] * pu - reg * qi))
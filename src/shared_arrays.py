@@ -0,0 +1,175 @@
+"""
+This module places NumPy arrays in named shared memory
+segments so that several worker processes can map one
+physical copy of a model.
+"""
+
+import hashlib
+import json
+import os
+import struct
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Array data is aligned to this many bytes within a segment
+ALIGNMENT = 64
+# Ready flag and manifest length. The flag is written last, so a
+# segment is attached only once it is completely filled
+HEADER = struct.Struct("<QQ")
+READY = 0x59444145525F5352
+# How long attach waits for a segment being published
+ATTACH_TIMEOUT = 30.0
+POLL_SECONDS = 0.01
+
+
+def _layout(arrays):
+    """
+    Return the JSON manifest of arrays and the segment size.
+    Each entry records dtype, shape and byte offset.
+    """
+    entries = {}
+    offset = 0
+    for name, array in arrays.items():
+        entries[name] = {
+            "dtype": array.dtype.str,
+            "shape": list(array.shape),
+            "offset": offset,
+        }
+        offset += -(-array.nbytes // ALIGNMENT) * ALIGNMENT
+    manifest = json.dumps(entries).encode()
+    start = -(-(HEADER.size + len(manifest)) // ALIGNMENT) * ALIGNMENT
+    return manifest, start, start + max(offset, 1)
+
+
+def _views(shm, writable=False):
+    """
+    Return array views over a segment's buffer, read-only unless
+    writable.
+    """
+    _, length = HEADER.unpack_from(shm.buf)
+    begin, end = HEADER.size, HEADER.size + length
+    entries = json.loads(bytes(shm.buf[begin:end]))
+    start = -(-end // ALIGNMENT) * ALIGNMENT
+    arrays = {}
+    for name, entry in entries.items():
+        array = np.ndarray(
+            tuple(entry["shape"]),
+            dtype=np.dtype(entry["dtype"]),
+            buffer=shm.buf,
+            offset=start + entry["offset"],
+        )
+        array.flags.writeable = writable
+        arrays[name] = array
+    return arrays
+
+
+def publish(name, arrays, writable=False):
+    """
+    Create segment name holding arrays and return
+    (SharedMemory, views), read-only unless writable. Raises
+    FileExistsError when the segment already exists. The ready
+    flag is set after the arrays are copied in; attach waits for
+    it.
+
+    Creating and attaching processes register the segment with
+    their multiprocessing resource tracker, which unlinks it when
+    the process that started the tracker exits. Only under
+    gunicorn --preload do the workers of one server share the
+    tracker of their parent, so the segment lives as long as the
+    server. Otherwise every worker has its own tracker and the
+    segment is unlinked when the first worker using it exits; it
+    stays mapped in the other workers and is published again by
+    the next worker that starts.
+    """
+    arrays = {key: np.asarray(a, order="C") for key, a in arrays.items()}
+    manifest, start, size = _layout(arrays)
+    shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+    HEADER.pack_into(shm.buf, 0, 0, len(manifest))
+    begin, end = HEADER.size, HEADER.size + len(manifest)
+    shm.buf[begin:end] = manifest
+    entries = json.loads(manifest)
+    for key, array in arrays.items():
+        begin = start + entries[key]["offset"]
+        end = begin + array.nbytes
+        shm.buf[begin:end] = array.reshape(-1).view(np.uint8)
+    HEADER.pack_into(shm.buf, 0, READY, len(manifest))
+    return shm, _views(shm, writable)
+
+
+def attach(name, writable=False, timeout=ATTACH_TIMEOUT):
+    """
+    Map an existing segment and return (SharedMemory, views),
+    read-only unless writable. A segment still being published
+    is waited for up to timeout seconds. Raises
+    FileNotFoundError when missing and TimeoutError when it is
+    not ready in time (its publisher died while filling it).
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            shm = shared_memory.SharedMemory(name=name)
+        except ValueError:
+            # Created but not sized yet: mmap of an empty file
+            shm = None
+        if shm is not None:
+            if HEADER.unpack_from(shm.buf)[0] == READY:
+                return shm, _views(shm, writable)
+            shm.close()
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"Shared memory segment {name} is not ready.")
+        time.sleep(POLL_SECONDS)
+
+
+def segment_name(path, prefix="recsys"):
+    """
+    Return a segment name derived from a file's path, size and
+    modification time, so a retrained model gets a new segment.
+    """
+    stat = os.stat(path)
+    key = f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}"
+    return f"{prefix}-{hashlib.sha1(key.encode()).hexdigest()[:20]}"
+
+
+def attach_or_publish(name, build):
+    """
+    Attach to segment name, or create it from the arrays
+    returned by build() when no process has published it yet.
+    Returns (SharedMemory, read-only views, created).
+    """
+    try:
+        return (*attach(name), False)
+    except FileNotFoundError:
+        pass
+    arrays = build()
+    try:
+        return (*publish(name, arrays), True)
+    except FileExistsError:
+        # Another worker published it first
+        return (*attach(name), False)
+
+
+def process_memory():
+    """
+    Return this process's memory split from
+    /proc/self/smaps_rollup in bytes: rss, pss, shared and
+    private. Empty on platforms without it.
+    """
+    fields = {}
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if value.strip().endswith("kB"):
+                    fields[key] = int(value.split()[0]) * 1024
+    except OSError:
+        return {}
+    return {
+        "rss": fields.get("Rss", 0),
+        "pss": fields.get("Pss", 0),
+        "shared": fields.get("Shared_Clean", 0)
+        + fields.get("Shared_Dirty", 0),
+        "private": fields.get("Private_Clean", 0)
+        + fields.get("Private_Dirty", 0),
+    }
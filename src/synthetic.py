@@ -0,0 +1,470 @@
+"""
+This module generates synthetic MovieLens-shaped datasets
+(movies, ratings, tags, links) for benchmarks, tests and scale
+testing.
+
+Generation is seeded and vectorized, so the same arguments
+always give the same data and the 32m scale takes seconds:
+user activity and movie popularity follow power laws, movies get
+a mix of genres at MovieLens frequencies and each user rates in a
+burst after signing up, never before a movie's release.
+
+Usage:
+    python -m src.synthetic ml-synthetic/ --scale 32m
+    python -m src.synthetic ml-synthetic/ --ratings 100000000 \\
+        --columnar
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from src.id_map import IdMap
+from src.ratings_store import RatingsStore
+
+GENRES = np.array(
+    [
+        "Action",
+        "Adventure",
+        "Animation",
+        "Children",
+        "Comedy",
+        "Crime",
+        "Documentary",
+        "Drama",
+        "Fantasy",
+        "Film-Noir",
+        "Horror",
+        "IMAX",
+        "Musical",
+        "Mystery",
+        "Romance",
+        "Sci-Fi",
+        "Thriller",
+        "War",
+        "Western",
+    ]
+)
+
+# Movies per genre in ml-32m, in GENRES order
+GENRE_WEIGHTS = np.array(
+    [
+        9_668,
+        5_402,
+        4_617,
+        4_520,
+        23_124,
+        6_976,
+        7_363,
+        33_681,
+        3_821,
+        353,
+        8_654,
+        195,
+        1_059,
+        3_972,
+        10_369,
+        4_907,
+        11_823,
+        2_325,
+        1_696,
+    ]
+)
+
+# Share of movies listed with "(no genres listed)"
+NO_GENRES = 0.08
+
+# (users, movies, ratings) of the public MovieLens releases, and
+# a larger made-up one for scale testing
+SCALES = {
+    "100k": (610, 9_742, 100_836),
+    "1m": (6_040, 3_706, 1_000_209),
+    "10m": (69_878, 10_677, 10_000_054),
+    "32m": (200_948, 87_585, 32_000_204),
+    "100m": (600_000, 120_000, 100_000_000),
+}
+
+TAG_WORDS = np.array(
+    [
+        "atmospheric",
+        "based on a book",
+        "classic",
+        "dark comedy",
+        "funny",
+        "plot twist",
+        "sci-fi",
+        "surreal",
+        "twist ending",
+        "visually appealing",
+    ]
+)
+
+# Every MovieLens user has at least this many ratings; none rates
+# more than MAX_USER_SHARE of the movies
+MIN_USER_RATINGS = 20
+MAX_USER_SHARE = 0.4
+
+# Power-law exponents of user activity and movie popularity. The
+# movie law is Zipf-Mandelbrot, flattened over the first
+# MOVIE_OFFSET of the catalogue: the most popular movie gets about
+# 0.2% of ml-32m's ratings rather than 8%.
+USER_EXPONENT = 0.8
+MOVIE_EXPONENT = 1.2
+MOVIE_OFFSET = 0.002
+
+# Rating timestamps span ml-32m: January 1995 to October 2023.
+# Half stars were introduced in February 2003.
+FIRST_TIMESTAMP = 789_652_009
+LAST_TIMESTAMP = 1_697_164_154
+HALF_STARS_SINCE = 1_045_526_400
+SECONDS_PER_DAY = 86_400
+
+# Rounds drawing replacements for duplicate (user, movie) pairs by
+# popularity before falling back to uniform draws, which converge
+# quickly for the heaviest users
+POPULAR_ROUNDS = 8
+
+
+def _zipf_weights(n, exponent, rng, offset=0.0):
+    """
+    Return shuffled power-law sampling weights for n entities,
+    1 / (rank + offset) ** exponent.
+    """
+    weights = 1.0 / (np.arange(1, n + 1) + offset) ** exponent
+    rng.shuffle(weights)
+    return weights / weights.sum()
+
+
+def _sample(weights, n, rng):
+    """
+    Draw n indices with probabilities weights, by inverting the
+    cumulative distribution (much faster than rng.choice with p).
+    """
+    cdf = np.cumsum(weights)
+    return np.searchsorted(cdf / cdf[-1], rng.random(n), side="right")
+
+
+def _genre_masks(n_movies, rng):
+    """
+    Return an (n_movies, len(GENRES)) mask of one to a few genres
+    per movie, picked at their MovieLens frequencies, with
+    NO_GENRES of the movies left without any.
+    """
+    # Gumbel top-k: the k largest log weight + Gumbel noise keys
+    # are a weighted sample without replacement
+    keys = np.log(GENRE_WEIGHTS) + rng.gumbel(size=(n_movies, len(GENRES)))
+    k = np.minimum(1 + rng.poisson(0.8, n_movies), 6)
+    threshold = -np.sort(-keys, axis=1)[np.arange(n_movies), k - 1]
+    masks = keys >= threshold[:, None]
+    masks[rng.random(n_movies) < NO_GENRES] = False
+    return masks
+
+
+def _movies(n_movies, rng):
+    """
+    Return the movies and links DataFrames and the release year
+    of each movie.
+    """
+    # Sparse movieIds like the real dataset
+    movie_ids = np.sort(
+        rng.choice(np.arange(1, n_movies * 3 + 1), n_movies, replace=False)
+    )
+    # Most movies are recent, with a long tail back to 1902
+    years = np.maximum(
+        2023 - rng.exponential(18, n_movies).astype(np.int64), 1902
+    )
+    masks = _genre_masks(n_movies, rng)
+    movies = pd.DataFrame(
+        {
+            "movieId": movie_ids,
+            "title": [
+                f"Synthetic Movie {movie_id} ({year})"
+                for movie_id, year in zip(movie_ids, years)
+            ],
+            "genres": [
+                "|".join(GENRES[mask]) or "(no genres listed)"
+                for mask in masks
+            ],
+        }
+    )
+    links = pd.DataFrame(
+        {
+            "movieId": movie_ids,
+            "imdbId": rng.integers(1, 9_999_999, n_movies),
+            "tmdbId": rng.integers(1, 999_999, n_movies).astype(float),
+        }
+    )
+    return movies, links, years
+
+
+def _user_counts(n_users, n_movies, n_ratings, rng):
+    """
+    Return the number of ratings of each user: at least
+    MIN_USER_RATINGS (when there are enough ratings), at most
+    MAX_USER_SHARE of the movies, power-law in between and
+    summing to n_ratings.
+    """
+    floor = min(MIN_USER_RATINGS, n_ratings // n_users, n_movies)
+    cap = max(floor, int(n_movies * MAX_USER_SHARE), 1)
+    if n_ratings > n_users * cap:
+        raise ValueError(
+            f"{n_ratings} ratings do not fit {n_users} users rating at "
+            f"most {cap} of {n_movies} movies each."
+        )
+    weights = _zipf_weights(n_users, USER_EXPONENT, rng)
+    counts = np.full(n_users, floor, dtype=np.int64)
+    remaining = n_ratings - counts.sum()
+    # Users pushed over the cap give their excess to the others
+    while remaining:
+        open_ = counts < cap
+        extra = rng.multinomial(
+            remaining, weights[open_] / weights[open_].sum()
+        )
+        counts[open_] = np.minimum(counts[open_] + extra, cap)
+        remaining = n_ratings - counts.sum()
+    return counts
+
+
+def _rating_pairs(counts, movie_weights, rng):
+    """
+    Return (user indices, movie indices) of distinct pairs, sorted
+    by user then movie, with counts[u] movies per user u drawn by
+    popularity. Duplicate draws are redrawn until none are left.
+    """
+    n_movies = len(movie_weights)
+    users = np.repeat(np.arange(len(counts), dtype=np.int64), counts)
+    keys = users * n_movies + _sample(movie_weights, len(users), rng)
+    del users
+    keys.sort()
+    repeated = np.zeros(len(keys), dtype=bool)
+    repeated[1:] = keys[1:] == keys[:-1]
+    missing = keys[repeated] // n_movies
+    keys = keys[~repeated]
+    del repeated
+
+    rounds = 0
+    while len(missing):
+        if rounds < POPULAR_ROUNDS:
+            movies = _sample(movie_weights, len(missing), rng)
+        else:
+            movies = rng.integers(0, n_movies, len(missing))
+        drawn = missing * n_movies + movies
+        order = np.argsort(drawn)
+        drawn, missing = drawn[order], missing[order]
+        positions = np.searchsorted(keys, drawn)
+        accepted = np.ones(len(drawn), dtype=bool)
+        accepted[1:] = drawn[1:] != drawn[:-1]
+        accepted &= keys[np.minimum(positions, len(keys) - 1)] != drawn
+        # Sorted insertion keeps keys sorted in one linear pass
+        keys = np.insert(keys, positions[accepted], drawn[accepted])
+        missing = missing[~accepted]
+        rounds += 1
+    return keys // n_movies, keys % n_movies
+
+
+def _timestamps(counts, items, years, rng):
+    """
+    Return a timestamp per rating. Users sign up over the dataset
+    span (more of them later) and rate most of their movies in a
+    burst right after; a few stay active for years. Ratings that
+    would predate the movie's release move after it.
+    """
+    n_users = len(counts)
+    signup = FIRST_TIMESTAMP + (LAST_TIMESTAMP - FIRST_TIMESTAMP) * rng.beta(
+        1.5, 1.0, n_users
+    )
+    # Log-normal activity spans: median 3 days, 99th percentile years
+    span = np.minimum(
+        rng.lognormal(np.log(3 * SECONDS_PER_DAY), 2.5, n_users),
+        LAST_TIMESTAMP - signup,
+    )
+    timestamps = np.repeat(signup, counts)
+    timestamps += np.repeat(span, counts) * rng.random(len(items)) ** 2
+    # January 1st of each movie's release year
+    release = (years - 1970).astype("datetime64[Y]").astype("datetime64[s]")
+    release = release.astype(np.int64)[items]
+    early = np.flatnonzero(timestamps < release)
+    timestamps[early] = (
+        release[early]
+        + (LAST_TIMESTAMP - release[early]) * rng.random(len(early)) ** 3
+    )
+    return timestamps.astype(np.int64)
+
+
+def _rating_values(users, items, timestamps, counts, movie_weights, rng):
+    """
+    Return a rating per (user, item): global mean plus user and
+    movie biases (popular movies rate higher) plus noise, rounded
+    to whole stars, or to half stars for the users who use them
+    once they exist.
+    """
+    n_users, n_movies = len(counts), len(movie_weights)
+    popularity = np.log(movie_weights)
+    popularity = (popularity - popularity.mean()) / (popularity.std() or 1)
+    user_bias = rng.normal(0, 0.4, n_users).astype(np.float32)
+    movie_bias = (rng.normal(0, 0.35, n_movies) + 0.2 * popularity).astype(
+        np.float32
+    )
+    scores = rng.normal(3.4, 0.9, len(users)).astype(np.float32)
+    scores += user_bias[users]
+    scores += movie_bias[items]
+    half_stars = rng.random(n_users) < 0.4
+    steps = np.where(
+        half_stars[users] & (timestamps >= HALF_STARS_SINCE), 2, 1
+    ).astype(np.float32)
+    return np.clip(np.rint(scores * steps), 1, 5 * steps) / steps
+
+
+def _tags(ratings, n_users, rng):
+    """
+    Return tags applied by a few users (about 8%, as in ml-32m)
+    to movies they rated, one per 16 ratings.
+    """
+    users = ratings["userId"].to_numpy()
+    taggers = rng.random(n_users + 1) < 0.08
+    rows = np.flatnonzero(taggers[users])
+    n_tags = max(len(ratings) // 16, 1) if len(rows) else 0
+    rows = rows[rng.integers(0, len(rows), n_tags)] if n_tags else rows
+    words = _sample(_zipf_weights(len(TAG_WORDS), 1.0, rng), n_tags, rng)
+    return pd.DataFrame(
+        {
+            "userId": users[rows],
+            "movieId": ratings["movieId"].to_numpy()[rows],
+            "tag": TAG_WORDS[words],
+            "timestamp": ratings["timestamp"].to_numpy()[rows]
+            + rng.integers(0, 600, n_tags),
+        }
+    ).drop_duplicates(["userId", "movieId", "tag"])
+
+
+def generate_movielens(
+    scale="100k", seed=0, n_users=None, n_movies=None, n_ratings=None
+):
+    """
+    Generate MovieLens-shaped DataFrames.
+    scale picks the sizes from SCALES; n_users, n_movies and
+    n_ratings override them. Ratings hold exactly n_ratings
+    distinct (userId, movieId) pairs sorted by userId and
+    movieId, like ratings.csv. Raises ValueError when they cannot
+    fit. Returns movies, ratings, tags, links.
+    """
+    default_users, default_movies, default_ratings = SCALES[scale]
+    n_users = n_users or default_users
+    n_movies = n_movies or default_movies
+    n_ratings = n_ratings or default_ratings
+    rng = np.random.default_rng(seed)
+
+    movies, links, years = _movies(n_movies, rng)
+    movie_weights = _zipf_weights(
+        n_movies, MOVIE_EXPONENT, rng, MOVIE_OFFSET * n_movies
+    )
+    counts = _user_counts(n_users, n_movies, n_ratings, rng)
+    users, items = _rating_pairs(counts, movie_weights, rng)
+    timestamps = _timestamps(counts, items, years, rng)
+    ratings = pd.DataFrame(
+        {
+            "userId": (users + 1).astype(np.int32),
+            "movieId": movies["movieId"].to_numpy(dtype=np.int32)[items],
+            "rating": _rating_values(
+                users, items, timestamps, counts, movie_weights, rng
+            ),
+            "timestamp": timestamps,
+        }
+    )
+    tags = _tags(ratings, n_users, rng)
+    return movies, ratings, tags, links
+
+
+def ratings_store(ratings, movies):
+    """
+    Return the RatingsStore of generated ratings over the movies
+    catalogue. Ratings come sorted by userId, so this skips the
+    id sorting RatingsStore.from_frame does.
+    """
+    user_ids = ratings["userId"].to_numpy()
+    first = np.ones(len(user_ids), dtype=bool)
+    first[1:] = user_ids[1:] != user_ids[:-1]
+    items = IdMap(movies["movieId"].to_numpy())
+    return RatingsStore.from_codes(
+        IdMap(user_ids[first]),
+        items,
+        (np.cumsum(first) - 1).astype(np.int32),
+        items.indices(ratings["movieId"].to_numpy()),
+        ratings["rating"].to_numpy(),
+        ratings["timestamp"].to_numpy(),
+    )
+
+
+def write_movielens(path, scale="100k", seed=0, columnar=False, **sizes):
+    """
+    Generate a dataset and write movies.csv, ratings.csv,
+    tags.csv and links.csv into path. With columnar, ratings are
+    written as a RatingsStore (ratings.npz) instead of a CSV,
+    which takes seconds where the CSV takes minutes at the 32m
+    scale.
+    """
+    os.makedirs(path, exist_ok=True)
+    movies, ratings, tags, links = generate_movielens(scale, seed, **sizes)
+    frames = {
+        "movies": movies,
+        "ratings": ratings,
+        "tags": tags,
+        "links": links,
+    }
+    if columnar:
+        ratings_store(frames.pop("ratings"), movies).save(
+            os.path.join(path, "ratings.npz")
+        )
+    for name, frame in frames.items():
+        frame.to_csv(os.path.join(path, f"{name}.csv"), index=False)
+    return path
+
+
+def main(argv=None):
+    """
+    Write a synthetic dataset and print its sizes and timing.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("path")
+    parser.add_argument("--scale", choices=SCALES, default="100k")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--users", type=int, default=None)
+    parser.add_argument("--movies", type=int, default=None)
+    parser.add_argument("--ratings", type=int, default=None)
+    parser.add_argument(
+        "--columnar",
+        action="store_true",
+        help="Write ratings as a RatingsStore instead of ratings.csv.",
+    )
+    options = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    write_movielens(
+        options.path,
+        options.scale,
+        options.seed,
+        columnar=options.columnar,
+        n_users=options.users,
+        n_movies=options.movies,
+        n_ratings=options.ratings,
+    )
+    print(
+        json.dumps(
+            {
+                "path": options.path,
+                "scale": options.scale,
+                "seed": options.seed,
+                "columnar": options.columnar,
+                "seconds": round(time.perf_counter() - started, 2),
+            }
+        )
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
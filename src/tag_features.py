@@ -0,0 +1,156 @@
+"""
+This module contains the TagFeatures class that turns
+MovieLens user tags into per-movie feature vectors.
+"""
+
+import numpy as np
+import pandas as pd
+from src.lazy import sklearn_decomposition, sklearn_preprocessing, sparse
+
+
+class TagFeatures:
+    """
+    Aggregates user tags per movie into a sparse TF-IDF or
+    BM25 weighted matrix, optionally reduced with truncated
+    SVD into dense L2-normalized movie embeddings.
+    Rows follow the order of the movies DataFrame passed to fit.
+    """
+
+    WEIGHTINGS = ("tfidf", "bm25")
+
+    def __init__(
+        self,
+        weighting="tfidf",
+        n_components=None,
+        min_df=2,
+        k1=1.2,
+        b=0.75,
+        random_state=42,
+    ):
+        """
+        Initialize the weighting scheme and optional
+        number of SVD components.
+        """
+        if weighting not in self.WEIGHTINGS:
+            raise ValueError(
+                f"weighting must be one of {self.WEIGHTINGS}, "
+                f"got {weighting!r}"
+            )
+        self.weighting = weighting
+        self.n_components = n_components
+        self.min_df = min_df
+        self.k1 = k1
+        self.b = b
+        self.random_state = random_state
+        self.matrix = None
+        self.vocabulary = None
+        self.movie_ids = None
+
+    def fit(self, tags, movies):
+        """
+        Build the movie x tag matrix from a tags DataFrame
+        (movieId, tag) aligned to the rows of movies.
+        Returns self.
+        """
+        self.movie_ids = movies["movieId"].to_numpy()
+        tags = tags.dropna(subset=["tag"])
+        rows = pd.Index(self.movie_ids).get_indexer(tags["movieId"])
+        known = rows >= 0
+        tag_text = tags["tag"].astype(str).str.strip().str.lower()[known]
+        codes, vocabulary = pd.factorize(tag_text, sort=True)
+        # Duplicate (movie, tag) pairs are summed into counts
+        counts = sparse.csr_matrix(
+            (
+                np.ones(len(codes), dtype=np.float32),
+                (rows[known], codes),
+            ),
+            shape=(len(self.movie_ids), len(vocabulary)),
+        )
+        counts.sum_duplicates()
+
+        # Drop tags used on fewer than min_df movies
+        df = np.bincount(counts.indices, minlength=counts.shape[1])
+        keep = np.flatnonzero(df >= self.min_df)
+        counts = counts[:, keep]
+        self.vocabulary = np.asarray(vocabulary)[keep]
+
+        weighted = self._weight(counts.tocsr(), df[keep])
+        if self.n_components and weighted.shape[1] > 1:
+            svd = sklearn_decomposition.TruncatedSVD(
+                n_components=min(self.n_components, weighted.shape[1] - 1),
+                random_state=self.random_state,
+            )
+            weighted = svd.fit_transform(weighted).astype(np.float32)
+        self.matrix = sklearn_preprocessing.normalize(weighted)
+        return self
+
+    def _weight(self, counts, df):
+        """
+        Apply TF-IDF or BM25 weighting to a count matrix.
+        """
+        n_movies = counts.shape[0]
+        weighted = counts.astype(np.float32)
+        if self.weighting == "tfidf":
+            idf = np.log((1 + n_movies) / (1 + df)) + 1
+            weighted.data = np.log1p(weighted.data)
+        else:
+            idf = np.log1p((n_movies - df + 0.5) / (df + 0.5))
+            doc_len = np.asarray(counts.sum(axis=1)).ravel()
+            avg_len = doc_len[doc_len > 0].mean() if doc_len.any() else 1.0
+            row_len = np.repeat(doc_len, np.diff(counts.indptr))
+            tf = weighted.data
+            weighted.data = (tf * (self.k1 + 1)) / (
+                tf + self.k1 * (1 - self.b + self.b * row_len / avg_len)
+            )
+        return weighted @ sparse.diags(idf.astype(np.float32))
+
+    def similarity(self, position):
+        """
+        Return cosine similarities between the movie at the
+        given row position and every movie.
+        """
+        scores = self.matrix @ self.matrix[position].T
+        if sparse.issparse(scores):
+            scores = scores.toarray()
+        return np.asarray(scores).ravel()
+
+    def save(self, path):
+        """
+        Persist the feature matrix, vocabulary and movieIds
+        to a single .npz file.
+        """
+        payload = {
+            "movie_ids": self.movie_ids,
+            "vocabulary": self.vocabulary.astype(str),
+            "weighting": np.array(self.weighting),
+        }
+        if sparse.issparse(self.matrix):
+            matrix = self.matrix.tocsr()
+            payload.update(
+                data=matrix.data,
+                indices=matrix.indices,
+                indptr=matrix.indptr,
+                shape=np.array(matrix.shape),
+            )
+        else:
+            payload["dense"] = self.matrix
+        np.savez_compressed(path, **payload)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load features written by save.
+        """
+        with np.load(path, allow_pickle=False) as data:
+            features = cls(weighting=str(data["weighting"]))
+            features.movie_ids = data["movie_ids"]
+            features.vocabulary = data["vocabulary"]
+            if "dense" in data:
+                features.matrix = data["dense"]
+                features.n_components = features.matrix.shape[1]
+            else:
+                features.matrix = sparse.csr_matrix(
+                    (data["data"], data["indices"], data["indptr"]),
+                    shape=tuple(data["shape"]),
+                )
+        return features
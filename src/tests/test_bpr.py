@@ -0,0 +1,108 @@
+"""
+Tests for the BPR ranking model.
+"""
+
+import os
+
+import numpy as np
+from django.test import SimpleTestCase
+from src.bpr import BPR, _add_rows
+from src.evaluator import Evaluator
+from src.implicit import ImplicitFeedback
+from src.recommender import RecommenderSystem
+from src.retraining import split_holdout
+from src.tests.test_item_knn import sample_ratings
+from src.tests.test_sgd_svd import low_rank_ratings
+from src.tests.test_title_index import sample_movies
+
+
+def auc(model, ratings, seed=0):
+    """
+    Return how often a liked held-out movie outscores a random
+    movie for the same user.
+    """
+    rng = np.random.default_rng(seed)
+    users = ratings["userId"].to_numpy()
+    liked = model.predict(users, ratings["movieId"].to_numpy())
+    random = model.predict(users, rng.choice(model.item_ids, len(users)))
+    return float(np.mean(liked > random))
+
+
+class BPRTests(SimpleTestCase):
+    """
+    Test fitting, Hogwild training and the recommender methods.
+    """
+
+    def setUp(self):
+        ratings = low_rank_ratings(n_ratings=30_000)
+        train, test = split_holdout(ratings, 0.2)
+        self.feedback = ImplicitFeedback.from_ratings(train, threshold=4.0)
+        self.test = test[test["rating"] >= 4.0]
+
+    def fit(self, **kwargs):
+        return BPR(n_factors=16, n_epochs=30, **kwargs).fit(self.feedback)
+
+    def test_fit_ranks_liked_movies_first(self):
+        """
+        Test held-out liked movies outscore random ones, and a
+        seeded single-process fit is reproducible.
+        """
+
+        model = self.fit()
+        self.assertGreater(auc(model, self.test), 0.75)
+        self.assertEqual(model.global_mean, 0)
+        self.assertFalse(model.user_bias.any())
+        np.testing.assert_array_equal(
+            self.fit().item_factors, model.item_factors
+        )
+
+    def test_hogwild_matches_single_process(self):
+        """
+        Test two processes sharing the factors learn as well as
+        one and leave no shared memory segment behind.
+        """
+
+        epochs = []
+        model = self.fit(n_jobs=2)
+        BPR(n_factors=4, n_epochs=2, n_jobs=2).fit(
+            self.feedback, callback=epochs.append
+        )
+        self.assertEqual(epochs, [0, 1])
+        self.assertGreater(auc(model, self.test), 0.75)
+        if os.path.isdir("/dev/shm"):
+            self.assertFalse(
+                [n for n in os.listdir("/dev/shm") if "recsys-bpr" in n]
+            )
+
+    def test_add_rows_matches_add_at(self):
+        """
+        Test the flat scatter-add sums repeated rows like
+        np.add.at, and refuses targets it would copy.
+        """
+
+        rng = np.random.default_rng(0)
+        rows = rng.integers(0, 5, 50)
+        values = rng.normal(size=(50, 3))
+        target, expected = np.ones((5, 3)), np.ones((5, 3))
+        _add_rows(target, rows, values)
+        np.add.at(expected, rows, values)
+        np.testing.assert_allclose(target, expected)
+        with self.assertRaises(AttributeError):
+            _add_rows(np.ones((3, 5)).T, rows % 3, values)
+
+    def test_recommender_bpr(self):
+        """
+        Test RecommenderSystem trains BPR, returns unrated titles
+        and predictions the Evaluator can score.
+        """
+
+        recommender = RecommenderSystem(sample_movies(), sample_ratings())
+        model, predictions = recommender.bpr_filtering(
+            factors=4, epochs=5, test_size=0.2
+        )
+        self.assertEqual(len(predictions), 1)
+        precision = Evaluator().evaluate_precision_at_k(predictions, k=2)
+        self.assertTrue(0 <= precision <= 1)
+        titles = recommender.recommend_movies_bpr(5, model)
+        self.assertNotIn("Toy Story (1995)", list(titles))
+        self.assertGreater(len(titles), 0)
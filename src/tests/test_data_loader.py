@@ -0,0 +1,74 @@
+"""
+Tests for lazy loading of the MovieLens files.
+"""
+
+import os
+import tempfile
+
+from django.test import SimpleTestCase
+from src.data_loader import MovieLensDataLoader, MovieLensDataset
+from src.recommender import RecommenderSystem
+from src.synthetic import write_movielens
+
+
+class MovieLensDatasetTests(SimpleTestCase):
+    """
+    Test tables load on first access, projected and memoized.
+    """
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "")
+        write_movielens(
+            self.path, n_users=20, n_movies=30, n_ratings=200, seed=3
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def stages(self, dataset):
+        return [s["stage"] for s in dataset.report.stages]
+
+    def test_tables_load_on_first_access(self):
+        """
+        Test only accessed tables are read, and only once.
+        """
+        dataset = MovieLensDataLoader(path=self.path).dataset()
+        self.assertEqual(self.stages(dataset), [])
+        movies = dataset.movies
+        self.assertIs(dataset.movies, movies)
+        self.assertTrue(dataset.is_loaded("movies"))
+        self.assertFalse(dataset.is_loaded("ratings"))
+        self.assertEqual(self.stages(dataset), ["load.movies"])
+        self.assertEqual(movies["movieId"].dtype, "int32")
+        with self.assertRaises(AttributeError):
+            dataset.genres
+
+    def test_column_projection(self):
+        """
+        Test usecols limits the columns read, and projections of
+        a loaded table do not re-read the file.
+        """
+        dataset = MovieLensDataset(
+            self.path, usecols={"ratings": ["userId", "rating"]}
+        )
+        self.assertEqual(list(dataset.ratings.columns), ["userId", "rating"])
+        self.assertEqual(dataset.ratings["rating"].dtype, "float32")
+
+        dataset.load("movies")
+        titles = dataset.load("movies", usecols=["title"])
+        self.assertEqual(list(titles.columns), ["title"])
+        self.assertEqual(self.stages(dataset), ["load.ratings", "load.movies"])
+
+    def test_content_filtering_never_reads_ratings(self):
+        """
+        Test content-based filtering works without ratings.csv.
+        """
+        os.remove(f"{self.path}ratings.csv")
+        dataset = MovieLensDataset(self.path)
+        recommender = RecommenderSystem.from_dataset(dataset)
+        title = dataset.movies["title"].iloc[0]
+        self.assertEqual(len(recommender.content_based_filtering(title)), 10)
+        self.assertEqual(self.stages(dataset), ["load.movies"])
+        with self.assertRaises(FileNotFoundError):
+            recommender.ratings
@@ -0,0 +1,109 @@
+"""
+Tests for the FactorModel serving artifact.
+"""
+
+import os
+import tempfile
+
+import numpy as np
+from django.test import SimpleTestCase
+from src.factor_model import FactorModel
+
+
+def sample_factor_model(user_ids=(3, 1, 2)):
+    """
+    Create and return a two-factor model over three users and
+    four movies, with rows deliberately out of id order.
+    """
+
+    return FactorModel(
+        user_ids=np.array(user_ids),
+        item_ids=np.array([2571, 1, 3000, 2]),
+        user_factors=np.array([[0.0, 1.0], [1.0, 0.0], [0.5, 0.5]]),
+        item_factors=np.array(
+            [[0.0, 2.0], [2.0, 0.0], [0.0, 1.0], [1.0, 0.0]]
+        ),
+        item_bias=np.array([0.0, 0.0, 0.0, 0.5]),
+        global_mean=3.0,
+    )
+
+
+class FactorModelTests(SimpleTestCase):
+    """
+    Test scoring, exclusion and persistence.
+    """
+
+    def test_rows_sorted_by_id(self):
+        """
+        Test ids are sorted and factor rows follow them.
+        """
+        model = sample_factor_model()
+        self.assertEqual(model.user_ids.tolist(), [1, 2, 3])
+        self.assertEqual(model.item_ids.tolist(), [1, 2, 2571, 3000])
+        self.assertEqual(model.user_factors[0].tolist(), [1.0, 0.0])
+        self.assertEqual(model.item_factors.dtype, np.float32)
+
+    def test_recommend_ranks_and_excludes(self):
+        """
+        Test recommendations follow the dot product and skip
+        excluded movies.
+        """
+        model = sample_factor_model()
+        recommendations = model.recommend(1, top_n=2)
+        self.assertEqual([m for m, _ in recommendations], [1, 2])
+        self.assertAlmostEqual(recommendations[0][1], 5.0)
+
+        recommendations = model.recommend(1, exclude_movie_ids=[1, 99])
+        self.assertEqual([m for m, _ in recommendations], [2, 2571, 3000])
+
+    def test_unknown_user_gets_popularity_ranking(self):
+        """
+        Test unknown users are ranked by item bias alone.
+        """
+        model = sample_factor_model()
+        self.assertIsNone(model.user_index(42))
+        self.assertEqual(model.recommend(42, top_n=1)[0][0], 2)
+
+    def test_recommend_batch_matches_recommend(self):
+        """
+        Test batched scoring gives the per-user rankings,
+        including for unknown users.
+        """
+        model = sample_factor_model()
+        user_ids = [1, 2, 42]
+        excluded = [[1], [], [2, 3000]]
+        np.testing.assert_allclose(
+            model.score_batch(user_ids),
+            np.stack([model.score(user_id) for user_id in user_ids]),
+            rtol=1e-6,
+        )
+        batch = model.recommend_batch(user_ids, excluded, top_n=3)
+        for user_id, exclude, ranking in zip(user_ids, excluded, batch):
+            expected = model.recommend(user_id, exclude, top_n=3)
+            self.assertEqual([m for m, _ in ranking], [m for m, _ in expected])
+
+    def test_predict_matches_scores(self):
+        """
+        Test pairwise predictions match the score vectors, with
+        unknown ids falling back to the biases.
+        """
+        model = sample_factor_model()
+        predictions = model.predict([1, 3, 99, 1], [2571, 2, 2, 12345])
+        np.testing.assert_allclose(
+            predictions[:2],
+            [model.score(1)[model.items.index(2571)], model.score(3)[1]],
+            rtol=1e-6,
+        )
+        np.testing.assert_allclose(predictions[2:], [3.5, 3.0])
+
+    def test_save_and_load(self):
+        """
+        Test a saved model loads with identical scores.
+        """
+        model = sample_factor_model()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "factor_model.npz")
+            model.save(path)
+            loaded = FactorModel.load(path)
+        np.testing.assert_array_equal(loaded.score(2), model.score(2))
+        self.assertEqual(loaded.global_mean, 3.0)
@@ -0,0 +1,47 @@
+"""
+Tests for dense id remapping.
+"""
+
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase
+from src.id_map import MISSING, IdMap, build_id_maps
+from src.ratings_store import RatingsStore
+
+
+class IdMapTests(SimpleTestCase):
+    """
+    Test forward and reverse lookups and persistence.
+    """
+
+    def test_dense_indices(self):
+        """
+        Test sparse ids map to contiguous indices in id order.
+        """
+        ids = IdMap([2571, 1, 3000, 1, 2])
+        self.assertEqual(ids.ids.tolist(), [1, 2, 2571, 3000])
+        self.assertEqual(ids.index(2571), 2)
+        self.assertIsNone(ids.index(7))
+        indices = ids.indices([3000, 7, 1])
+        self.assertEqual(indices.dtype, np.int32)
+        self.assertEqual(indices.tolist(), [3, MISSING, 0])
+        self.assertEqual(
+            ids.raw(indices[indices != MISSING]).tolist(), [3000, 1]
+        )
+        self.assertIn(2, ids)
+        self.assertEqual(IdMap([]).indices([1]).tolist(), [MISSING])
+
+    def test_store_uses_dataset_id_maps(self):
+        """
+        Test a RatingsStore's maps are the dataset's id maps,
+        with items covering the catalogue.
+        """
+        movies = pd.DataFrame({"movieId": [1, 2, 2571]})
+        ratings = pd.DataFrame(
+            {"userId": [7, 3, 7], "movieId": [2, 2, 1], "rating": 4.0}
+        )
+        users, items = build_id_maps(ratings, movies)
+        store = RatingsStore.from_frame(ratings, movies)
+        self.assertEqual((store.users, store.items), (users, items))
+        self.assertEqual(users.ids.tolist(), [3, 7])
+        self.assertEqual(items.ids.tolist(), [1, 2, 2571])
@@ -0,0 +1,228 @@
+"""
+Tests for the implicit-feedback training data pipeline.
+"""
+
+import os
+import tempfile
+
+import numpy as np
+from django.test import SimpleTestCase
+from src.evaluator import Evaluator
+from src.id_map import MISSING
+from src.implicit import ImplicitFeedback, confidence
+from src.synthetic import generate_movielens
+from src.tests.test_item_knn import sample_ratings
+
+
+class ImplicitFeedbackTests(SimpleTestCase):
+    """
+    Test interactions, negative sampling and batches.
+    """
+
+    def setUp(self):
+        _, ratings, _, _ = generate_movielens(
+            n_users=40, n_movies=200, n_ratings=2_000, seed=7
+        )
+        self.ratings = ratings
+        self.feedback = ImplicitFeedback.from_ratings(ratings)
+
+    def test_from_ratings(self):
+        """
+        Test rows hold each user's items sorted, with the
+        threshold dropping low ratings and confidence from values.
+        """
+
+        feedback = ImplicitFeedback.from_ratings(
+            sample_ratings(), threshold=4.0, alpha=2.0
+        )
+        self.assertEqual(len(feedback), 7)
+        row = slice(*feedback.indptr[0:2])
+        self.assertEqual(
+            feedback.items.raw(feedback.indices[row]).tolist(), [1, 2]
+        )
+        self.assertEqual(feedback.confidence[row].tolist(), [11.0, 9.0])
+        # User 4 rated below the threshold only
+        user = feedback.users.index(4)
+        self.assertEqual(feedback.indptr[user], feedback.indptr[user + 1])
+
+        for row in range(self.feedback.n_users):
+            begin, end = self.feedback.indptr[[row, row + 1]]
+            indices = self.feedback.indices[begin:end]
+            self.assertTrue(np.all(indices[1:] > indices[:-1]))
+
+    def test_confidence_schemes(self):
+        """
+        Test the linear and log confidence weights.
+        """
+
+        np.testing.assert_allclose(confidence([0, 4], 2.0), [1, 9])
+        np.testing.assert_allclose(
+            confidence([0, np.e - 1], 3.0, "log"), [1, 4], rtol=1e-6
+        )
+        with self.assertRaises(ValueError):
+            confidence([1], scheme="square")
+
+    def test_contains_matches_the_rows(self):
+        """
+        Test membership checks against a set of the pairs.
+        """
+
+        feedback = self.feedback
+        pairs = set(
+            zip(
+                feedback.user_of(np.arange(len(feedback))).tolist(),
+                feedback.indices.tolist(),
+            )
+        )
+        rng = np.random.default_rng(0)
+        rows = rng.integers(0, feedback.n_users, 5_000)
+        columns = rng.integers(0, feedback.n_items, 5_000)
+        expected = [pair in pairs for pair in zip(rows, columns)]
+        self.assertEqual(feedback.contains(rows, columns).tolist(), expected)
+        self.assertTrue(
+            feedback.contains(
+                feedback.user_of(np.arange(len(feedback))), feedback.indices
+            ).all()
+        )
+
+    def test_negatives_are_not_interactions(self):
+        """
+        Test both samplers only return items outside the row,
+        and users who interacted with every item get MISSING.
+        """
+
+        rows = np.repeat(np.arange(self.feedback.n_users), 50)
+        for sampler in ("uniform", "popularity"):
+            negatives = self.feedback.sample_negatives(
+                rows, sampler, np.random.default_rng(1)
+            )
+            self.assertFalse(self.feedback.contains(rows, negatives).any())
+        with self.assertRaises(ValueError):
+            self.feedback.sample_negatives(rows, "hard")
+
+        feedback = ImplicitFeedback.from_ratings(
+            sample_ratings()[lambda df: df["userId"].isin([1, 2])]
+        )
+        self.assertEqual(
+            feedback.sample_negatives(np.array([0, 1]), rounds=5).tolist(),
+            [MISSING, MISSING],
+        )
+
+    def test_popularity_sampler_favours_popular_items(self):
+        """
+        Test popularity sampling follows item counts.
+        """
+
+        feedback = self.feedback
+        user = int(np.argmin(np.diff(feedback.indptr)))
+        negatives = feedback.sample_negatives(
+            np.full(20_000, user), "popularity", np.random.default_rng(2)
+        )
+        drawn = np.bincount(negatives, minlength=feedback.n_items)
+        counts = feedback.item_counts
+        # Items in the user's row are never drawn
+        unrated = ~feedback.contains(
+            np.full(feedback.n_items, user), np.arange(feedback.n_items)
+        )
+        popular = unrated & (counts >= np.quantile(counts, 0.9))
+        rare = unrated & (counts <= np.quantile(counts, 0.1))
+        self.assertGreater(drawn[popular].mean(), 3 * drawn[rare].mean())
+
+    def test_triples_cover_every_interaction(self):
+        """
+        Test one pass yields every positive once, with seeded
+        negatives.
+        """
+
+        batches = list(self.feedback.triples(batch_size=300, seed=3))
+        users = np.concatenate([b[0] for b in batches])
+        positives = np.concatenate([b[1] for b in batches])
+        negatives = np.concatenate([b[2] for b in batches])
+        self.assertEqual(len(batches), 7)
+        self.assertEqual(users.dtype, np.int32)
+        keys = np.sort(users.astype(np.int64) * 1000 + positives)
+        expected = (
+            self.feedback.user_of(np.arange(len(self.feedback))).astype(
+                np.int64
+            )
+            * 1000
+            + self.feedback.indices
+        )
+        np.testing.assert_array_equal(keys, np.sort(expected))
+        self.assertFalse(self.feedback.contains(users, negatives).any())
+
+        again = next(self.feedback.triples(batch_size=300, seed=3))
+        np.testing.assert_array_equal(again[2], batches[0][2])
+
+        users, positives, negatives = next(
+            self.feedback.triples(batch_size=100, n_negatives=4)
+        )
+        self.assertEqual(negatives.shape, (100, 4))
+
+    def test_pointwise_batches(self):
+        """
+        Test positives carry their confidence and negatives
+        weight 1 and label 0.
+        """
+
+        users, items, labels, weights = next(
+            self.feedback.pointwise(
+                batch_size=10, n_negatives=2, shuffle=False
+            )
+        )
+        self.assertEqual(len(users), 30)
+        self.assertEqual(labels.tolist(), [1.0, 0.0, 0.0] * 10)
+        np.testing.assert_array_equal(items[::3], self.feedback.indices[:10])
+        np.testing.assert_array_equal(
+            weights[::3], self.feedback.confidence[:10]
+        )
+        self.assertTrue((weights[labels == 0] == 1).all())
+        self.assertFalse(
+            self.feedback.contains(
+                users[labels == 0], items[labels == 0]
+            ).any()
+        )
+
+    def test_to_csr_and_save(self):
+        """
+        Test the confidence matrix and a save/load round trip.
+        """
+
+        matrix = self.feedback.to_csr()
+        self.assertEqual(matrix.nnz, len(self.feedback))
+        self.assertAlmostEqual(
+            matrix.sum(), self.feedback.confidence.sum(), places=2
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "implicit.npz")
+            self.feedback.save(path)
+            loaded = ImplicitFeedback.load(path)
+        self.assertEqual(loaded.users, self.feedback.users)
+        for name in ImplicitFeedback.ARRAYS:
+            np.testing.assert_array_equal(
+                getattr(loaded, name), getattr(self.feedback, name)
+            )
+
+
+class PrecisionThresholdTests(SimpleTestCase):
+    """
+    Test the relevance threshold of Precision@K.
+    """
+
+    def test_threshold(self):
+        """
+        Test items count as relevant at or above the threshold.
+        """
+
+        predictions = [
+            (1, 10, 4.0, 4.5, {}),
+            (1, 11, 3.5, 4.0, {}),
+        ]
+        evaluator = Evaluator()
+        self.assertEqual(
+            evaluator.evaluate_precision_at_k(predictions, 2), 0.5
+        )
+        self.assertEqual(
+            evaluator.evaluate_precision_at_k(predictions, 2, threshold=3.5),
+            1.0,
+        )
@@ -0,0 +1,84 @@
+"""
+Tests for the item-item collaborative filtering model.
+"""
+
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase
+from src.item_knn import ItemKNN
+from src.recommender import RecommenderSystem
+from src.tests.test_title_index import sample_movies
+
+
+def sample_ratings():
+    """
+    Create and return a small ratings DataFrame where
+    movies 1 and 2 are co-rated and 2571 and 3000 are co-rated.
+    """
+
+    return pd.DataFrame(
+        {
+            "userId": [1, 1, 2, 2, 3, 3, 4, 4, 5],
+            "movieId": [1, 2, 1, 2, 2571, 3000, 2571, 3000, 1],
+            "rating": [5.0, 4.0, 4.0, 5.0, 5.0, 4.5, 3.0, 3.5, 4.0],
+        }
+    )
+
+
+class ItemKNNTests(SimpleTestCase):
+    """
+    Test neighbour tables and scoring.
+    """
+
+    def test_neighbour_tables(self):
+        """
+        Test the nearest neighbour of each movie is its co-rated pair.
+        """
+
+        model = ItemKNN(k=2, n_jobs=1, block_size=3).fit(sample_ratings())
+        self.assertEqual(model.neighbours.dtype, np.int32)
+        self.assertEqual(model.similarities.dtype, np.float32)
+        self.assertEqual(model.neighbours.shape, (4, 2))
+        nearest = model.item_ids[model.neighbours[:, 0]]
+        np.testing.assert_array_equal(nearest, [2, 1, 3000, 2571])
+        # Unrelated movies have no similarity and an empty slot
+        self.assertEqual(model.neighbours[0, 1], -1)
+
+    def test_process_pool_matches_serial(self):
+        """
+        Test the process pool computes the same tables.
+        """
+
+        serial = ItemKNN(k=2, n_jobs=1, block_size=1).fit(sample_ratings())
+        pooled = ItemKNN(k=2, n_jobs=2, block_size=1).fit(sample_ratings())
+        np.testing.assert_array_equal(serial.neighbours, pooled.neighbours)
+        np.testing.assert_allclose(serial.similarities, pooled.similarities)
+
+    def test_recommend_and_round_trip(self):
+        """
+        Test recommendations exclude rated movies and survive save/load.
+        """
+
+        model = ItemKNN(k=2, n_jobs=1).fit(sample_ratings())
+        self.assertEqual([m for m, _ in model.recommend(5)], [2])
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "knn.npz")
+            model.save(path)
+            loaded = ItemKNN.load(path)
+        recs = loaded.recommend_from_history([2571], [5.0])
+        self.assertEqual([m for m, _ in recs], [3000])
+        self.assertEqual(loaded.recommend(5), model.recommend(5))
+        self.assertEqual(loaded.recommend(999), [])
+
+    def test_recommender_item_based(self):
+        """
+        Test RecommenderSystem returns titles from the item model.
+        """
+
+        recommender = RecommenderSystem(sample_movies(), sample_ratings())
+        model = recommender.item_based_filtering(k=2, n_jobs=1)
+        titles = recommender.recommend_movies_item_based(5, model)
+        self.assertEqual(list(titles), ["Jumanji (1995)"])
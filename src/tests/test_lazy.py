@@ -0,0 +1,64 @@
+"""
+Tests for the lazy import facade.
+"""
+
+import subprocess
+import sys
+
+from django.test import SimpleTestCase
+from src.lazy import LazyModule
+
+
+class LazyModuleTests(SimpleTestCase):
+    """
+    Test modules import on first use only.
+    """
+
+    def test_imports_on_first_attribute_access(self):
+        """
+        Test the module is imported when an attribute is used.
+        """
+        module = LazyModule("json")
+        self.assertFalse(module.loaded)
+        self.assertEqual(module.dumps([1]), "[1]")
+        self.assertTrue(module.loaded)
+        self.assertIn("loaded", repr(module))
+
+    def test_src_modules_defer_ml_stack(self):
+        """
+        Test importing the recommender does not import
+        scikit-learn, SciPy or Surprise.
+        """
+        code = (
+            "import sys, src.recommender, src.evaluator, src.tag_features; "
+            "print(sorted({'sklearn', 'scipy', 'surprise'} & "
+            "set(sys.modules)))"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        self.assertEqual(output.strip(), "[]")
+
+    def test_commands_defer_surprise(self):
+        """
+        Test importing the recommender commands, and so
+        load_ratings, does not import Surprise.
+        """
+        code = (
+            "import sys, django; django.setup(); "
+            "import core.management.commands.train_recommender, "
+            "core.management.commands.evaluate_recommender, "
+            "core.management.commands.retrain_recommender, "
+            "core.management.commands.precompute_recommendations; "
+            "print('surprise' in sys.modules)"
+        )
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        self.assertEqual(output.strip(), "False")
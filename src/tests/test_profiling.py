@@ -0,0 +1,87 @@
+"""
+Tests for the profiling instrumentation.
+"""
+
+import json
+import os
+import tempfile
+
+from django.test import SimpleTestCase
+from src.profiling import RunReport, compare_reports
+
+
+class RunReportTests(SimpleTestCase):
+    """
+    Test stage timing and JSON reports.
+    """
+
+    def test_stage_records_timing_and_throughput(self):
+        """
+        Test a stage records wall time, memory and throughput.
+        """
+
+        report = RunReport("test")
+        with report.stage("load") as info:
+            info["items"] = 1000
+        stage = report.stages[0]
+        self.assertEqual(stage["stage"], "load")
+        self.assertEqual(stage["items"], 1000)
+        self.assertGreaterEqual(stage["wall_seconds"], 0)
+        self.assertIsNotNone(stage["items_per_second"])
+        self.assertIsNone(stage["profile"])
+
+    def test_timed_decorator_and_cprofile_capture(self):
+        """
+        Test the decorator records a stage and writes a profile.
+        """
+
+        with tempfile.TemporaryDirectory() as tmp:
+            report = RunReport("test", profile="cprofile", profile_dir=tmp)
+
+            @report.timed("work")
+            def work():
+                return sum(range(100))
+
+            self.assertEqual(work(), 4950)
+            self.assertTrue(os.path.exists(report.stages[0]["profile"]))
+
+            path = report.save(os.path.join(tmp, "report.json"))
+            with open(path) as f:
+                saved = json.load(f)
+        self.assertEqual(saved["stages"][0]["stage"], "work")
+        self.assertIn("python", saved["environment"])
+
+    def test_cprofile_profiles_only_the_outer_stage(self):
+        """
+        Test a nested stage does not start a second profiler.
+        """
+
+        with tempfile.TemporaryDirectory() as tmp:
+            report = RunReport("test", profile="cprofile", profile_dir=tmp)
+            with report.stage("outer"):
+                with report.stage("inner"):
+                    sum(range(100))
+            stages = {s["stage"]: s for s in report.stages}
+            self.assertIsNone(stages["inner"]["profile"])
+            self.assertTrue(os.path.exists(stages["outer"]["profile"]))
+            self.assertEqual(os.listdir(tmp), ["test.outer.prof"])
+
+        total = report.to_dict()["total_wall_seconds"]
+        self.assertEqual([s["depth"] for s in report.stages], [1, 0])
+        self.assertEqual(total, stages["outer"]["wall_seconds"])
+
+    def test_compare_reports(self):
+        """
+        Test comparing two reports stage by stage.
+        """
+
+        old = {"stages": [{"stage": "fit", "wall_seconds": 2.0}]}
+        new = {
+            "stages": [
+                {"stage": "fit", "wall_seconds": 1.0},
+                {"stage": "predict", "wall_seconds": 0.5},
+            ]
+        }
+        rows = compare_reports(old, new)
+        self.assertEqual(rows[0], ("fit", 2.0, 1.0, 0.5))
+        self.assertEqual(rows[1], ("predict", None, 0.5, None))
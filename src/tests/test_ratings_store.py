@@ -0,0 +1,70 @@
+"""
+Tests for the columnar ratings store.
+"""
+
+import os
+import tempfile
+
+import numpy as np
+from django.test import SimpleTestCase
+from src.ratings_store import RatingsStore
+from src.recommender import RecommenderSystem
+from src.tests.test_item_knn import sample_ratings
+from src.tests.test_title_index import sample_movies
+
+
+class RatingsStoreTests(SimpleTestCase):
+    """
+    Test per-user and per-item slices against the DataFrame.
+    """
+
+    def setUp(self):
+        self.ratings = sample_ratings()
+        self.store = RatingsStore.from_frame(self.ratings)
+
+    def test_user_and_item_histories(self):
+        """
+        Test slices hold the same rows as DataFrame filters.
+        """
+        for user_id, rows in self.ratings.groupby("userId"):
+            movie_ids, ratings = self.store.user_history(user_id)
+            self.assertEqual(movie_ids.tolist(), rows["movieId"].tolist())
+            self.assertEqual(ratings.tolist(), rows["rating"].tolist())
+        for movie_id, rows in self.ratings.groupby("movieId"):
+            user_ids, ratings = self.store.item_history(movie_id)
+            self.assertEqual(user_ids.tolist(), rows["userId"].tolist())
+            self.assertEqual(ratings.tolist(), rows["rating"].tolist())
+        self.assertEqual(len(self.store.rated_movie_ids(42)), 0)
+        self.assertEqual(len(self.store.item_history(42)[0]), 0)
+
+    def test_compact_dtypes(self):
+        """
+        Test the arrays use int32/float32/uint32 columns.
+        """
+        self.assertEqual(self.store.item_indices.dtype, np.int32)
+        self.assertEqual(self.store.ratings.dtype, np.float32)
+        self.assertEqual(self.store.timestamps.dtype, np.uint32)
+        self.assertEqual(self.store.user_indices.dtype, np.int32)
+
+    def test_csr_and_persistence(self):
+        """
+        Test the CSR view and a save/load round trip.
+        """
+        matrix = self.store.to_csr()
+        self.assertEqual(matrix.shape, (5, 4))
+        self.assertEqual(matrix.sum(), self.ratings["rating"].sum())
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "ratings.npz")
+            self.store.save(path)
+            loaded = RatingsStore.load(path)
+        self.assertEqual(loaded.users, self.store.users)
+        self.assertEqual(loaded.user_history(3)[0].tolist(), [2571, 3000])
+
+    def test_recommend_movies_skips_rated(self):
+        """
+        Test SVD recommendations exclude movies the user rated.
+        """
+        recommender = RecommenderSystem(sample_movies(), self.ratings)
+        svd, _ = recommender.collaborative_filtering()
+        ranked = recommender._rank_with_svd(1, svd, top_n=10)
+        self.assertEqual(sorted(ranked), [2571, 3000])
@@ -0,0 +1,205 @@
+"""
+Tests for the NumPy SGD SVD and the retraining pipeline.
+"""
+
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase
+from src.retraining import (
+    publish,
+    read_metadata,
+    retrain,
+    rmse,
+    split_holdout,
+)
+from src.sgd_svd import SGDSVD
+
+
+def low_rank_ratings(n_users=300, n_movies=150, n_ratings=20_000, seed=0):
+    """
+    Return ratings generated from two-factor user and movie
+    vectors plus noise, so a factor model can learn them.
+    """
+    rng = np.random.default_rng(seed)
+    users = rng.normal(0, 0.7, (n_users, 2))
+    movies = rng.normal(0, 0.7, (n_movies, 2))
+    keys = np.unique(
+        rng.integers(0, n_users, n_ratings) * n_movies
+        + rng.integers(0, n_movies, n_ratings)
+    )
+    rows, columns = keys // n_movies, keys % n_movies
+    values = 3.5 + np.einsum("ij,ij->i", users[rows], movies[columns])
+    return pd.DataFrame(
+        {
+            "userId": rows + 1,
+            "movieId": columns * 10 + 1,
+            "rating": np.clip(values + rng.normal(0, 0.2, len(keys)), 1, 5),
+        }
+    )
+
+
+class SGDSVDTests(SimpleTestCase):
+    """
+    Test fitting and warm-starting.
+    """
+
+    def setUp(self):
+        self.train, self.test = split_holdout(low_rank_ratings(), 0.2)
+
+    def fit(self, frame, **kwargs):
+        init = kwargs.pop("init", None)
+        svd = SGDSVD(n_factors=4, lr=0.02, seed=0, **kwargs)
+        return svd.fit(
+            frame["userId"], frame["movieId"], frame["rating"], init=init
+        )
+
+    def test_fit_beats_the_mean(self):
+        """
+        Test the fitted model predicts held-out ratings better
+        than the global mean.
+        """
+        model = self.fit(self.train, n_epochs=20)
+        baseline = np.sqrt(
+            np.mean((self.test["rating"] - self.train["rating"].mean()) ** 2)
+        )
+        self.assertLess(rmse(model, self.test), 0.8 * baseline)
+
+    def test_warm_start_keeps_and_extends_the_model(self):
+        """
+        Test zero warm epochs reproduce the initial model and new
+        ids get rows.
+        """
+        model = self.fit(self.train, n_epochs=5)
+        new = pd.DataFrame({"userId": [9999], "movieId": [1], "rating": [4]})
+        warm = self.fit(new, n_epochs=0, init=model)
+
+        self.assertEqual(len(warm.user_ids), len(model.user_ids) + 1)
+        np.testing.assert_allclose(
+            warm.predict(self.test["userId"], self.test["movieId"]),
+            model.predict(self.test["userId"], self.test["movieId"]),
+            rtol=1e-5,
+        )
+
+    def test_warm_start_needs_matching_factors(self):
+        """
+        Test warm-starting from a model of another size fails.
+        """
+        model = self.fit(self.train, n_epochs=1)
+        with self.assertRaises(ValueError):
+            SGDSVD(n_factors=8).fit([1], [1], [4.0], init=model)
+
+
+class RetrainTests(SimpleTestCase):
+    """
+    Test warm retraining, validation and publishing.
+    """
+
+    def setUp(self):
+        ratings = low_rank_ratings()
+        split = len(ratings) * 3 // 4
+        self.old = ratings.iloc[:split]
+        self.delta = ratings.iloc[split:]
+        self.snapshot = ratings
+
+    def test_warm_retrain_is_validated_against_the_previous_model(self):
+        """
+        Test warm retraining improves on the new ratings and is
+        promoted.
+        """
+        previous = retrain(self.old, factors=4, epochs=20, lr=0.02)["model"]
+        result = retrain(
+            self.snapshot,
+            previous=previous,
+            delta=self.delta,
+            factors=4,
+            warm_epochs=3,
+            lr=0.02,
+        )
+        self.assertEqual(result["mode"], "warm")
+        self.assertLess(result["trained"], len(self.snapshot))
+        self.assertLess(result["rmse"], result["previous_rmse"])
+        self.assertTrue(result["promote"])
+
+        worse = retrain(
+            self.snapshot,
+            previous=previous,
+            delta=self.delta,
+            factors=4,
+            warm_epochs=0,
+            tolerance=-1,
+        )
+        self.assertFalse(worse["promote"])
+
+    def test_cold_retrain_must_beat_the_published_model(self):
+        """
+        Test a from-scratch model is compared against the
+        previous one and, with refit, refitted with the holdout
+        when promoted.
+        """
+        previous = retrain(self.snapshot, factors=4, epochs=20, lr=0.02)
+        previous = previous["model"]
+        worse = retrain(
+            self.snapshot,
+            previous=previous,
+            delta=self.delta,
+            factors=4,
+            epochs=0,
+            cold=True,
+        )
+        self.assertEqual(worse["mode"], "cold")
+        self.assertGreater(worse["rmse"], worse["previous_rmse"])
+        self.assertFalse(worse["promote"])
+        held_out = int(len(self.delta) * 0.1)
+        self.assertEqual(worse["trained"], len(self.snapshot) - held_out)
+
+        forced = retrain(
+            self.snapshot,
+            previous=previous,
+            delta=self.delta,
+            factors=4,
+            epochs=0,
+            tolerance=float("inf"),
+            cold=True,
+        )
+        self.assertTrue(forced["promote"])
+        self.assertFalse(forced["refit"])
+        self.assertEqual(forced["trained"], len(self.snapshot) - held_out)
+
+        refitted = retrain(
+            self.snapshot,
+            previous=previous,
+            delta=self.delta,
+            factors=4,
+            epochs=0,
+            tolerance=float("inf"),
+            cold=True,
+            refit=True,
+        )
+        self.assertTrue(refitted["refit"])
+        self.assertEqual(refitted["trained"], len(self.snapshot))
+
+    def test_publish_versions(self):
+        """
+        Test publishing swaps the model in and archives versions.
+        """
+        model = retrain(self.old, factors=4, epochs=1)["model"]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "factor_model.npz")
+            self.assertEqual(read_metadata(path), {})
+            versions = [
+                publish(model, path, {"rmse": 1.0}, keep=2)["version"]
+                for _ in range(3)
+            ]
+            metadata = read_metadata(path)
+            archived = sorted(os.listdir(os.path.join(tmp, "versions")))
+            self.assertTrue(os.path.exists(path))
+
+        self.assertEqual(metadata["version"], versions[-1])
+        self.assertEqual(metadata["rmse"], 1.0)
+        self.assertEqual(
+            archived,
+            [f"{v}.{ext}" for v in versions[1:] for ext in ("json", "npz")],
+        )
@@ -0,0 +1,144 @@
+"""
+Tests for shared memory model segments.
+"""
+
+import os
+import tempfile
+import threading
+import uuid
+from multiprocessing import shared_memory
+
+import numpy as np
+from django.test import SimpleTestCase
+from src.factor_model import FactorModel
+from src.shared_arrays import (
+    HEADER,
+    READY,
+    attach,
+    attach_or_publish,
+    process_memory,
+    publish,
+    segment_name,
+)
+from src.tests.test_factor_model import sample_factor_model
+
+
+class SharedArraysTests(SimpleTestCase):
+    """
+    Test publishing, attaching and shared model loading.
+    """
+
+    def setUp(self):
+        self.name = f"test-{uuid.uuid4().hex[:12]}"
+        self.segments = []
+
+    def tearDown(self):
+        for segment in self.segments:
+            segment.close()
+        self.segments[0].unlink()
+
+    def test_publish_and_attach(self):
+        """
+        Test attached views equal the published arrays and
+        are read-only.
+        """
+        arrays = {
+            "ids": np.arange(5, dtype=np.int32),
+            "factors": np.ones((5, 3), dtype=np.float32),
+            "mean": np.array(3.5),
+        }
+        segment, _ = publish(self.name, arrays)
+        attached, views = attach(self.name)
+        self.segments += [segment, attached]
+
+        for key, array in arrays.items():
+            np.testing.assert_array_equal(views[key], array)
+            self.assertEqual(views[key].dtype, array.dtype)
+        self.assertFalse(views["factors"].flags.writeable)
+        with self.assertRaises(FileExistsError):
+            publish(self.name, arrays)
+        del views
+
+    def test_writable_views_share_updates(self):
+        """
+        Test writes through a writable attached view are seen by
+        the publisher's views.
+        """
+        segment, published = publish(
+            self.name, {"factors": np.zeros((4, 2))}, writable=True
+        )
+        attached, views = attach(self.name, writable=True)
+        self.segments += [segment, attached]
+
+        views["factors"][1] += 2.5
+        self.assertTrue(published["factors"].flags.writeable)
+        self.assertEqual(published["factors"][1].tolist(), [2.5, 2.5])
+        del views, published
+
+    def test_attach_waits_until_ready(self):
+        """
+        Test a segment still being filled is not mapped before
+        its ready flag is set.
+        """
+        segment = shared_memory.SharedMemory(
+            name=self.name, create=True, size=64
+        )
+        self.segments.append(segment)
+        with self.assertRaises(TimeoutError):
+            attach(self.name, timeout=0.05)
+
+        manifest = b"{}"
+        begin, end = HEADER.size, HEADER.size + len(manifest)
+        segment.buf[begin:end] = manifest
+        timer = threading.Timer(
+            0.05, HEADER.pack_into, (segment.buf, 0, READY, len(manifest))
+        )
+        timer.start()
+        attached, views = attach(self.name, timeout=5)
+        timer.join()
+        self.segments.append(attached)
+        self.assertEqual(views, {})
+
+    def test_attach_or_publish_builds_once(self):
+        """
+        Test only the first caller builds the arrays.
+        """
+        calls = []
+
+        def build():
+            calls.append(1)
+            return {"x": np.arange(3)}
+
+        first = attach_or_publish(self.name, build)
+        second = attach_or_publish(self.name, build)
+        self.segments += [first[0], second[0]]
+        self.assertEqual((first[2], second[2]), (True, False))
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(second[1]["x"].tolist(), [0, 1, 2])
+
+    def test_load_shared_model(self):
+        """
+        Test a shared model scores like the file it came from,
+        without copying the segment's arrays.
+        """
+        model = sample_factor_model()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "factor_model.npz")
+            model.save(path)
+            shared, segment = FactorModel.load_shared(path)
+            self.segments.append(segment)
+            self.assertTrue(segment.name.endswith(segment_name(path)))
+        self.assertFalse(shared.item_factors.flags.owndata)
+        self.assertEqual(shared.recommend(1), model.recommend(1))
+        self.assertEqual(shared.nbytes, model.nbytes)
+        del shared
+
+    def test_process_memory(self):
+        """
+        Test the memory split is reported on Linux.
+        """
+        self.segments.append(publish(self.name, {"x": np.arange(1)})[0])
+        stats = process_memory()
+        if stats:
+            self.assertGreater(stats["rss"], 0)
+            self.assertEqual(stats["rss"], stats["shared"] + stats["private"])
@@ -0,0 +1,143 @@
+"""
+Tests for the synthetic MovieLens generator.
+"""
+
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase
+from src.data_loader import MovieLensDataLoader
+from src.ratings_store import RatingsStore
+from src.synthetic import (
+    FIRST_TIMESTAMP,
+    GENRES,
+    LAST_TIMESTAMP,
+    generate_movielens,
+    write_movielens,
+)
+
+
+class SyntheticDataTests(SimpleTestCase):
+    """
+    Test generating MovieLens-shaped data.
+    """
+
+    def test_generate_is_seeded_and_consistent(self):
+        """
+        Test the same seed gives the same data and that
+        ratings reference known movies without duplicates.
+        """
+
+        movies, ratings, tags, links = generate_movielens(
+            n_users=50, n_movies=100, n_ratings=2000, seed=1
+        )
+        again = generate_movielens(
+            n_users=50, n_movies=100, n_ratings=2000, seed=1
+        )[1]
+        pd.testing.assert_frame_equal(ratings, again)
+        self.assertTrue(ratings["movieId"].isin(movies["movieId"]).all())
+        self.assertFalse(ratings.duplicated(["userId", "movieId"]).any())
+        self.assertTrue(ratings["rating"].between(0.5, 5.0).all())
+        self.assertEqual(len(links), len(movies))
+        self.assertTrue(tags["movieId"].isin(movies["movieId"]).all())
+
+    def test_ratings_are_exact_and_sorted(self):
+        """
+        Test exactly n_ratings distinct pairs are generated, sorted
+        like ratings.csv, even when duplicates must be redrawn.
+        """
+
+        _, ratings, _, _ = generate_movielens(
+            n_users=30, n_movies=50, n_ratings=600, seed=3
+        )
+        self.assertEqual(len(ratings), 600)
+        self.assertFalse(ratings.duplicated(["userId", "movieId"]).any())
+        pd.testing.assert_frame_equal(
+            ratings,
+            ratings.sort_values(["userId", "movieId"]).reset_index(drop=True),
+        )
+        # 20 ratings per user is both the floor and the cap here
+        counts = ratings.groupby("userId").size()
+        self.assertEqual(len(counts), 30)
+        self.assertTrue(counts.between(20, 20).all())
+
+    def test_distributions(self):
+        """
+        Test activity is skewed, genres are valid mixes and
+        ratings fall in the dataset span after each release.
+        """
+
+        movies, ratings, _, _ = generate_movielens(
+            n_users=200, n_movies=2000, n_ratings=20_000, seed=4
+        )
+        users = ratings.groupby("userId").size()
+        self.assertGreaterEqual(users.min(), 20)
+        self.assertLessEqual(users.max(), 800)
+        self.assertGreater(users.max(), 3 * users.median())
+        popularity = ratings.groupby("movieId").size()
+        self.assertGreater(popularity.max(), 10 * popularity.median())
+
+        genres = movies["genres"].str.split("|").explode()
+        self.assertTrue(genres.isin([*GENRES, "(no genres listed)"]).all())
+        self.assertGreater(
+            movies["genres"].str.contains("|", regex=False).mean(), 0.2
+        )
+
+        self.assertTrue(
+            ratings["timestamp"].between(FIRST_TIMESTAMP, LAST_TIMESTAMP).all()
+        )
+        years = movies.set_index("movieId")["title"].str[-5:-1].astype(int)
+        released = pd.to_datetime(
+            years.loc[ratings["movieId"]].to_numpy().astype(str)
+        )
+        self.assertTrue(
+            (pd.to_datetime(ratings["timestamp"], unit="s") >= released).all()
+        )
+        self.assertTrue(np.isin(ratings["rating"], np.arange(1, 11) / 2).all())
+
+    def test_sizes_must_fit(self):
+        """
+        Test asking for more ratings than users can give raises.
+        """
+
+        with self.assertRaises(ValueError):
+            generate_movielens(n_users=2, n_movies=10, n_ratings=21)
+
+    def test_write_columnar(self):
+        """
+        Test columnar output is the RatingsStore of the ratings.
+        """
+
+        sizes = {"n_users": 20, "n_movies": 40, "n_ratings": 300, "seed": 5}
+        movies, ratings, _, _ = generate_movielens(**sizes)
+        with tempfile.TemporaryDirectory() as tmp:
+            write_movielens(tmp, columnar=True, **sizes)
+            self.assertFalse(os.path.exists(os.path.join(tmp, "ratings.csv")))
+            self.assertTrue(os.path.exists(os.path.join(tmp, "movies.csv")))
+            store = RatingsStore.load(os.path.join(tmp, "ratings.npz"))
+        expected = RatingsStore.from_frame(ratings, movies)
+        self.assertEqual(store.users, expected.users)
+        self.assertEqual(store.items, expected.items)
+        for name in RatingsStore.ARRAYS:
+            np.testing.assert_array_equal(
+                getattr(store, name), getattr(expected, name)
+            )
+
+    def test_written_files_load(self):
+        """
+        Test the written CSVs load with MovieLensDataLoader.
+        """
+
+        with tempfile.TemporaryDirectory() as tmp:
+            write_movielens(
+                tmp, n_users=20, n_movies=30, n_ratings=200, seed=2
+            )
+            loader = MovieLensDataLoader(path=os.path.join(tmp, ""))
+            movies, ratings, tags, links = loader.load_data()
+        self.assertEqual(len(movies), 30)
+        self.assertEqual(
+            [s["stage"] for s in loader.report.stages],
+            ["load.movies", "load.ratings", "load.tags", "load.links"],
+        )
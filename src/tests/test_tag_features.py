@@ -0,0 +1,99 @@
+"""
+Tests for the tag feature pipeline.
+"""
+
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase
+from scipy import sparse
+from src.recommender import RecommenderSystem
+from src.tag_features import TagFeatures
+from src.tests.test_title_index import sample_movies
+
+
+def sample_tags():
+    """
+    Create and return a small tags DataFrame.
+    """
+
+    return pd.DataFrame(
+        {
+            "userId": [1, 2, 3, 1, 2, 3, 4],
+            "movieId": [1, 1, 2, 2571, 3000, 3000, 9999],
+            "tag": [
+                "pixar",
+                "Pixar ",
+                "board game",
+                "cyberpunk",
+                "board game",
+                "remake",
+                "orphan",
+            ],
+        }
+    )
+
+
+class TagFeaturesTests(SimpleTestCase):
+    """
+    Test building, persisting and using tag features.
+    """
+
+    def test_fit_tfidf_aligned_to_movies(self):
+        """
+        Test tags are normalized, filtered by min_df and
+        aligned to the movies rows.
+        """
+
+        features = TagFeatures(min_df=1).fit(sample_tags(), sample_movies())
+        self.assertTrue(sparse.issparse(features.matrix))
+        self.assertEqual(features.matrix.shape[0], 4)
+        self.assertIn("pixar", features.vocabulary)
+        self.assertNotIn("orphan", features.vocabulary)
+        scores = features.similarity(1)
+        # Jumanji (1995) and Jumanji (2017) share "board game"
+        self.assertGreater(scores[3], 0)
+        self.assertEqual(scores[2], 0)
+
+    def test_bm25_with_svd_round_trip(self):
+        """
+        Test dense SVD embeddings persist and reload.
+        """
+
+        features = TagFeatures(weighting="bm25", n_components=2, min_df=1).fit(
+            sample_tags(), sample_movies()
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "tags.npz")
+            features.save(path)
+            loaded = TagFeatures.load(path)
+        self.assertEqual(loaded.weighting, "bm25")
+        np.testing.assert_allclose(loaded.matrix, features.matrix)
+        np.testing.assert_array_equal(loaded.movie_ids, features.movie_ids)
+
+    def test_svd_skipped_for_single_term_vocabulary(self):
+        """
+        Test a vocabulary too small to reduce stays sparse.
+        """
+
+        features = TagFeatures(n_components=2, min_df=2).fit(
+            sample_tags(), sample_movies()
+        )
+        self.assertEqual(list(features.vocabulary), ["board game"])
+        self.assertTrue(sparse.issparse(features.matrix))
+        self.assertEqual(features.matrix.shape, (4, 1))
+
+    def test_recommender_blends_tag_similarity(self):
+        """
+        Test content-based filtering uses tag features.
+        """
+
+        movies = sample_movies()
+        features = TagFeatures(min_df=1).fit(sample_tags(), movies)
+        recommender = RecommenderSystem(
+            movies, None, tag_features=features, tag_weight=1.0
+        )
+        titles = recommender.content_based_filtering("Jumanji (1995)", 1)
+        self.assertEqual(list(titles), ["Jumanji (2017)"])
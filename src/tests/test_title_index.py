@@ -0,0 +1,84 @@
+"""
+Tests for the title index.
+"""
+
+import pandas as pd
+from django.test import SimpleTestCase
+from src.title_index import MovieNotFoundError, TitleIndex, normalize_title
+
+
+def sample_movies():
+    """
+    Create and return a small movies DataFrame.
+    """
+
+    return pd.DataFrame(
+        {
+            "movieId": [1, 2, 2571, 3000],
+            "title": [
+                "Toy Story (1995)",
+                "Jumanji (1995)",
+                "Matrix, The (1999)",
+                "Jumanji (2017)",
+            ],
+            "genres": [
+                "Adventure|Animation|Children",
+                "Adventure|Children|Fantasy",
+                "Action|Sci-Fi|Thriller",
+                "Action|Adventure",
+            ],
+        }
+    )
+
+
+class TitleIndexTests(SimpleTestCase):
+    """
+    Test resolving titles and movieIds to row positions.
+    """
+
+    def setUp(self):
+        self.index = TitleIndex(sample_movies())
+
+    def test_normalize_title(self):
+        """
+        Test trailing articles, years and case are normalized.
+        """
+
+        self.assertEqual(
+            normalize_title("Matrix, The (1999)"), "the matrix 1999"
+        )
+        self.assertEqual(
+            normalize_title("Matrix, The (1999)", strip_year=True),
+            "the matrix",
+        )
+
+    def test_resolve_exact_and_year_stripped_titles(self):
+        """
+        Test exact, case-insensitive and year-less lookups.
+        """
+
+        self.assertEqual(self.index.resolve("Toy Story (1995)"), 0)
+        self.assertEqual(self.index.resolve("the matrix"), 2)
+        self.assertEqual(self.index.resolve("Jumanji (2017)"), 3)
+        # Year-less lookups resolve to the first occurrence
+        self.assertEqual(self.index.resolve("jumanji"), 1)
+
+    def test_resolve_movie_id(self):
+        """
+        Test movieIds resolve to row positions.
+        """
+
+        self.assertEqual(self.index.resolve(2571), 2)
+        self.assertEqual(
+            list(self.index.positions_for_movie_ids([3000, 999, 1])), [3, 0]
+        )
+
+    def test_missing_title_suggests_near_matches(self):
+        """
+        Test a miss raises MovieNotFoundError with suggestions.
+        """
+
+        with self.assertRaises(MovieNotFoundError) as ctx:
+            self.index.resolve("Toy Stroy")
+        self.assertIn("Toy Story (1995)", ctx.exception.suggestions)
+        self.assertNotIn("Toy Stroy", self.index)
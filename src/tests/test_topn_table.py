@@ -0,0 +1,112 @@
+"""
+Tests for the precomputed top-n recommendation table.
+"""
+
+import os
+import tempfile
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase
+from src.tests.test_factor_model import sample_factor_model
+from src.topn_table import TopNTable
+
+
+class TopNTableTests(SimpleTestCase):
+    """
+    Test building, lookups and memory-mapped persistence.
+    """
+
+    def setUp(self):
+        self.model = sample_factor_model()
+        self.ratings = pd.DataFrame(
+            {"userId": [1, 1, 2], "movieId": [1, 2, 3]}
+        )
+
+    def test_build_matches_online_scoring(self):
+        """
+        Test each row holds the user's online top-n without
+        their rated movies.
+        """
+        table = TopNTable.build(
+            self.model, self.ratings, top_n=3, chunk_size=2
+        )
+        self.assertEqual(table.items.dtype, np.int32)
+        for user_id in (1, 2, 3):
+            rated = self.ratings[self.ratings["userId"] == user_id]
+            expected = self.model.recommend(user_id, rated["movieId"], 3)
+            self.assertEqual(
+                [m for m, _ in table.lookup(user_id)],
+                [m for m, _ in expected],
+            )
+
+    def test_empty_slots_and_unknown_users(self):
+        """
+        Test users with fewer candidates than top_n get padded
+        rows and unknown users are not found.
+        """
+        table = TopNTable.build(self.model, self.ratings, top_n=4)
+        self.assertEqual(table.items[0, -2:].tolist(), [-1, -1])
+        self.assertEqual(len(table.lookup(1)), 2)
+        self.assertEqual(len(table.lookup(1, top_n=1)), 1)
+        self.assertIsNone(table.lookup(42))
+
+    def test_save_and_open_memory_mapped(self):
+        """
+        Test a saved table reopens memory-mapped with the
+        same contents, replacing any previous table.
+        """
+        table = TopNTable.build(self.model, top_n=2)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "topn")
+            TopNTable.build(self.model, top_n=1).save(path)
+            table.save(path)
+            opened = TopNTable.open(path)
+            self.assertIsInstance(opened.items, np.memmap)
+            self.assertEqual(opened.top_n, 2)
+            self.assertEqual(opened.lookup(3), table.lookup(3))
+            self.assertAlmostEqual(opened.built_at, table.built_at)
+            self.assertTrue(os.path.islink(path))
+            self.assertEqual(len(os.listdir(tmp)), 3)
+
+    def test_save_swaps_versions(self):
+        """
+        Test saving replaces a plain table directory and keeps
+        only the newest versions.
+        """
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "topn")
+            os.makedirs(path)
+            for top_n in (1, 2, 3):
+                TopNTable.build(self.model, top_n=top_n).save(path)
+            self.assertEqual(TopNTable.open(path).top_n, 3)
+            names = sorted(os.listdir(tmp))
+            self.assertEqual(len(names), 3)
+            self.assertEqual(names[0], "topn")
+            self.assertEqual(os.readlink(path), names[-1])
+
+    def test_open_reads_one_version(self):
+        """
+        Test a save landing while a table is being opened does
+        not mix files from the two versions.
+        """
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "topn")
+            TopNTable.build(self.model, top_n=1).save(path)
+            newer = TopNTable.build(self.model, top_n=2)
+            load = np.load
+            saved = []
+
+            def load_then_save(*args, **kwargs):
+                array = load(*args, **kwargs)
+                if not saved:
+                    saved.append(True)
+                    newer.save(path)
+                return array
+
+            with patch("src.topn_table.np.load", side_effect=load_then_save):
+                opened = TopNTable.open(path)
+            self.assertEqual(opened.top_n, 1)
+            self.assertEqual(opened.items.shape[1], opened.scores.shape[1])
+            self.assertEqual(TopNTable.open(path).top_n, 2)
@@ -0,0 +1,149 @@
+"""
+This module contains the TitleIndex class that resolves
+movie titles and movieIds to row positions of the movies
+DataFrame.
+"""
+
+import difflib
+import re
+
+import numpy as np
+
+YEAR_SUFFIX = re.compile(r"\s*\(\d{4}(?:[-–]\d{0,4})?\)\s*$")
+TRAILING_ARTICLE = re.compile(r"^(?P<title>.+), (?P<article>the|a|an)$")
+NON_WORD = re.compile(r"[^\w\s]")
+WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_title(title, strip_year=False):
+    """
+    Normalize a movie title for lookups.
+    Lowercases, optionally strips the "(YYYY)" suffix,
+    moves MovieLens trailing articles ("Matrix, The")
+    to the front and drops punctuation.
+    """
+    title = str(title).strip().lower()
+    year = ""
+    match = YEAR_SUFFIX.search(title)
+    if match:
+        year = match.group(0)
+        title = title[: match.start()]
+    match = TRAILING_ARTICLE.match(title)
+    if match:
+        title = f"{match.group('article')} {match.group('title')}"
+    if year and not strip_year:
+        title = f"{title} {year}"
+    return WHITESPACE.sub(" ", NON_WORD.sub(" ", title)).strip()
+
+
+class MovieNotFoundError(KeyError):
+    """
+    Raised when a title or movieId is not in the index.
+    Carries the closest matching titles as suggestions.
+    """
+
+    def __init__(self, query, suggestions=()):
+        self.query = query
+        self.suggestions = list(suggestions)
+        message = f"Movie not found: {query!r}"
+        if self.suggestions:
+            message += f". Did you mean: {', '.join(self.suggestions)}?"
+        super().__init__(message)
+
+    def __str__(self):
+        return self.args[0]
+
+
+class TitleIndex:
+    """
+    Lookup tables from normalized titles, year-stripped
+    titles and movieIds to row positions, built once
+    so each resolution is a single dict access.
+    """
+
+    def __init__(self, movies):
+        """
+        Build the lookup tables from a movies DataFrame
+        with "movieId" and "title" columns.
+        """
+        self.titles = movies["title"].to_numpy()
+        self.movie_ids = movies["movieId"].to_numpy()
+        self._by_title = {}
+        self._by_stripped_title = {}
+        self._by_movie_id = {}
+        for position, (title, movie_id) in enumerate(
+            zip(self.titles, self.movie_ids)
+        ):
+            # First occurrence wins for duplicated titles
+            self._by_title.setdefault(normalize_title(title), position)
+            self._by_stripped_title.setdefault(
+                normalize_title(title, strip_year=True), position
+            )
+            self._by_movie_id.setdefault(int(movie_id), position)
+
+    def __len__(self):
+        return len(self.titles)
+
+    def __contains__(self, query):
+        try:
+            self.resolve(query)
+        except MovieNotFoundError:
+            return False
+        return True
+
+    def position(self, title):
+        """
+        Return the row position for a title. Exact normalized
+        matches take priority over year-stripped matches.
+        """
+        position = self._by_title.get(normalize_title(title))
+        if position is None:
+            position = self._by_stripped_title.get(
+                normalize_title(title, strip_year=True)
+            )
+        if position is None:
+            raise MovieNotFoundError(title, self.suggest(title))
+        return position
+
+    def position_for_movie_id(self, movie_id):
+        """
+        Return the row position for a movieId.
+        """
+        try:
+            return self._by_movie_id[int(movie_id)]
+        except (KeyError, TypeError, ValueError):
+            raise MovieNotFoundError(movie_id) from None
+
+    def positions_for_movie_ids(self, movie_ids):
+        """
+        Return row positions for the given movieIds,
+        preserving their order and skipping unknown ids.
+        """
+        positions = [
+            self._by_movie_id.get(int(movie_id)) for movie_id in movie_ids
+        ]
+        return np.array(
+            [p for p in positions if p is not None], dtype=np.int64
+        )
+
+    def resolve(self, query):
+        """
+        Return the row position for a title (str)
+        or a movieId (int).
+        """
+        if isinstance(query, str):
+            return self.position(query)
+        return self.position_for_movie_id(query)
+
+    def suggest(self, title, n=5, cutoff=0.6):
+        """
+        Return up to n original titles close to the query.
+        Only used on a miss, so a linear scan is acceptable.
+        """
+        matches = difflib.get_close_matches(
+            normalize_title(title, strip_year=True),
+            self._by_stripped_title.keys(),
+            n=n,
+            cutoff=cutoff,
+        )
+        return [self.titles[self._by_stripped_title[m]] for m in matches]
@@ -0,0 +1,171 @@
+"""
+This module contains the TopNTable class, precomputed
+per-user recommendations served from memory-mapped arrays.
+"""
+
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+from src.id_map import MISSING, IdMap
+from src.lazy import sparse as sp
+
+# Saved versions kept next to the table: the current one and the
+# one before it, which readers may still be opening
+KEEP_VERSIONS = 2
+
+
+class TopNTable:
+    """
+    Fixed-width top-n recommendations for every user of a
+    FactorModel. items is an (n_users, top_n) int32 array of
+    movieIds (-1 marks empty slots) and scores its float32
+    predicted ratings; rows are the dense indices of users, an
+    IdMap shared with the FactorModel the table was built from.
+    Tables are
+    stored as .npy files in a directory and opened memory-mapped,
+    so a lookup is a binary search plus one row read. The table
+    path is a symlink to the newest saved version directory.
+    """
+
+    FILES = ("user_ids", "items", "scores")
+
+    def __init__(self, user_ids, items, scores, built_at=None):
+        self.users = IdMap(user_ids)
+        self.items = items
+        self.scores = scores
+        self.built_at = time.time() if built_at is None else built_at
+
+    @property
+    def user_ids(self):
+        """
+        Sorted raw userIds, one per row.
+        """
+        return self.users.ids
+
+    @property
+    def top_n(self):
+        """
+        Number of recommendations stored per user.
+        """
+        return self.items.shape[1]
+
+    @classmethod
+    def build(cls, model, ratings=None, top_n=100, chunk_size=1024):
+        """
+        Score every user of model chunk by chunk (one
+        matrix-matrix product per chunk) and keep the top-n.
+        Movies a user rated in ratings (userId, movieId columns)
+        are excluded.
+        """
+        built_at = time.time()
+        n_users, n_items = len(model.user_ids), len(model.item_ids)
+        rated = sp.csr_matrix((n_users, n_items), dtype=np.int8)
+        if ratings is not None:
+            users = model.users.indices(ratings["userId"].to_numpy())
+            items = model.items.indices(ratings["movieId"].to_numpy())
+            known = (users != MISSING) & (items != MISSING)
+            rated = sp.csr_matrix(
+                (
+                    np.ones(int(known.sum()), dtype=np.int8),
+                    (users[known], items[known]),
+                ),
+                shape=(n_users, n_items),
+            )
+
+        width = min(top_n, n_items)
+        table_items = np.full((n_users, width), -1, dtype=np.int32)
+        table_scores = np.zeros((n_users, width), dtype=np.float32)
+        for start in range(0, n_users, chunk_size):
+            stop = min(start + chunk_size, n_users)
+            scores = model.score_batch(model.user_ids[start:stop])
+            chunk = rated[start:stop]
+            rows = np.repeat(np.arange(stop - start), np.diff(chunk.indptr))
+            scores[rows, chunk.indices] = -np.inf
+            top, top_scores = model.top_n_batch(scores, width)
+            valid = np.isfinite(top_scores)
+            table_items[start:stop] = np.where(valid, model.item_ids[top], -1)
+            table_scores[start:stop] = np.where(valid, top_scores, 0)
+        return cls(model.user_ids, table_items, table_scores, built_at)
+
+    def row(self, user_id):
+        """
+        Return the row of a userId, or None for unknown users.
+        """
+        return self.users.index(user_id)
+
+    def lookup(self, user_id, top_n=None):
+        """
+        Return the stored (movieId, score) pairs of a user,
+        or None when the user is not in the table.
+        """
+        position = self.row(user_id)
+        if position is None:
+            return None
+        items = self.items[position, :top_n]
+        scores = self.scores[position, :top_n]
+        return [
+            (movie_id, score)
+            for movie_id, score in zip(items.tolist(), scores.tolist())
+            if movie_id >= 0
+        ]
+
+    def save(self, path):
+        """
+        Write the table into a new version directory next to path
+        and swap the path symlink to it with one atomic rename,
+        so readers open either the old or the new table, never
+        neither. Older versions beyond KEEP_VERSIONS are removed.
+        """
+        version = f"{path}.v{time.time_ns():020d}"
+        os.makedirs(version)
+        for name in self.FILES:
+            np.save(os.path.join(version, f"{name}.npy"), getattr(self, name))
+        with open(os.path.join(version, "meta.json"), "w") as f:
+            json.dump({"built_at": self.built_at, "top_n": self.top_n}, f)
+        link = f"{path}.link"
+        if os.path.lexists(link):
+            os.remove(link)
+        os.symlink(os.path.basename(version), link)
+        if os.path.isdir(path) and not os.path.islink(path):
+            # Tables saved before versioning are plain directories
+            shutil.rmtree(path)
+        os.replace(link, path)
+
+        directory = os.path.dirname(path) or "."
+        prefix = f"{os.path.basename(path)}.v"
+        versions = sorted(
+            name for name in os.listdir(directory) if name.startswith(prefix)
+        )
+        for name in versions[:-KEEP_VERSIONS]:
+            shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
+
+    @staticmethod
+    def version(path):
+        """
+        Return a key that changes whenever a new table is saved
+        at path, or None when there is no table.
+        """
+        try:
+            stat = os.stat(os.path.join(os.path.realpath(path), "meta.json"))
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    @classmethod
+    def open(cls, path):
+        """
+        Open a saved table with its arrays memory-mapped. The
+        version path points to is resolved once, so a concurrent
+        save cannot mix files from two versions.
+        """
+        path = os.path.realpath(path)
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        arrays = {
+            name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+            for name in cls.FILES
+        }
+        return cls(built_at=meta["built_at"], **arrays)
@@ -13,5 +13,5 @@ class TagSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Tag
-        fields = ("id", "tag", "user")
-        read_only_fields = ("id",)
+        fields = ("id", "tag", "movie", "user")
+        read_only_fields = ("id", "user")
@@ -3,14 +3,19 @@ Tags views
 """
 
 from rest_framework import viewsets, mixins
+from rest_framework.exceptions import ValidationError
 from rest_framework.authentication import TokenAuthentication
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAuthenticated
 from core.models import Tag
+from core.activity import BatchActivityMixin
+from core.replicas import ReplicaReadMixin
 from tag import serializer
 
 
 class TagViewSet(
+    ReplicaReadMixin,
+    BatchActivityMixin,
     viewsets.GenericViewSet,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
@@ -24,7 +29,7 @@ class TagViewSet(
 
     authentication_classes = (TokenAuthentication,)
     permission_classes = (IsAuthenticated,)
-    queryset = Tag.objects.all()
+    queryset = Tag.objects.select_related("user", "movie")
     serializer_class = serializer.TagSerializer
     pagination_class = PageNumberPagination
 
@@ -46,9 +51,9 @@ class TagViewSet(
         Create a new tag
         """
         if Tag.objects.filter(
-            user=self.request.user, tag=serializer.validated_data["tag"]
+            user=self.request.user,
+            movie=serializer.validated_data["movie"],
+            tag=serializer.validated_data["tag"],
         ).exists():
-            raise serializer.ValidationError(
-                "You have already created this tag."
-            )
+            raise ValidationError("You have already created this tag.")
         serializer.save(user=self.request.user)